@@ -0,0 +1,224 @@
+"""
+LLM 호출 앞단 수락 제어(admission control) + 부하 기반 생성 예산
+
+트래픽이 몰리면 모든 /api/chat 요청이 model.generate 앞에서 무제한으로 쌓여 지연이 끝없이 늘어납니다.
+AdmissionController는 LLM 단계에 동시에 들어갈 수 있는 요청 수(슬롯)와 대기열 길이를 제한합니다.
+
+- 슬롯이 비어 있고 대기 중인 요청이 없으면 바로 수락, 아니면 대기열에서 요청별 마감 시간까지 대기
+  (대기열은 도착 순서(FIFO) — 슬롯이 나면 맨 앞 요청만 들어가고, 새로 온 요청은 뒤에 줄을 섬)
+- 대기열이 가득 차면 즉시 거절 (429), 마감 시간 안에 슬롯을 얻지 못하면 거절 (503)
+  → 둘 다 Retry-After: 최근 LLM 단계 소요 시간(EWMA) × 앞선 대기 요청 수 / 슬롯 수
+- 대기열이 차오를수록 이번 요청의 max_new_tokens를 줄임 (GENERATION_DEGRADE_AT 이상부터
+  선형으로 GENERATION_MIN_NEW_TOKENS까지). 줄어든 예산에서 모델은 문장 끝에서 멈춤
+- 캐시 적중/동일 질문 병합(follower)은 LLM을 호출하지 않으므로 슬롯을 쓰지 않음
+- 마감 시간은 대기열에서 기다리는 시간에만 적용 (이미 시작한 생성은 중단하지 않음)
+
+환경변수
+- ADMISSION_CONTROL: '1'(기본)이면 사용, '0'이면 제한 없이 바로 LLM 호출
+- ADMISSION_MAX_ACTIVE: LLM 단계 동시 요청 수 (기본 CHAT_BATCH_MAX_SIZE, 없으면 8 — 한 배치를 채울 수 있도록)
+- ADMISSION_MAX_QUEUE: 대기열 최대 길이 (기본 32)
+- ADMISSION_DEADLINE: 대기열 최대 대기 시간(초, 기본 30)
+- GENERATION_DEGRADE_AT: 생성 예산을 줄이기 시작하는 대기열 점유율 (0~1, 기본 0.25)
+- GENERATION_MIN_NEW_TOKENS: 줄일 수 있는 최소 생성 토큰 수 (기본 32)
+"""
+
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+_admission_controller = None
+_admission_controller_lock = threading.Lock()
+
+# 줄어든 예산은 이 단위로 내림 → 배칭 스케줄러에서 같은 예산끼리 묶이기 쉬움
+BUDGET_STEP = 16
+MAX_RETRY_AFTER = 60
+
+
+class AdmissionRejected(Exception):
+    """수락 거절 (status: 429 대기열 가득 참 / 503 마감 시간 초과)."""
+
+    def __init__(self, message: str, status: int, retry_after: int):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class Ticket:
+    """수락된 요청. pressure(수락 시점 대기열 점유율)로 생성 예산을 정합니다."""
+
+    __slots__ = ("pressure", "waited", "scale", "min_new_tokens")
+
+    def __init__(self, pressure: float = 0.0, waited: float = 0.0, scale: float = 1.0, min_new_tokens: int = 32):
+        self.pressure = pressure
+        self.waited = waited
+        self.scale = scale
+        self.min_new_tokens = min_new_tokens
+
+    @property
+    def degraded(self) -> bool:
+        return self.scale < 1.0
+
+    def max_new_tokens(self, model):
+        """이번 요청의 생성 예산. 줄이지 않으면 None (모델 설정값 그대로)."""
+        if not self.degraded:
+            return None
+        config = getattr(model, "generation_config", None) or {}
+        full = config.get("max_new_tokens")
+        if not full:
+            return None
+        budget = int(full * self.scale) // BUDGET_STEP * BUDGET_STEP
+        budget = max(min(self.min_new_tokens, full), budget)
+        return budget if budget < full else None
+
+
+FULL_BUDGET = Ticket()
+
+
+class AdmissionController:
+    """LLM 단계 동시 실행 수와 대기열 길이를 제한하는 수락 제어기 (스레드 안전)."""
+
+    def __init__(self, max_active: int = 8, max_queue: int = 32, deadline: float = 30.0,
+                 degrade_at: float = 0.25, min_new_tokens: int = 32):
+        self.max_active = max(1, max_active)
+        self.max_queue = max(0, max_queue)
+        self.deadline = deadline
+        self.degrade_at = min(max(degrade_at, 0.0), 1.0)
+        self.min_new_tokens = max(1, min_new_tokens)
+        self._cond = threading.Condition()
+        self._active = 0
+        self._waiting = deque()  # 대기 중인 요청의 순번 표식 (맨 앞이 다음 차례)
+        self._service_seconds = None  # LLM 단계 소요 시간 EWMA
+        self._counters = {"admitted": 0, "queued": 0, "rejected_queue_full": 0, "rejected_deadline": 0,
+                          "degraded": 0}
+
+    @contextmanager
+    def admit(self, deadline: float = None):
+        """슬롯을 얻을 때까지 기다렸다가 Ticket을 넘기고, 블록이 끝나면 슬롯을 반납합니다.
+
+        Raises:
+            AdmissionRejected: 대기열 가득 참(429) 또는 마감 시간 초과(503)
+        """
+        start = time.monotonic()
+        limit = start + (self.deadline if deadline is None else deadline)
+        with self._cond:
+            # 대기 중인 요청이 있으면 새 요청도 줄 끝에 서고, 슬롯은 항상 줄 맨 앞 요청이 가져감
+            if self._active >= self.max_active or self._waiting:
+                if len(self._waiting) >= self.max_queue:
+                    self._counters["rejected_queue_full"] += 1
+                    raise AdmissionRejected("요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해주세요.",
+                                            429, self._retry_after_locked())
+                place = object()
+                self._waiting.append(place)
+                self._counters["queued"] += 1
+                try:
+                    while self._waiting[0] is not place or self._active >= self.max_active:
+                        remaining = limit - time.monotonic()
+                        if remaining <= 0:
+                            self._counters["rejected_deadline"] += 1
+                            raise AdmissionRejected("대기 시간이 초과되었습니다. 잠시 후 다시 시도해주세요.",
+                                                    503, self._retry_after_locked())
+                        self._cond.wait(remaining)
+                finally:
+                    self._waiting.remove(place)
+                    # 맨 앞이 바뀌었으므로 다음 차례가 슬롯을 확인하도록 깨움
+                    self._cond.notify_all()
+            self._active += 1
+            self._counters["admitted"] += 1
+            ticket = self._ticket_locked(time.monotonic() - start)
+            if ticket.degraded:
+                self._counters["degraded"] += 1
+
+        started = time.monotonic()
+        try:
+            yield ticket
+        finally:
+            elapsed = time.monotonic() - started
+            with self._cond:
+                self._active -= 1
+                self._service_seconds = elapsed if self._service_seconds is None \
+                    else 0.8 * self._service_seconds + 0.2 * elapsed
+                # 맨 앞 요청만 들어갈 수 있으므로 모두 깨워 순번을 확인하게 함
+                self._cond.notify_all()
+
+    def saturated(self) -> bool:
+        """슬롯과 대기열이 모두 차 있어 새 요청이 바로 거절될 상태인지 (락 없이 읽는 근사값)."""
+        return self._active >= self.max_active and len(self._waiting) >= self.max_queue
+
+    def check(self) -> None:
+        """대기열이 이미 가득 찼으면 바로 거절합니다 (스트리밍 응답 시작 전 빠른 거절용)."""
+        with self._cond:
+            if self.saturated():
+                self._counters["rejected_queue_full"] += 1
+                raise AdmissionRejected("요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해주세요.",
+                                        429, self._retry_after_locked())
+
+    def _pressure_locked(self) -> float:
+        if self.max_queue == 0:
+            return 1.0 if self._active >= self.max_active else 0.0
+        return min(1.0, len(self._waiting) / self.max_queue)
+
+    def _ticket_locked(self, waited: float) -> Ticket:
+        pressure = self._pressure_locked()
+        scale = 1.0
+        if pressure > self.degrade_at and self.degrade_at < 1.0:
+            # degrade_at → 1.0, 대기열 가득 → 0.0 (최소 예산은 Ticket.max_new_tokens에서 보장)
+            scale = 1.0 - (pressure - self.degrade_at) / (1.0 - self.degrade_at)
+        return Ticket(pressure, waited, scale, self.min_new_tokens)
+
+    def _retry_after_locked(self) -> int:
+        service = self._service_seconds or 1.0
+        return max(1, min(MAX_RETRY_AFTER, math.ceil(service * (len(self._waiting) + 1) / self.max_active)))
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "active": self._active,
+                "queue_depth": len(self._waiting),
+                "max_active": self.max_active,
+                "max_queue": self.max_queue,
+                "pressure": self._pressure_locked(),
+                "service_seconds": self._service_seconds or 0.0,
+                **self._counters,
+            }
+
+
+def get_admission_controller():
+    """환경변수 설정으로 만든 전역 수락 제어기를 반환합니다 (비활성화 시 None)."""
+    global _admission_controller
+    if os.getenv("ADMISSION_CONTROL", "1") != "1":
+        return None
+
+    if _admission_controller is None:
+        with _admission_controller_lock:
+            if _admission_controller is None:
+                default_active = max(1, int(os.getenv("CHAT_BATCH_MAX_SIZE", "8")))
+                _admission_controller = AdmissionController(
+                    max_active=int(os.getenv("ADMISSION_MAX_ACTIVE", str(default_active))),
+                    max_queue=int(os.getenv("ADMISSION_MAX_QUEUE", "32")),
+                    deadline=float(os.getenv("ADMISSION_DEADLINE", "30")),
+                    degrade_at=float(os.getenv("GENERATION_DEGRADE_AT", "0.25")),
+                    min_new_tokens=int(os.getenv("GENERATION_MIN_NEW_TOKENS", "32")),
+                )
+    return _admission_controller
+
+
+@contextmanager
+def admitted():
+    """수락 제어를 거쳐 Ticket을 넘깁니다. 비활성화 시 제한 없이 전체 예산 Ticket."""
+    controller = get_admission_controller()
+    if controller is None:
+        yield FULL_BUDGET
+        return
+    with controller.admit() as ticket:
+        yield ticket
+
+
+def admission_stats() -> dict:
+    """/health, /metrics용 수락 제어 상태."""
+    controller = get_admission_controller()
+    if controller is None:
+        return {"enabled": False}
+    return {"enabled": True, **controller.stats()}
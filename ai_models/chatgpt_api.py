@@ -7,35 +7,45 @@
 사용 가이드
 - is_weak(answer): 형사법 LLM 초안 품질 판정
 - refine_with_chatgpt(question, answer): ChatGPT로 보강한 최종 답변 생성
+- stream_refine_with_chatgpt(question, answer): 같은 보강 결과를 델타 단위로 스트리밍
 
 환경변수 (.env 지원)
 - OPENAI_API_KEY: 필수, OpenAI API 키
 - OPENAI_MODEL: 선택, 기본 "gpt-4o" (비용/속도 고려해 gpt-4o-mini 권장 가능)
+- 타임아웃/재시도/서킷 브레이커 설정은 ai_models/refine_client.py 참고
+  (서킷이 열려 있으면 CircuitOpenError — 호출 측은 LLM 초안으로 폴백)
 
 문의: 보강 프롬프트/품질 기준 수정을 원하면 AI 담당자에게 요청하세요.
 ===============================================================================
 """
 
-from openai import OpenAI
 import os
+from typing import Iterator
 from dotenv import load_dotenv
 
+from ai_models.refine_client import RefineClient, client_from_env
+
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")  # 필요 시 gpt-4o-mini 권장
 
 _client = None
 
 
-def _get_client() -> OpenAI:
+def _get_client() -> RefineClient:
     global _client
     if _client is None:
         load_dotenv()  # .env 파일 지원
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key:
             raise RuntimeError("OPENAI_API_KEY 환경변수가 필요합니다.")
-        _client = OpenAI(api_key=api_key)
+        _client = client_from_env(api_key)
     return _client
 
 
+def refine_client_stats() -> dict:
+    """보강 클라이언트의 서킷 상태/지연/오류 카운터 (클라이언트 미생성 시 빈 dict)."""
+    return _client.stats() if _client is not None else {}
+
+
 # [수정 금지] 품질 판정 규칙 — 변경 시 보강 트리거/비용/일관성 영향
 def is_weak(law_answer: str) -> bool:
     if not law_answer: 
@@ -50,15 +60,15 @@ def is_weak(law_answer: str) -> bool:
         return True
     return False
 
-# [수정 금지] 보강 프롬프트/파라미터 — 응답 톤/구성/비용에 직접 영향
-def refine_with_chatgpt(user_question: str, law_answer: str) -> str:
+# [수정 금지] 보강 프롬프트 — 응답 톤/구성/비용에 직접 영향
+def _build_refine_messages(user_question: str, law_answer: str) -> list:
     system_prompt = (
         "당신은 형사법 도메인 답변을 사용자의 이해에 맞게 보강하는 편집자입니다. "
         "초안의 법률적 의미를 바꾸지 말고, 누락된 핵심 논점을 보태고, 중간에 끊긴 문장을 복구하고, "
         "개요→핵심 쟁점→관련 조문/요건→주의사항(법률 자문 아님) 순서로 정리하세요. "
         "한국어로 간결하고 정확하게 작성하세요."
     )
-    messages = [
+    return [
         {"role": "system", "content": system_prompt},
         {"role": "user", "content": f"[사용자 질문]\n{user_question}"},
         {"role": "assistant", "content": f"[형사법 LLM 초안]\n{law_answer}"},
@@ -66,11 +76,33 @@ def refine_with_chatgpt(user_question: str, law_answer: str) -> str:
                                     "불명확하거나 끊긴 부분은 자연스럽게 복구하고, 빠진 요건/예외가 있으면 추가 설명하세요. "
                                     "마지막에 '※ 본 답변은 일반 정보이며 법률 자문이 아닙니다.'를 붙이세요."}
     ]
+
+# [수정 금지] 보강 파라미터 — 응답 톤/구성/비용에 직접 영향
+def refine_with_chatgpt(user_question: str, law_answer: str) -> str:
     client = _get_client()
-    resp = client.chat.completions.create(
+    resp = client.create(
         model=OPENAI_MODEL,
-        messages=messages,
+        messages=_build_refine_messages(user_question, law_answer),
         temperature=0.3,
         max_tokens=800
     )
     return resp.choices[0].message.content
+
+# 스트리밍 보강 — refine_with_chatgpt와 같은 프롬프트/파라미터, 델타 단위 반환
+def stream_refine_with_chatgpt(user_question: str, law_answer: str) -> Iterator[str]:
+    client = _get_client()
+    stream = client.create(
+        model=OPENAI_MODEL,
+        messages=_build_refine_messages(user_question, law_answer),
+        temperature=0.3,
+        max_tokens=800,
+        stream=True
+    )
+    # 소비자가 중간에 끊으면(GeneratorExit) 스트림을 닫아 서킷 시험 슬롯/연결을 바로 반납
+    with stream:
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                yield delta
@@ -5,31 +5,112 @@
 
 사용 가이드
 - 공개 API: CriminalQAModel.generate_answer(question: str) -> str
+- 배치 API: CriminalQAModel.batch_generate(questions: list) -> list (좌측 패딩 단일 generate)
+- 스트리밍 API: CriminalQAModel.stream_answer(question: str) -> Iterator[str] (디코딩되는 대로 텍스트 조각 반환)
+  소비자가 중간에 close()하면(클라이언트 끊김) 다음 토큰에서 생성을 멈추고 생성 스레드가 끝난 뒤 반환
+- 생성 예산: generate_answer / stream_answer / batch_generate / generate_with_context의 선택 인자 max_new_tokens로
+  이번 호출만 생성 길이를 줄일 수 있음 (부하 시 admission.py가 사용). 줄어든 예산에서는 예산의 절반 이후
+  문장 끝에서 멈추고, 예산을 다 써서 끊긴 마지막 문장은 잘라냄 (스트리밍 제외)
+- 멀티턴 API: conversation_ids / followup_ids로 대화 토큰을 만들고 generate_with_context(input_ids, past_key_values)로
+  이전 턴의 KV를 이어서 생성 (채팅방별 상태 관리는 conversation_cache.py)
 - 모델은 서버 시작 시 또는 최초 호출 시 로드됩니다.
 - 디바이스 선택: GPU 가능 시 4비트 양자화 + device_map="auto", 실패/미지원 시 CPU 폴백
 - 어댑터 경로: 기본값은 이 폴더의 "criminal-qa-best" (로컬 배포용)
 
 환경변수
 - (선택) CUDA 관련 설정은 시스템/드라이버에 따릅니다.
+- MODEL_SNAPSHOT_PATH: LoRA 병합 스냅샷 폴더 (ai_models/snapshot.py로 빌드). 유효하면 스냅샷을 직접 로드하고
+  PeftModel 래핑을 생략 → 시작 시간 단축 + 토큰당 어댑터 오버헤드 제거
+- CPU_PRECISION: CPU 추론 정밀도 (GPU 4비트 경로에는 영향 없음)
+  - fp32 (기본): 기존 동작
+  - bf16: bfloat16 가중치로 로드 → 상주 메모리 약 절반
+  - int8: fp32로 로드 후 LoRA를 병합(merge_and_unload)하고 nn.Linear를 int8 동적 양자화
+  → 모드별 메모리/속도/답변 차이는 benchmarks/bench_cpu_precision.py 로 확인
+- PREFIX_KV_CACHE: '1'(기본)이면 고정 system/지시 프롬프트의 past_key_values를 지시사항별로 한 번만
+  계산해 단건 추론(generate_answer/stream_answer)에서 재사용 → 질문 토큰만 prefill
 
 문의: 모델/AI 관련 변경은 담당자에게 요청하세요.
 ===============================================================================
 """
 
 import torch
+import copy
 import logging
 import os
-from transformers import AutoModelForCausalLM, AutoTokenizer
+import threading
+import time
+import re
+from transformers import (AutoModelForCausalLM, AutoTokenizer, LogitsProcessor, LogitsProcessorList, StoppingCriteria,
+                          StoppingCriteriaList, TextIteratorStreamer)
 from peft import PeftModel
-from typing import Optional
+from typing import Iterator, Optional
 
 # 메모리 효율성을 위한 설정
 torch.set_grad_enabled(False)  # 그래디언트 계산 비활성화
 
-# 로깅 설정
-logging.basicConfig(level=logging.INFO)
+# 로깅 (핸들러/레벨 설정은 실행 진입점에서 — logging_setup.configure_logging)
 logger = logging.getLogger(__name__)
 
+# CPU_PRECISION 허용값
+CPU_PRECISIONS = ("fp32", "bf16", "int8")
+
+# 시스템 프롬프트 (단건 프롬프트와 멀티턴 이어붙이기에서 공통 사용)
+SYSTEM_PROMPT = "주어진 지시대로 질문에 대한 답변을 생성합니다\n\n"
+
+class _FirstStepTimer(LogitsProcessor):
+    """첫 디코딩 스텝 시각을 기록 (generate 시작~첫 호출 = prefill, 이후 = decode)"""
+
+    def __init__(self):
+        self.first_step_at = None
+
+    def __call__(self, input_ids, scores):
+        if self.first_step_at is None:
+            self.first_step_at = time.perf_counter()
+        return scores
+
+
+# 문장 끝: 마침표(숫자 뒤 "1." 같은 목록 번호 제외)/물음표/느낌표/줄바꿈
+_SENTENCE_END = re.compile(r"(?:(?<!\d)[.。]|[?!])[\"')\]]*\s*$|\n\s*$")
+
+
+class _SentenceBoundaryStop(StoppingCriteria):
+    """생성 토큰이 min_new_tokens 이상이면 문장이 끝나는 토큰에서 행별로 멈춤 (줄어든 생성 예산용)"""
+
+    def __init__(self, tokenizer, input_length: int, min_new_tokens: int):
+        self.tokenizer = tokenizer
+        self.input_length = input_length
+        self.min_new_tokens = min_new_tokens
+
+    def __call__(self, input_ids, scores, **kwargs):
+        done = torch.zeros(input_ids.shape[0], dtype=torch.bool, device=input_ids.device)
+        if input_ids.shape[1] - self.input_length < self.min_new_tokens:
+            return done
+        for row in range(input_ids.shape[0]):
+            tail = self.tokenizer.decode(input_ids[row, -2:].tolist(), skip_special_tokens=True)
+            done[row] = bool(_SENTENCE_END.search(tail))
+        return done
+
+
+class _CancelStop(StoppingCriteria):
+    """cancel 이벤트가 set 되면 다음 토큰에서 모든 행을 멈춤 (스트리밍 소비자가 중간에 떠난 경우)"""
+
+    def __init__(self, cancel: threading.Event):
+        self.cancel = cancel
+
+    def __call__(self, input_ids, scores, **kwargs):
+        return torch.full((input_ids.shape[0],), self.cancel.is_set(), dtype=torch.bool, device=input_ids.device)
+
+
+def trim_to_sentence(answer: str) -> str:
+    """마지막 문장 끝 이후의 끊긴 꼬리를 잘라냄 (문장 끝이 앞쪽 절반에만 있으면 그대로 반환)"""
+    if _SENTENCE_END.search(answer):
+        return answer
+    ends = [m.end() for m in re.finditer(r"(?:(?<!\d)[.。]|[?!])[\"')\]]*(?=\s)|\n", answer)]
+    if not ends or ends[-1] < len(answer) // 2:
+        return answer
+    return answer[:ends[-1]].strip()
+
+
 # [수정 금지] 형사법 LLM 핵심 클래스 — 인터페이스/로직 변경 금지 (AI 담당자 승인 필요)
 class CriminalQAModel:
     """형사법 QA 모델 클래스"""
@@ -48,7 +129,6 @@ class CriminalQAModel:
         
         # 어댑터 경로 자동 설정
         if adapter_path is None:
-            import os
             # 현재 파일의 위치를 기준으로 상대 경로 계산
             current_dir = os.path.dirname(os.path.abspath(__file__))
             # ai_models 폴더 내부의 어댑터 폴더를 기본값으로 사용
@@ -57,8 +137,31 @@ class CriminalQAModel:
         self.adapter_path = adapter_path
         self.model = None
         self.tokenizer = None
+        # MODEL_SNAPSHOT_PATH의 병합 스냅샷으로 로드한 경우 그 경로 (아니면 None)
+        self.snapshot_path = None
         # 모델이 실제로 CUDA에서 동작 중인지 여부 (입력 텐서 이동 판단용)
         self.is_model_on_cuda = False
+        # CPU 로드 시 정밀도 (fp32 | bf16 | int8)
+        self.cpu_precision = os.getenv("CPU_PRECISION", "fp32").strip().lower()
+        if self.cpu_precision not in CPU_PRECISIONS:
+            logger.warning(f"알 수 없는 CPU_PRECISION={self.cpu_precision}, fp32를 사용합니다.")
+            self.cpu_precision = "fp32"
+        # 생성 파라미터 (generate_answer/batch_generate 공통)
+        self.generation_config = dict(
+            max_new_tokens=128,
+            do_sample=True,
+            temperature=0.1,
+            top_p=0.9,
+            repetition_penalty=1.1,
+            use_cache=True  # GPU 캐시 사용으로 속도 향상
+        )
+        # 고정 프롬프트 prefix KV 캐시 (instruction → (prefix 토큰 ids, past_key_values))
+        self.use_prefix_cache = os.getenv("PREFIX_KV_CACHE", "1") == "1"
+        self._prefix_cache = {}
+        self._prefix_cache_signature = None
+        self._prefix_lock = threading.Lock()
+        # 단계별 소요 시간 콜백 stage_observer(stage, seconds, tokens) — tokenize/prefill/decode (metrics 연결용)
+        self.stage_observer = None
         # GPU 사용 가능하면 GPU, 아니면 CPU
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         
@@ -78,15 +181,19 @@ class CriminalQAModel:
         """모델과 토크나이저 로드"""
         try:
             # 어댑터 경로 확인
-            import os
-            if not os.path.exists(self.adapter_path):
-                raise FileNotFoundError(f"어댑터 경로를 찾을 수 없습니다: {self.adapter_path}")
-            
-            adapter_config_path = os.path.join(self.adapter_path, "adapter_config.json")
-            if not os.path.exists(adapter_config_path):
-                raise FileNotFoundError(f"adapter_config.json 파일을 찾을 수 없습니다: {adapter_config_path}")
+            # 병합 스냅샷이 유효하면 베이스+어댑터 대신 스냅샷을 바로 로드 (PEFT 래핑 생략)
+            self.snapshot_path = self._resolve_snapshot()
+            model_path = self.snapshot_path or self.base_model_path
+
+            if self.snapshot_path is None:
+                if not os.path.exists(self.adapter_path):
+                    raise FileNotFoundError(f"어댑터 경로를 찾을 수 없습니다: {self.adapter_path}")
+
+                adapter_config_path = os.path.join(self.adapter_path, "adapter_config.json")
+                if not os.path.exists(adapter_config_path):
+                    raise FileNotFoundError(f"adapter_config.json 파일을 찾을 수 없습니다: {adapter_config_path}")
             
-            logger.info("베이스 모델 로딩 중...")
+            logger.info(f"베이스 모델 로딩 중... ({model_path})")
             # 4비트 양자화로 메모리 사용량 감소
             if torch.cuda.is_available():
                 # GPU 사용 시 (8GB VRAM 최적화)
@@ -101,7 +208,7 @@ class CriminalQAModel:
                     )
 
                     self.model = AutoModelForCausalLM.from_pretrained(
-                        self.base_model_path,
+                        model_path,
                         quantization_config=quantization_config,  # 4비트 양자화
                         device_map="auto",
                         torch_dtype=torch.float16,
@@ -113,17 +220,18 @@ class CriminalQAModel:
                         f"4비트 양자화 로딩 실패 또는 bitsandbytes 문제 발생. CPU 모드로 폴백합니다: {quant_error}"
                     )
                     self.model = AutoModelForCausalLM.from_pretrained(
-                        self.base_model_path,
-                        torch_dtype=torch.float32,
+                        model_path,
+                        torch_dtype=self._cpu_torch_dtype(),
                         device_map=None,
                         low_cpu_mem_usage=True
                     )
                     self.is_model_on_cuda = False
             else:
-                # CPU 사용 시 - 8비트 양자화 비활성화
+                # CPU 사용 시 - CPU_PRECISION에 따라 fp32/bf16 로드 (int8은 로드 후 양자화)
+                logger.info(f"CPU 정밀도: {self.cpu_precision}")
                 self.model = AutoModelForCausalLM.from_pretrained(
-                    self.base_model_path,
-                    torch_dtype=torch.float32,
+                    model_path,
+                    torch_dtype=self._cpu_torch_dtype(),
                     device_map=None,
                     low_cpu_mem_usage=True
                 )
@@ -133,7 +241,10 @@ class CriminalQAModel:
             # 어댑터 폴더에 토크나이저 파일이 있으면 우선 사용, 없으면 베이스 모델 토크나이저 사용
             try:
                 adapter_tokenizer_path = os.path.join(self.adapter_path, "tokenizer.json")
-                if os.path.exists(adapter_tokenizer_path):
+                if self.snapshot_path is not None:
+                    # 스냅샷 빌드 시 서빙용 토크나이저를 함께 저장해 둠
+                    self.tokenizer = AutoTokenizer.from_pretrained(self.snapshot_path)
+                elif os.path.exists(adapter_tokenizer_path):
                     self.tokenizer = AutoTokenizer.from_pretrained(self.adapter_path)
                 else:
                     self.tokenizer = AutoTokenizer.from_pretrained(self.base_model_path)
@@ -142,15 +253,25 @@ class CriminalQAModel:
                 self.tokenizer = AutoTokenizer.from_pretrained(self.base_model_path)
             self.tokenizer.pad_token = self.tokenizer.eos_token
             self.tokenizer.pad_token_id = self.tokenizer.eos_token_id
+            # 배치 추론 시 프롬프트 끝을 맞추기 위해 좌측 패딩 사용
+            self.tokenizer.padding_side = "left"
             
-            logger.info("LoRA 어댑터 로딩 중...")
-            try:
-                self.model = PeftModel.from_pretrained(self.model, self.adapter_path)
-            except Exception as e:
-                logger.warning(f"LoRA 어댑터 로딩 실패, 베이스 모델만 사용: {e}")
-                logger.info("베이스 모델만으로 추론을 진행합니다.")
+            if self.snapshot_path is not None:
+                logger.info("LoRA가 병합된 스냅샷을 사용하므로 어댑터 로딩을 건너뜁니다.")
+            else:
+                logger.info("LoRA 어댑터 로딩 중...")
+                try:
+                    self.model = PeftModel.from_pretrained(self.model, self.adapter_path)
+                except Exception as e:
+                    logger.warning(f"LoRA 어댑터 로딩 실패, 베이스 모델만 사용: {e}")
+                    logger.info("베이스 모델만으로 추론을 진행합니다.")
             
+            if not self.is_model_on_cuda and self.cpu_precision == "int8":
+                self._quantize_int8()
+
             self.model.eval()
+            # 모델/토크나이저가 바뀌었으므로 이전 prefix KV 캐시는 무효
+            self.invalidate_prefix_cache()
             logger.info("모델 로딩 완료!")
             
         except Exception as e:
@@ -164,105 +285,383 @@ class CriminalQAModel:
             logger.error("3. 현재 작업 디렉토리: " + os.getcwd())
             raise
     
+    def _cpu_torch_dtype(self) -> torch.dtype:
+        """CPU 로드 dtype. int8은 양자화 전 fp32로 로드합니다."""
+        return torch.bfloat16 if self.cpu_precision == "bf16" else torch.float32
+
+    def _quantize_int8(self):
+        """LoRA를 베이스 가중치에 병합한 뒤 nn.Linear를 int8 동적 양자화 (CPU 전용)"""
+        logger.info("int8 동적 양자화 중...")
+        if isinstance(self.model, PeftModel):
+            # 양자화된 Linear 위에는 LoRA를 얹을 수 없으므로 먼저 병합
+            self.model = self.model.merge_and_unload()
+        self.model = torch.ao.quantization.quantize_dynamic(
+            self.model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+
+    def _resolve_snapshot(self) -> Optional[str]:
+        """MODEL_SNAPSHOT_PATH가 현재 베이스 모델/어댑터/토크나이저로 만든 유효한 병합 스냅샷이면 그 경로를 반환"""
+        snapshot_path = os.getenv("MODEL_SNAPSHOT_PATH")
+        if not snapshot_path:
+            return None
+        if not os.path.isdir(snapshot_path):
+            logger.warning(f"스냅샷 경로가 없어 베이스 모델 + 어댑터로 로딩합니다: {snapshot_path}")
+            return None
+        from ai_models.snapshot import validate_snapshot
+        meta = validate_snapshot(snapshot_path, self.adapter_path, self.base_model_path)
+        if meta is None:
+            logger.warning("스냅샷 검증 실패, 베이스 모델 + 어댑터로 로딩합니다.")
+            return None
+        logger.info(f"병합 스냅샷 사용: {snapshot_path} (생성 {meta.get('created_at')}, dtype {meta.get('dtype')})")
+        return snapshot_path
+
+    # [수정 금지] 추론 프롬프트 구성 (응답 품질/일관성에 영향)
+    def _build_input_text(self, question: str, instruction: str) -> str:
+        """generate_answer/batch_generate 공통 프롬프트 문자열 생성"""
+        # 입력 텍스트 구성
+        user_template = f'''지시 : {instruction}\n
+주어진 질문에 적합한 내용의 답변을 생성합니다. 질문 : "{question}"\n'''
+
+        # ChatML 형식으로 변환
+        messages = [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": f"{user_template}\n\n"},
+            {"role": "assistant", "content": ""}
+        ]
+
+        try:
+            return self.tokenizer.apply_chat_template(messages, tokenize=False)
+        except Exception:
+            # Chat template이 없거나 구버전일 때의 안전한 대체 프롬프트
+            return (
+                f"[SYSTEM]\n주어진 지시대로 질문에 대한 답변을 생성합니다\n\n\n"
+                f"[USER]\n지시 : {instruction}\n주어진 질문에 적합한 내용의 답변을 생성합니다. 질문 : \"{question}\"\n\n\n"
+                f"[ASSISTANT]"
+            )
+
+    # [수정 금지] 생성 파라미터 (응답 품질/일관성에 영향)
+    def _generate(self, inputs: dict, max_new_tokens: Optional[int] = None,
+                  cancel: Optional[threading.Event] = None, **extra):
+        """토크나이즈된 입력으로 model.generate 호출 (단건/배치/스트리밍 공통)
+
+        max_new_tokens: 설정값보다 작으면 이번 호출만 생성 예산을 줄이고 문장 끝 조기 종료를 켬
+        cancel: set 되면 다음 토큰에서 생성 중단 (스트리밍 소비자가 떠난 경우)
+        extra: past_key_values(prefix KV 캐시), streamer 등 generate 추가 인자 (None은 무시)
+        """
+        # 디바이스로 이동 (모델이 실제로 CUDA에서 동작할 때만 이동)
+        if self.is_model_on_cuda:
+            inputs = {k: v.to("cuda") for k, v in inputs.items()}
+        extra = {k: v for k, v in extra.items() if v is not None}
+        generation_config = self.generation_config
+        if self._is_reduced_budget(max_new_tokens):
+            generation_config = {**generation_config, "max_new_tokens": max_new_tokens}
+            if generation_config.get("min_new_tokens", 0) > max_new_tokens:
+                generation_config["min_new_tokens"] = max_new_tokens
+            stop = _SentenceBoundaryStop(self.tokenizer, inputs["input_ids"].shape[1], max(1, max_new_tokens // 2))
+            extra["stopping_criteria"] = StoppingCriteriaList([*extra.get("stopping_criteria", []), stop])
+        if cancel is not None:
+            extra["stopping_criteria"] = StoppingCriteriaList([*extra.get("stopping_criteria", []), _CancelStop(cancel)])
+        observer = self.stage_observer
+        if observer is not None:
+            timer = _FirstStepTimer()
+            extra["logits_processor"] = LogitsProcessorList([*extra.get("logits_processor", []), timer])
+            start = time.perf_counter()
+
+        # 추론 (GPU 메모리 최적화)
+        with torch.no_grad():
+            outputs = self.model.generate(
+                **inputs,
+                **generation_config,
+                **extra,
+                eos_token_id=self.tokenizer.eos_token_id,
+                pad_token_id=self.tokenizer.pad_token_id,
+            )
+
+        if observer is not None:
+            end = time.perf_counter()
+            first = timer.first_step_at or end
+            sequences = getattr(outputs, "sequences", outputs)  # return_dict_in_generate=True면 출력 객체
+            new_tokens = sequences[:, inputs["input_ids"].shape[1]:]
+            pad_token_id = self.tokenizer.pad_token_id
+            generated = new_tokens.numel() if pad_token_id is None else int((new_tokens != pad_token_id).sum())
+            self._observe("prefill", first - start)
+            self._observe("decode", end - first, generated)
+        return outputs
+
+    def _is_reduced_budget(self, max_new_tokens: Optional[int]) -> bool:
+        return max_new_tokens is not None and max_new_tokens < self.generation_config.get("max_new_tokens", max_new_tokens + 1)
+
+    def _finish_answer(self, answer: str, max_new_tokens: Optional[int]) -> str:
+        # 줄어든 예산으로 생성한 답변은 끊긴 마지막 문장을 잘라냄
+        return trim_to_sentence(answer) if self._is_reduced_budget(max_new_tokens) else answer
+
+    def _observe(self, stage: str, seconds: float, tokens: int = 0) -> None:
+        """stage_observer가 있으면 단계 소요 시간을 전달 (관측 오류는 추론에 영향 없음)"""
+        observer = self.stage_observer
+        if observer is None:
+            return
+        try:
+            observer(stage, seconds, tokens)
+        except Exception as e:
+            logger.debug(f"stage_observer 오류: {e}")
+
+    def _prepare_single(self, question: str, instruction: str):
+        """단건 추론 입력과 (가능하면) 재사용할 prefix KV 캐시 사본을 반환"""
+        input_text = self._build_input_text(question, instruction)
+
+        # 토크나이징
+        start = time.perf_counter()
+        inputs = self.tokenizer(
+            input_text,
+            return_tensors="pt",
+            max_length=512,
+            truncation=True,
+            padding=True
+        )
+        self._observe("tokenize", time.perf_counter() - start)
+        return inputs, self._prefix_past_key_values(inputs["input_ids"], instruction)
+
+    # ---- 고정 프롬프트 prefix KV 캐시 ----
+    def invalidate_prefix_cache(self) -> None:
+        """prefix KV 캐시를 비웁니다 (어댑터/토크나이저 교체 시 호출)."""
+        with self._prefix_lock:
+            self._prefix_cache.clear()
+            self._prefix_cache_signature = None
+
+    def _prefix_signature(self) -> tuple:
+        # 어댑터/모델/토크나이저 중 하나라도 바뀌면 캐시된 KV는 더 이상 유효하지 않음
+        return (
+            self.adapter_path,
+            id(self.model),
+            id(self.tokenizer),
+            getattr(self.tokenizer, "name_or_path", None),
+            len(self.tokenizer),
+            getattr(self.tokenizer, "chat_template", None),
+        )
+
+    def _build_prefix_entry(self, instruction: str):
+        """instruction까지의 고정 프롬프트를 한 번 prefill해 (토큰 ids, past_key_values) 생성"""
+        sentinel = "\u0000QUESTION\u0000"
+        prefix_text = self._build_input_text(sentinel, instruction).split(sentinel)[0]
+        # 질문과 합쳐 토크나이즈할 때와 토큰 경계가 같도록 마지막 줄바꿈까지만 prefix로 사용
+        cut = prefix_text.rfind("\n")
+        if cut < 0:
+            return None
+        prefix_ids = self.tokenizer(prefix_text[:cut + 1], return_tensors="pt")["input_ids"]
+        if self.is_model_on_cuda:
+            prefix_ids = prefix_ids.to("cuda")
+        with torch.no_grad():
+            outputs = self.model(input_ids=prefix_ids, use_cache=True)
+        return prefix_ids[0].tolist(), outputs.past_key_values
+
+    def _prefix_past_key_values(self, input_ids, instruction: str):
+        """입력이 캐시된 prefix로 시작하면 past_key_values 사본을, 아니면 None을 반환"""
+        if not self.use_prefix_cache or input_ids.shape[0] != 1:
+            return None
+        try:
+            signature = self._prefix_signature()
+            with self._prefix_lock:
+                if self._prefix_cache_signature != signature:
+                    self._prefix_cache.clear()
+                    self._prefix_cache_signature = signature
+                if instruction not in self._prefix_cache:
+                    self._prefix_cache[instruction] = self._build_prefix_entry(instruction)
+                entry = self._prefix_cache[instruction]
+            if entry is None:
+                return None
+            prefix_ids, past_key_values = entry
+            # 잘림/토큰 경계 차이로 prefix가 일치하지 않으면 전체 prefill
+            if input_ids.shape[1] <= len(prefix_ids) or input_ids[0, :len(prefix_ids)].tolist() != prefix_ids:
+                return None
+            # generate가 캐시를 제자리에서 확장하므로 요청마다 사본 사용
+            return copy.deepcopy(past_key_values)
+        except Exception as e:
+            logger.warning(f"prefix KV 캐시 사용 불가, 전체 prefill로 진행합니다: {e}")
+            return None
+
+    # [수정 금지] 후처리: 프롬프트를 제외한 신규 생성 부분만 추출
+    def _decode_answer(self, output_ids, input_length: int) -> str:
+        """생성 결과 한 줄(output_ids)에서 답변 텍스트를 추출"""
+        try:
+            new_tokens = output_ids[input_length:]
+            answer = self.tokenizer.decode(new_tokens.tolist(), skip_special_tokens=True).strip()
+            if not answer:
+                # 비어 있으면 전체에서 후처리
+                generated_text = self.tokenizer.decode(output_ids, skip_special_tokens=True)
+                answer = generated_text.split("질문 :")[-1].strip()
+        except Exception:
+            answer = self.tokenizer.decode(output_ids, skip_special_tokens=True)
+        return answer
+
     # [수정 금지] 추론 프롬프트/생성 파라미터/후처리 (응답 품질/일관성에 영향)
-    def generate_answer(self, question: str, instruction: str = "형사법 질문에 답변하세요") -> str:
+    def generate_answer(self, question: str, instruction: str = "형사법 질문에 답변하세요",
+                        max_new_tokens: Optional[int] = None) -> str:
         """
         질문에 대한 답변 생성
         
         Args:
             question: 질문
             instruction: 지시사항
+            max_new_tokens: (선택) 이번 호출의 생성 예산 (설정값보다 작을 때만 적용)
             
         Returns:
             생성된 답변
         """
         try:
-            # 입력 텍스트 구성
-            user_template = f'''지시 : {instruction}\n
-주어진 질문에 적합한 내용의 답변을 생성합니다. 질문 : "{question}"\n'''
-            
-            # ChatML 형식으로 변환
-            messages = [
-                {"role": "system", "content": "주어진 지시대로 질문에 대한 답변을 생성합니다\n\n"},
-                {"role": "user", "content": f"{user_template}\n\n"},
-                {"role": "assistant", "content": ""}
-            ]
-            
-            # 토크나이징
-            try:
-                input_text = self.tokenizer.apply_chat_template(messages, tokenize=False)
-            except Exception:
-                # Chat template이 없거나 구버전일 때의 안전한 대체 프롬프트
-                input_text = (
-                    f"[SYSTEM]\n주어진 지시대로 질문에 대한 답변을 생성합니다\n\n\n"
-                    f"[USER]\n지시 : {instruction}\n주어진 질문에 적합한 내용의 답변을 생성합니다. 질문 : \"{question}\"\n\n\n"
-                    f"[ASSISTANT]"
-                )
-            inputs = self.tokenizer(
-                input_text,
-                return_tensors="pt",
-                max_length=512,
-                truncation=True,
-                padding=True
-            )
-            
-            # 디바이스로 이동 (모델이 실제로 CUDA에서 동작할 때만 이동)
-            if self.is_model_on_cuda:
-                inputs = {k: v.to("cuda") for k, v in inputs.items()}
-            
-            # 추론 (GPU 메모리 최적화)
-            with torch.no_grad():
-                outputs = self.model.generate(
-                    **inputs,
-                    max_new_tokens=128,
-                    do_sample=True,
-                    temperature=0.1,
-                    top_p=0.9,
-                    eos_token_id=self.tokenizer.eos_token_id,
-                    pad_token_id=self.tokenizer.pad_token_id,
-                    repetition_penalty=1.1,
-                    use_cache=True  # GPU 캐시 사용으로 속도 향상
-                )
-            
-            # 결과 디코딩: 프롬프트를 제외한 신규 생성 부분만 추출
-            try:
-                input_length = inputs["input_ids"].shape[1]
-                new_tokens = outputs[0][input_length:]
-                answer = self.tokenizer.decode(new_tokens.tolist(), skip_special_tokens=True).strip()
-                if not answer:
-                    # 비어 있으면 전체에서 후처리
-                    generated_text = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
-                    answer = generated_text.split("질문 :")[-1].strip()
-            except Exception:
-                generated_text = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
-                answer = generated_text
-            
-            return answer
+            inputs, past_key_values = self._prepare_single(question, instruction)
+            outputs = self._generate(inputs, max_new_tokens, past_key_values=past_key_values)
+
+            # 결과 디코딩
+            return self._finish_answer(self._decode_answer(outputs[0], inputs["input_ids"].shape[1]), max_new_tokens)
             
         except Exception as e:
             logger.error(f"답변 생성 중 오류: {e}")
             return f"답변 생성 중 오류가 발생했습니다: {e}"
     
+    # 스트리밍 추론 (generate_answer와 같은 프롬프트/파라미터)
+    def stream_answer(self, question: str, instruction: str = "형사법 질문에 답변하세요",
+                      max_new_tokens: Optional[int] = None) -> Iterator[str]:
+        """
+        질문에 대한 답변을 디코딩되는 대로 조각 단위로 반환
+
+        model.generate는 별도 스레드에서 실행되고, TextIteratorStreamer가 새 토큰을 텍스트로 넘겨줍니다.
+        소비자가 중간에 close()하면 생성을 취소하고 생성 스레드가 끝날 때까지 기다린 뒤 반환합니다
+        (호출 측의 동시 생성 제한 슬롯이 실제로 돌고 있는 generate 수와 일치하도록).
+
+        Args:
+            question: 질문
+            instruction: 지시사항
+            max_new_tokens: (선택) 이번 호출의 생성 예산 (설정값보다 작을 때만 적용)
+
+        Yields:
+            생성된 답변 텍스트 조각
+        """
+        inputs, past_key_values = self._prepare_single(question, instruction)
+        streamer = TextIteratorStreamer(self.tokenizer, skip_prompt=True, skip_special_tokens=True)
+        cancel = threading.Event()
+        errors = []
+
+        def _run():
+            try:
+                self._generate(inputs, max_new_tokens, cancel, past_key_values=past_key_values, streamer=streamer)
+            except Exception as e:
+                logger.error(f"스트리밍 답변 생성 중 오류: {e}")
+                errors.append(e)
+                # 소비자가 대기 상태로 남지 않도록 스트림 종료
+                streamer.end()
+
+        thread = threading.Thread(target=_run, name="stream-generate", daemon=True)
+        thread.start()
+        try:
+            for text in streamer:
+                if text:
+                    yield text
+        finally:
+            # 정상 종료면 이미 끝난 생성이고, 중간에 닫혔으면(GeneratorExit) 다음 토큰에서 멈춤
+            cancel.set()
+            thread.join()
+        if errors:
+            raise errors[0]
+
+    # ---- 멀티턴 대화 (conversation_cache에서 사용) ----
+    def _build_followup_text(self, question: str, instruction: str) -> str:
+        """이어지는 턴의 프롬프트: 단건 프롬프트에서 시스템 블록을 뺀 user + assistant 블록"""
+        full = self._build_input_text(question, instruction)
+        try:
+            system = self.tokenizer.apply_chat_template([{"role": "system", "content": SYSTEM_PROMPT}], tokenize=False)
+        except Exception:
+            system = f"[SYSTEM]\n{SYSTEM_PROMPT}\n"
+        return full[len(system):] if full.startswith(system) else full
+
+    def _turn_ids(self, question: str, instruction: str, first: bool) -> list:
+        if first:
+            # 첫 턴은 generate_answer와 같은 토큰화 (BOS 포함)
+            return self.tokenizer(self._build_input_text(question, instruction))["input_ids"]
+        return self.tokenizer(self._build_followup_text(question, instruction), add_special_tokens=False)["input_ids"]
+
+    def followup_ids(self, question: str, instruction: str = "형사법 질문에 답변하세요") -> list:
+        """이전 대화 뒤에 이어 붙일 새 질문 토큰 ids"""
+        return self._turn_ids(question, instruction, first=False)
+
+    def answer_ids(self, answer: str) -> list:
+        """대화 기록 안의 답변 토큰 ids (답변 + EOS)"""
+        return self.tokenizer(answer, add_special_tokens=False)["input_ids"] + [self.tokenizer.eos_token_id]
+
+    def conversation_ids(self, turns: list, question: str, instruction: str = "형사법 질문에 답변하세요") -> list:
+        """[(질문, 답변), ...] 기록과 새 질문을 이어 붙인 대화 전체 토큰 ids (콜드 재구성/잘라내기용)"""
+        ids = []
+        for past_question, past_answer in turns:
+            ids += self._turn_ids(past_question, instruction, first=not ids)
+            ids += self.answer_ids(past_answer)
+        return ids + self._turn_ids(question, instruction, first=not ids)
+
+    def generate_with_context(self, input_ids: list, past_key_values=None, streamer=None,
+                              max_new_tokens: Optional[int] = None, cancel: Optional[threading.Event] = None):
+        """대화 전체 토큰 ids로 답변 생성. past_key_values가 앞부분을 덮고 있으면 나머지만 prefill 합니다.
+
+        cancel: (스트리밍) set 되면 다음 토큰에서 생성 중단
+
+        Returns:
+            (답변, 생성 토큰까지 포함한 전체 ids, 다음 턴에 넘길 past_key_values)
+        """
+        inputs = {
+            "input_ids": torch.tensor([input_ids], dtype=torch.long),
+            "attention_mask": torch.ones((1, len(input_ids)), dtype=torch.long),
+        }
+        outputs = self._generate(inputs, max_new_tokens, cancel, past_key_values=past_key_values, streamer=streamer,
+                                 return_dict_in_generate=True)
+        sequence = outputs.sequences[0]
+        answer = self._decode_answer(sequence, len(input_ids))
+        if streamer is None:
+            answer = self._finish_answer(answer, max_new_tokens)
+        return answer, sequence.tolist(), outputs.past_key_values
+
     # [수정 금지] 배치 추론 헬퍼 (외부 사용 시 인터페이스 유지)
-    def batch_generate(self, questions: list, instruction: str = "형사법 질문에 답변하세요") -> list:
+    def batch_generate(self, questions: list, instruction: str = "형사법 질문에 답변하세요",
+                       max_new_tokens: Optional[int] = None) -> list:
         """
         여러 질문에 대한 배치 답변 생성
+
+        질문들을 좌측 패딩된 하나의 배치로 토크나이즈해 model.generate 한 번으로 디코딩합니다.
+        배치 추론이 실패하면 질문별 generate_answer로 폴백합니다.
         
         Args:
             questions: 질문 리스트
             instruction: 지시사항
+            max_new_tokens: (선택) 이번 호출의 생성 예산 (설정값보다 작을 때만 적용)
             
         Returns:
             답변 리스트
         """
-        answers = []
-        for question in questions:
-            answer = self.generate_answer(question, instruction)
-            answers.append(answer)
-        return answers
+        if not questions:
+            return []
+        if len(questions) == 1:
+            return [self.generate_answer(questions[0], instruction, max_new_tokens)]
+
+        try:
+            input_texts = [self._build_input_text(q, instruction) for q in questions]
+            # 좌측 패딩: 모든 행의 프롬프트가 같은 위치에서 끝나야 생성 토큰이 정렬됨
+            start = time.perf_counter()
+            inputs = self.tokenizer(
+                input_texts,
+                return_tensors="pt",
+                max_length=512,
+                truncation=True,
+                padding=True
+            )
+            self._observe("tokenize", time.perf_counter() - start)
+            outputs = self._generate(inputs, max_new_tokens)
+
+            input_length = inputs["input_ids"].shape[1]
+            return [self._finish_answer(self._decode_answer(row, input_length), max_new_tokens) for row in outputs]
+
+        except Exception as e:
+            logger.warning(f"배치 추론 실패, 질문별 생성으로 폴백합니다: {e}")
+            return [self.generate_answer(question, instruction, max_new_tokens) for question in questions]
 
 if __name__ == "__main__":
     # 테스트 코드
+    logging.basicConfig(level=logging.INFO)
     qa_model = CriminalQAModel()
     
     test_questions = [
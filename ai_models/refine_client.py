@@ -0,0 +1,277 @@
+"""
+ChatGPT 보강 호출용 클라이언트 계층
+- 명시적 connect/read 타임아웃 + 공유 HTTP 커넥션 풀(httpx)
+- 429/5xx/타임아웃/연결 오류에 대한 지터 지수 백오프 재시도 (Retry-After 존중)
+- 서킷 브레이커: 연속 실패 시 일정 시간 업스트림 호출을 건너뛰고 CircuitOpenError 발생
+  (스트리밍은 끝까지 소비=성공, 도중 예외=실패, 소비자가 중간에 닫음=중립 — half-open 시험 슬롯만 반납)
+- 지연/오류 카운터(stats)
+
+환경변수
+- OPENAI_BASE_URL: 선택, API 엔드포인트 (로컬 스텁 서버 테스트용, 기본 OpenAI)
+- OPENAI_CONNECT_TIMEOUT: 연결 타임아웃(초, 기본 3)
+- OPENAI_READ_TIMEOUT: 응답 읽기 타임아웃(초, 기본 30)
+- OPENAI_MAX_RETRIES: 재시도 횟수 (기본 2)
+- OPENAI_POOL_SIZE: 공유 커넥션 풀 최대 연결 수 (기본 10)
+- OPENAI_BREAKER_FAILURES: 서킷을 여는 연속 실패 횟수 (기본 5)
+- OPENAI_BREAKER_RESET: 서킷이 열린 뒤 재시도(half-open)까지 대기 시간(초, 기본 30)
+"""
+
+import logging
+import os
+import random
+import threading
+import time
+
+import httpx
+import openai
+from openai import OpenAI
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(RuntimeError):
+    """서킷 브레이커가 열려 있어 업스트림 호출을 건너뛰었을 때 발생합니다."""
+
+
+class CircuitBreaker:
+    """연속 실패 횟수 기반 서킷 브레이커 (closed → open → half-open → closed)."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._half_open_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        """호출 허용 여부. half-open 상태에서는 시험 호출 하나만 통과시킵니다."""
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._half_open_in_flight:
+                self._half_open_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._half_open_in_flight = False
+
+    def release(self) -> None:
+        """성공/실패 판정 없이 half-open 시험 슬롯만 반납합니다 (시험 스트림이 중간에 버려진 경우)."""
+        with self._lock:
+            self._half_open_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._half_open_in_flight = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+
+class RefineClient:
+    """chat.completions 호출을 타임아웃/재시도/서킷 브레이커로 감싼 클라이언트."""
+
+    def __init__(self, api_key: str, base_url: str = None, connect_timeout: float = 3.0,
+                 read_timeout: float = 30.0, max_retries: int = 2, pool_size: int = 10,
+                 breaker: CircuitBreaker = None, backoff_base: float = 0.5, backoff_cap: float = 8.0):
+        timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self._http = httpx.Client(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+        )
+        # 재시도는 이 계층에서 직접 수행 (카운터/브레이커 반영을 위해 SDK 재시도는 끔)
+        self._client = OpenAI(api_key=api_key, base_url=base_url, timeout=timeout,
+                              max_retries=0, http_client=self._http)
+        self.max_retries = max(0, max_retries)
+        self.breaker = breaker or CircuitBreaker()
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.successes = 0
+        self.failures = 0
+        self.retries = 0
+        self.short_circuits = 0
+        self.abandoned = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        if isinstance(error, (openai.APITimeoutError, openai.APIConnectionError)):
+            return True
+        if isinstance(error, openai.APIStatusError):
+            return error.status_code in RETRYABLE_STATUS
+        return False
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        """full jitter 지수 백오프. 429/503의 Retry-After가 있으면 그 값을 상한 내에서 우선."""
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_cap)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+
+    def _record(self, ok: bool, elapsed: float) -> None:
+        with self._lock:
+            if ok:
+                self.successes += 1
+            else:
+                self.failures += 1
+            self.latency_total += elapsed
+            self.latency_max = max(self.latency_max, elapsed)
+
+    def create(self, **kwargs):
+        """client.chat.completions.create와 같은 인자. 서킷이 열려 있으면 CircuitOpenError."""
+        if not self.breaker.allow():
+            with self._lock:
+                self.short_circuits += 1
+            raise CircuitOpenError("ChatGPT 업스트림이 불안정해 보강 호출을 건너뜁니다.")
+
+        with self._lock:
+            self.requests += 1
+        start = time.monotonic()
+        attempt = 0
+        while True:
+            try:
+                result = self._client.chat.completions.create(**kwargs)
+            except Exception as e:
+                if attempt < self.max_retries and self._is_retryable(e):
+                    delay = self._backoff(attempt, e)
+                    attempt += 1
+                    with self._lock:
+                        self.retries += 1
+                    logger.warning(f"ChatGPT 호출 실패, {delay:.2f}초 후 재시도 ({attempt}/{self.max_retries}): {e}")
+                    time.sleep(delay)
+                    continue
+                self.breaker.record_failure()
+                self._record(False, time.monotonic() - start)
+                raise
+            if kwargs.get("stream"):
+                return _TrackedStream(self, result, start)
+            self.breaker.record_success()
+            self._record(True, time.monotonic() - start)
+            return result
+
+
+    def stats(self) -> dict:
+        with self._lock:
+            completed = self.successes + self.failures
+            return {
+                "circuit": self.breaker.state,
+                "requests": self.requests,
+                "successes": self.successes,
+                "failures": self.failures,
+                "retries": self.retries,
+                "short_circuits": self.short_circuits,
+                "abandoned_streams": self.abandoned,
+                "latency_avg_ms": round(self.latency_total / completed * 1000, 1) if completed else 0.0,
+                "latency_max_ms": round(self.latency_max * 1000, 1),
+            }
+
+    def close(self) -> None:
+        self._http.close()
+
+
+class _TrackedStream:
+    """스트리밍 응답 래퍼: 결과를 브레이커/카운터에 정확히 한 번 기록합니다.
+
+    끝까지 소비하면 성공, 도중 예외면 실패, 소비 전/도중에 close(또는 GC)되면 중립으로 처리해
+    half-open 시험 슬롯을 반납합니다. 제너레이터와 달리 한 번도 순회하지 않고 버려져도 정리됩니다.
+    """
+
+    def __init__(self, client: RefineClient, stream, start: float):
+        self._client = client
+        self._stream = stream
+        self._iterator = iter(stream)
+        self._start = start
+        self._finished = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self._iterator)
+        except StopIteration:
+            self._finish(True)
+            raise
+        except Exception:
+            self._finish(False)
+            raise
+
+    def _finish(self, ok) -> None:
+        if self._finished:
+            return
+        self._finished = True
+        client = self._client
+        if ok is None:
+            client.breaker.release()
+            with client._lock:
+                client.abandoned += 1
+            return
+        if ok:
+            client.breaker.record_success()
+        else:
+            client.breaker.record_failure()
+        client._record(ok, time.monotonic() - self._start)
+
+    def close(self) -> None:
+        """소비를 중단합니다 (중립 처리 + 업스트림 연결 반납)."""
+        if self._finished:
+            return
+        self._finish(None)
+        close = getattr(self._stream, "close", None)
+        if close is not None:
+            try:
+                close()
+            except Exception as e:
+                logger.debug(f"스트림 종료 중 오류: {e}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __del__(self):
+        self.close()
+
+
+def client_from_env(api_key: str) -> RefineClient:
+    """환경변수 설정으로 RefineClient를 만듭니다."""
+    return RefineClient(
+        api_key=api_key,
+        base_url=os.getenv("OPENAI_BASE_URL") or None,
+        connect_timeout=float(os.getenv("OPENAI_CONNECT_TIMEOUT", "3")),
+        read_timeout=float(os.getenv("OPENAI_READ_TIMEOUT", "30")),
+        max_retries=int(os.getenv("OPENAI_MAX_RETRIES", "2")),
+        pool_size=int(os.getenv("OPENAI_POOL_SIZE", "10")),
+        breaker=CircuitBreaker(
+            failure_threshold=int(os.getenv("OPENAI_BREAKER_FAILURES", "5")),
+            reset_timeout=float(os.getenv("OPENAI_BREAKER_RESET", "30")),
+        ),
+    )
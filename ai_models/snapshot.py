@@ -0,0 +1,199 @@
+"""
+베이스 모델 + LoRA 어댑터 병합 스냅샷 (빠른 시작용)
+
+빌드:
+    python -m ai_models.snapshot --out ai_models/criminal-qa-merged
+    (옵션: --base <베이스 모델 경로>, --adapter <어댑터 경로>, --dtype float16|bfloat16|float32)
+
+빌드 결과 폴더:
+- model*.safetensors / config.json : merge_and_unload()로 LoRA가 합쳐진 가중치
+- tokenizer 파일들                  : 서빙 시 사용하던 토크나이저 (어댑터 토크나이저 우선)
+- snapshot_meta.json                : 베이스 경로/리비전(허브 커밋 또는 로컬 config.json 해시),
+                                      어댑터/토크나이저(원본·스냅샷) 파일 해시, dtype, 생성 시각
+
+서빙:
+- MODEL_SNAPSHOT_PATH=<스냅샷 폴더> 로 지정하면 CriminalQAModel이 스냅샷을 직접(mmap) 로드하고
+  PeftModel 래핑을 건너뜁니다. 베이스 모델 경로/리비전, 어댑터 해시, 토크나이저 해시 중 하나라도
+  스냅샷과 다르면 기존 경로로 폴백합니다 (비교 대상이 없는 배포 환경에서는 해당 항목만 건너뜀).
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+META_FILE = "snapshot_meta.json"
+FORMAT_VERSION = 2  # 2: 베이스 리비전/토크나이저 원본 해시 추가 (1로 만든 스냅샷은 다시 빌드)
+ADAPTER_FILES = ("adapter_config.json", "adapter_model.safetensors", "adapter_model.bin")
+TOKENIZER_FILES = ("tokenizer.json", "tokenizer_config.json", "special_tokens_map.json", "tokenizer.model")
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def files_sha256(directory: str, names: tuple) -> dict:
+    """directory 안에 존재하는 names 파일들의 {파일명: sha256}."""
+    return {
+        name: file_sha256(os.path.join(directory, name))
+        for name in names
+        if os.path.isfile(os.path.join(directory, name))
+    }
+
+
+def tokenizer_source(base_model_path: str, adapter_path: str):
+    """CriminalQAModel과 같은 우선순위로 토크나이저를 읽어 올 폴더 (어댑터 → 베이스, 로컬 폴더가 아니면 None)."""
+    if adapter_path and os.path.exists(os.path.join(adapter_path, "tokenizer.json")):
+        return adapter_path
+    if base_model_path and os.path.isdir(base_model_path):
+        return base_model_path
+    return None
+
+
+def base_model_revision(base_model_path: str):
+    """베이스 모델 식별값: 로컬 폴더는 config.json 해시, 허브 모델은 로컬 캐시의 커밋 해시 (알 수 없으면 None)."""
+    if os.path.isdir(base_model_path):
+        config_path = os.path.join(base_model_path, "config.json")
+        return f"sha256:{file_sha256(config_path)}" if os.path.isfile(config_path) else None
+    try:
+        from huggingface_hub import try_to_load_from_cache
+    except ImportError:
+        return None
+    # 캐시 경로 .../snapshots/<커밋>/config.json 에서 커밋 해시를 읽음 (네트워크 접근 없음)
+    cached = try_to_load_from_cache(base_model_path, "config.json")
+    if not isinstance(cached, str):
+        return None
+    return os.path.basename(os.path.dirname(cached))
+
+
+def _same_model_path(a: str, b: str) -> bool:
+    """허브 ID는 문자열 비교, 로컬 폴더는 실제 경로 비교 (상대/절대 경로 차이 무시)."""
+    if a and b and os.path.isdir(a) and os.path.isdir(b):
+        return os.path.realpath(a) == os.path.realpath(b)
+    return a == b
+
+
+def read_metadata(snapshot_dir: str):
+    path = os.path.join(snapshot_dir, META_FILE)
+    if not os.path.isfile(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def validate_snapshot(snapshot_dir: str, adapter_path: str, base_model_path: str = None):
+    """스냅샷이 현재 베이스 모델/어댑터/토크나이저로 만든 것인지 확인하고 메타데이터를 반환합니다 (불일치 시 None)."""
+    meta = read_metadata(snapshot_dir)
+    if meta is None:
+        logger.warning(f"스냅샷 메타데이터가 없습니다: {os.path.join(snapshot_dir, META_FILE)}")
+        return None
+    if meta.get("format_version") != FORMAT_VERSION:
+        logger.warning(f"지원하지 않는 스냅샷 형식입니다: {meta.get('format_version')}")
+        return None
+    if adapter_path and os.path.isdir(adapter_path):
+        current = files_sha256(adapter_path, ADAPTER_FILES)
+        if current != meta.get("adapter_sha256"):
+            logger.warning("어댑터 파일이 스냅샷 생성 이후 변경되었습니다. 스냅샷을 다시 빌드하세요.")
+            return None
+    else:
+        # 배포 환경에 스냅샷만 있는 경우: 메타데이터를 신뢰
+        logger.warning(f"어댑터 경로가 없어 해시 검증 없이 스냅샷을 사용합니다: {adapter_path}")
+
+    if base_model_path:
+        if not _same_model_path(base_model_path, meta.get("base_model_path")):
+            logger.warning(f"스냅샷의 베이스 모델({meta.get('base_model_path')})이 현재 설정({base_model_path})과 다릅니다.")
+            return None
+        revision = base_model_revision(base_model_path)
+        if revision is not None and meta.get("base_model_revision") not in (None, revision):
+            logger.warning("베이스 모델이 스냅샷 생성 이후 변경되었습니다. 스냅샷을 다시 빌드하세요.")
+            return None
+
+    # 스냅샷에 저장된 토크나이저 자체가 손상/교체되지 않았는지
+    if files_sha256(snapshot_dir, TOKENIZER_FILES) != meta.get("tokenizer_sha256"):
+        logger.warning("스냅샷의 토크나이저 파일이 빌드 당시와 다릅니다. 스냅샷을 다시 빌드하세요.")
+        return None
+    # 원본 토크나이저(어댑터/베이스)가 빌드 이후 바뀌지 않았는지
+    source = tokenizer_source(base_model_path or meta.get("base_model_path"), adapter_path)
+    if source is not None and files_sha256(source, TOKENIZER_FILES) != meta.get("tokenizer_source_sha256"):
+        logger.warning(f"토크나이저 파일이 스냅샷 생성 이후 변경되었습니다 ({source}). 스냅샷을 다시 빌드하세요.")
+        return None
+    return meta
+
+
+def build_snapshot(base_model_path: str, adapter_path: str, output_dir: str, dtype: str = "float16") -> dict:
+    """LoRA를 베이스 가중치에 병합해 safetensors 스냅샷과 메타데이터를 기록합니다."""
+    import torch
+    from transformers import AutoModelForCausalLM, AutoTokenizer
+    from peft import PeftModel
+
+    torch_dtype = getattr(torch, dtype)
+    started = time.time()
+
+    logger.info(f"베이스 모델 로딩 중 ({dtype})...")
+    # 4비트 양자화 가중치에는 LoRA를 병합할 수 없으므로 부동소수점으로 로드
+    model = AutoModelForCausalLM.from_pretrained(
+        base_model_path,
+        torch_dtype=torch_dtype,
+        device_map=None,
+        low_cpu_mem_usage=True
+    )
+
+    # CriminalQAModel._load_model과 같은 우선순위: 어댑터 토크나이저 → 베이스 토크나이저
+    source = tokenizer_source(base_model_path, adapter_path)
+    tokenizer = AutoTokenizer.from_pretrained(source or base_model_path)
+
+    logger.info("LoRA 어댑터 병합 중...")
+    model = PeftModel.from_pretrained(model, adapter_path)
+    model = model.merge_and_unload()
+
+    logger.info(f"스냅샷 저장 중: {output_dir}")
+    os.makedirs(output_dir, exist_ok=True)
+    model.save_pretrained(output_dir, safe_serialization=True)
+    tokenizer.save_pretrained(output_dir)
+
+    weight_files = sorted(f for f in os.listdir(output_dir) if f.endswith(".safetensors"))
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "base_model_path": base_model_path,
+        # 허브 모델은 실제로 로드한 커밋, 로컬 폴더는 config.json 해시
+        "base_model_revision": getattr(model.config, "_commit_hash", None) or base_model_revision(base_model_path),
+        "adapter_path": os.path.abspath(adapter_path),
+        "adapter_sha256": files_sha256(adapter_path, ADAPTER_FILES),
+        "tokenizer_sha256": files_sha256(output_dir, TOKENIZER_FILES),
+        "tokenizer_source_sha256": files_sha256(source, TOKENIZER_FILES) if source else None,
+        "weights": {f: os.path.getsize(os.path.join(output_dir, f)) for f in weight_files},
+        "dtype": dtype,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "build_seconds": round(time.time() - started, 1),
+    }
+    with open(os.path.join(output_dir, META_FILE), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    logger.info(f"스냅샷 빌드 완료 ({meta['build_seconds']}초)")
+    return meta
+
+
+def main():
+    parser = argparse.ArgumentParser(description="베이스 모델 + LoRA 병합 스냅샷 빌드")
+    parser.add_argument("--base", default="beomi/Llama-3-Open-Ko-8B-Instruct-preview", help="베이스 모델 경로")
+    parser.add_argument("--adapter", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "criminal-qa-best"),
+                        help="LoRA 어댑터 경로")
+    parser.add_argument("--out", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "criminal-qa-merged"),
+                        help="스냅샷 출력 폴더")
+    parser.add_argument("--dtype", default="float16", choices=["float16", "bfloat16", "float32"])
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    meta = build_snapshot(args.base, args.adapter, args.out, args.dtype)
+    print(json.dumps(meta, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,7 @@
   - 단, AI 호출 인터페이스(메서드 시그니처) 변경 금지
 """
 
+import logging
 import os
 from flask import Flask, request, jsonify, send_from_directory
 from dotenv import load_dotenv
@@ -22,7 +23,11 @@ from login import bp_login
 from routing.documents import bp_documents
 from logout import bp_logout
 from delete_account import bp_delete
+from logging_setup import configure_logging
+import metrics
 load_dotenv()  # .env 파일 자동 로드
+configure_logging()  # 큐 기반 비동기 JSON 로깅 (LOG_LEVEL/LOG_FORMAT/LOG_LEVELS/LOG_SAMPLE)
+logger = logging.getLogger(__name__)
 
 app = Flask(__name__, static_folder='static', static_url_path='/static')
 app.register_blueprint(bp_base)
@@ -33,6 +38,7 @@ app.register_blueprint(bp_login)
 app.register_blueprint(bp_documents)
 app.register_blueprint(bp_logout)
 app.register_blueprint(bp_delete)
+metrics.init_app(app)  # 라우트별 지연/처리 중 요청 수 (/metrics)
 
 
 
@@ -41,7 +47,11 @@ app.register_blueprint(bp_delete)
 라우팅 구성
 - /                    : index.html 서빙 (routing/base)
 - /health              : 헬스체크 (routing/base)
+- /health/live         : 생존 확인 / /health/ready: 모델 준비 완료 확인 (routing/base)
+- /metrics             : Prometheus 메트릭 (routing/base, metrics.py)
 - /api/chat            : 채팅 처리 (routing/chat)
+- /api/chat/stream     : 채팅 처리 SSE 스트리밍 (routing/chat)
+- /api/chat/turn       : 채팅 처리 + 메시지 서버 저장을 한 번에 (routing/chat)
 - /api/chatrooms       : 채팅방 관리 (routing/chatroom)
 - /signup              : 회원가입 (signup)
 """
@@ -56,17 +66,17 @@ if __name__ == "__main__":
      # 서버 시작 전 DB 연결 테스트
     try:
         db = get_db()
-        print("DB 연결 성공")
+        logger.info("DB 연결 성공")
         db.close()
     except Exception as e:
-        print("DB 연결 실패:", e)
+        logger.error(f"DB 연결 실패: {e}")
 
-    # 모델 로딩 시도 (실패해도 서버는 시작)
+    # 모델 백그라운드 로딩 시작 (완료 전 /api/chat은 503, 실패해도 서버는 시작)
     try:
         from runtime import preload_model_if_configured
-        preload_model_if_configured()
+        preload_model_if_configured(logger)
     except Exception as e:
-        print(f"모델 로딩 실패 (서버는 정상 시작): {e}")
+        logger.warning(f"모델 로딩 실패 (서버는 정상 시작): {e}")
     
-    print(f"Flask 서버 시작: http://{host}:{port}")
+    logger.info(f"Flask 서버 시작: http://{host}:{port}")
     app.run(host=host, port=port, debug=debug)
\ No newline at end of file
@@ -0,0 +1,104 @@
+"""
+JWT 검증 결과 / 사용자 조회 캐시
+- 토큰 캐시: sha256(토큰) → user_id, 만료 시각은 min(지금 + AUTH_TOKEN_CACHE_TTL, 토큰 exp)
+  → 서명 검증(jwt.decode)을 토큰마다 한 번만 수행, 만료된 토큰은 캐시에서도 자동 제거
+- 사용자 캐시: user_id → {id, email, name}, AUTH_USER_CACHE_TTL 동안 재사용
+  → /main, 채팅방 라우트의 get_user_by_id가 대부분 DB를 거치지 않음
+
+무효화
+- 로그아웃: invalidate_token(token)
+- 회원 탈퇴: invalidate_token(token) + invalidate_user(user_id)
+  (토큰 캐시에 남은 다른 토큰도 사용자 캐시 미스 → DB 조회 → 없음으로 처리)
+- 폐기 여부는 verify_jwt_token이 캐시보다 먼저 token_store에서 확인 (워커 간 공유 가능)
+- 캐시는 프로세스별이므로 다른 워커의 사용자 정보는 최대 AUTH_USER_CACHE_TTL 동안 남을 수 있음
+
+환경변수
+- AUTH_CACHE: '1'(기본)이면 사용, '0'이면 매 요청 검증/조회
+- AUTH_TOKEN_CACHE_SIZE: 토큰 캐시 최대 항목 수 (기본 10000)
+- AUTH_TOKEN_CACHE_TTL: 토큰 캐시 최대 유지 시간(초, 기본 300)
+- AUTH_USER_CACHE_SIZE: 사용자 캐시 최대 항목 수 (기본 10000)
+- AUTH_USER_CACHE_TTL: 사용자 캐시 유지 시간(초, 기본 60)
+"""
+
+import hashlib
+import os
+import threading
+import time
+
+from caching import TTLLRUCache
+
+_token_cache = None
+_user_cache = None
+_lock = threading.Lock()
+
+
+def _enabled() -> bool:
+    return os.getenv("AUTH_CACHE", "1") == "1"
+
+
+def _caches():
+    global _token_cache, _user_cache
+    if _token_cache is None:
+        with _lock:
+            if _token_cache is None:
+                _user_cache = TTLLRUCache(
+                    maxsize=int(os.getenv("AUTH_USER_CACHE_SIZE", "10000")),
+                    ttl=float(os.getenv("AUTH_USER_CACHE_TTL", "60")),
+                )
+                _token_cache = TTLLRUCache(
+                    maxsize=int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "10000")),
+                    ttl=float(os.getenv("AUTH_TOKEN_CACHE_TTL", "300")),
+                )
+    return _token_cache, _user_cache
+
+
+def token_key(token: str) -> str:
+    """토큰 원문 대신 해시를 키로 사용 (메모리 덤프/로그에 토큰이 남지 않도록)."""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def get_token_user_id(token: str):
+    """검증된 적 있는 토큰이면 user_id, 아니면 None."""
+    if not _enabled():
+        return None
+    return _caches()[0].get(token_key(token))
+
+
+def put_token(token: str, user_id, exp=None) -> None:
+    """검증된 토큰을 캐시합니다. exp(UNIX 초)가 있으면 그 시각 이후로는 캐시하지 않습니다."""
+    if not _enabled():
+        return
+    token_cache = _caches()[0]
+    expires_at = time.time() + token_cache.ttl
+    if exp is not None:
+        expires_at = min(expires_at, float(exp))
+    if expires_at > time.time():
+        token_cache.set(token_key(token), user_id, expires_at=expires_at)
+
+
+def get_user(user_id):
+    if not _enabled():
+        return None
+    return _caches()[1].get(user_id)
+
+
+def put_user(user_id, row: dict) -> None:
+    if _enabled() and row:
+        _caches()[1].set(user_id, row)
+
+
+def invalidate_token(token: str) -> None:
+    if _token_cache is not None and token:
+        _token_cache.delete(token_key(token))
+
+
+def invalidate_user(user_id) -> None:
+    if _user_cache is not None and user_id is not None:
+        _user_cache.delete(user_id)
+
+
+def auth_cache_stats() -> dict:
+    """토큰/사용자 캐시 적중률 등 (아직 사용 전이면 enabled만)."""
+    if _token_cache is None:
+        return {"enabled": _enabled()}
+    return {"enabled": _enabled(), "tokens": _token_cache.stats(), "users": _user_cache.stats()}
@@ -0,0 +1,86 @@
+"""
+멀티턴 대화 벤치마크: 채팅방 KV 캐시(이어서 prefill) vs 매 턴 전체 대화 재-prefill
+
+같은 대화를 --turns 턴 진행하면서 턴별 지연과 prefill 토큰 수를 비교합니다.
+- warm: ConversationCache가 이전 턴의 past_key_values를 재사용 → 새 턴 토큰만 prefill
+- cold: 매 턴 캐시 없이 지금까지의 대화 기록(DB에서 읽은 것과 같은 형태)으로 전체 prefill
+
+사용법:
+    python -m benchmarks.make_tiny_checkpoint --out /tmp/tiny
+    python -m benchmarks.bench_conversation --base /tmp/tiny/base --adapter /tmp/tiny/adapter --turns 10
+
+생성은 그리디 + min_new_tokens = max_new_tokens로 고정해 두 방식이 같은 수의 토큰을 디코딩합니다.
+warm 지연은 대화 길이와 무관하게 거의 일정하고, cold 지연은 대화가 길어질수록 증가해야 합니다.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from conversation_cache import ConversationCache  # noqa: E402
+
+QUESTIONS = [
+    "절도죄의 구성요건은 무엇인가요?",
+    "그렇다면 강도죄와 절도죄의 차이점은 무엇인가요?",
+    "앞에서 말한 불법영득의사는 어떻게 판단하나요?",
+    "사용절도는 처벌되나요?",
+    "친족 간의 절도는 어떻게 되나요?",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base", default=None, help="베이스 모델 경로 (기본: CriminalQAModel 기본값)")
+    parser.add_argument("--adapter", default=None, help="LoRA 어댑터 경로 (기본: ai_models/criminal-qa-best)")
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument("--max-new-tokens", type=int, default=32)
+    parser.add_argument("--max-tokens", type=int, default=8192, help="대화 토큰 예산 (잘라내기 없이 비교하려면 크게)")
+    args = parser.parse_args()
+
+    from ai_models.criminal_qa_model import CriminalQAModel
+
+    kwargs = {}
+    if args.base:
+        kwargs["base_model_path"] = args.base
+    if args.adapter:
+        kwargs["adapter_path"] = args.adapter
+    model = CriminalQAModel(**kwargs)
+    config = model.generation_config
+    config.update(do_sample=False, max_new_tokens=args.max_new_tokens, min_new_tokens=args.max_new_tokens)
+    config.pop("temperature", None)
+    config.pop("top_p", None)
+
+    questions = [QUESTIONS[i % len(QUESTIONS)] for i in range(args.turns)]
+    history = []
+    warm = ConversationCache(model, max_tokens=args.max_tokens)
+    cold = ConversationCache(model, max_tokens=args.max_tokens, load_history=lambda room, limit: list(history),
+                             history_turns=args.turns)
+    model.conversation_ids([], questions[0])  # 토크나이저 워밍업
+    warm.answer("warmup", questions[0])
+    warm.drop("warmup")
+
+    print(f"{'turn':>4} {'warm_ms':>9} {'warm_prefill':>12} {'cold_ms':>9} {'cold_prefill':>12}")
+    for turn, question in enumerate(questions, 1):
+        before = warm.stats()["prefill_tokens"]
+        t0 = time.perf_counter()
+        answer = warm.answer(1, question)
+        warm_ms = (time.perf_counter() - t0) * 1000
+        warm_prefill = warm.stats()["prefill_tokens"] - before
+
+        cold.clear()  # 매 턴 콜드: 기록에서 전체 재구성
+        before = cold.stats()["prefill_tokens"]
+        t0 = time.perf_counter()
+        cold.answer(1, question)
+        cold_ms = (time.perf_counter() - t0) * 1000
+        cold_prefill = cold.stats()["prefill_tokens"] - before
+        history.append((question, answer))
+
+        print(f"{turn:>4} {warm_ms:>9.1f} {warm_prefill:>12} {cold_ms:>9.1f} {cold_prefill:>12}")
+    print(f"warm: {warm.stats()}")
+
+
+if __name__ == "__main__":
+    main()
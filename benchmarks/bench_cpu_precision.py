@@ -0,0 +1,115 @@
+"""
+CPU 추론 정밀도(CPU_PRECISION) 비교 벤치마크: fp32 / bf16 / int8
+
+사용법:
+    python -m benchmarks.bench_cpu_precision --modes fp32 bf16 int8 --max-new-tokens 64
+    (스냅샷 사용 시 MODEL_SNAPSHOT_PATH를 함께 지정)
+
+모드마다 새 프로세스에서 GPU를 숨기고(CUDA_VISIBLE_DEVICES="") 모델을 로드합니다.
+생성은 그리디 디코딩(do_sample=False)으로 고정해 모드 간 답변을 직접 비교합니다.
+
+측정 항목:
+- 로드 직후 상주 메모리 RSS / 프로세스 최대 RSS (GB, getrusage ru_maxrss — 로드와 생성 중 최고치)
+- 생성 처리량 (tokens/s)
+- fp32 대비 답변 차이: 완전 일치 비율, 토큰 시퀀스 유사도 평균(difflib)
+"""
+
+import argparse
+import difflib
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+QUESTIONS = [
+    "절도죄의 구성요건은 무엇인가요?",
+    "강도죄와 절도죄의 차이점은 무엇인가요?",
+    "정당방위가 인정되는 요건을 설명해 주세요.",
+    "사기죄에서 기망행위란 무엇인가요?",
+    "명예훼손죄와 모욕죄는 어떻게 다른가요?",
+]
+
+# 자식 프로세스에서 실행되는 측정 코드 (결과를 마지막 줄에 JSON으로 출력)
+CHILD = """
+import json, resource, sys, time
+import psutil
+from ai_models.criminal_qa_model import CriminalQAModel
+base, adapter, max_new_tokens = sys.argv[1], sys.argv[2], int(sys.argv[3])
+questions = json.loads(sys.argv[4])
+process = psutil.Process()
+model = CriminalQAModel(base_model_path=base, adapter_path=adapter)
+rss_loaded = process.memory_info().rss
+config = model.generation_config
+config.update(do_sample=False, max_new_tokens=max_new_tokens)
+config.pop("temperature", None)
+config.pop("top_p", None)
+model.generate_answer(questions[0])  # 워밍업
+answers, token_ids, elapsed = [], [], 0.0
+for question in questions:
+    start = time.perf_counter()
+    answer = model.generate_answer(question)
+    elapsed += time.perf_counter() - start
+    answers.append(answer)
+    token_ids.append(model.tokenizer.encode(answer, add_special_tokens=False))
+print(json.dumps({
+    "precision": model.cpu_precision,
+    "rss_loaded_gb": rss_loaded / 1024 ** 3,
+    # ru_maxrss: Linux는 KB, macOS는 바이트 단위
+    "rss_peak_gb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+                   / 1024 ** 3,
+    "tokens": sum(len(ids) for ids in token_ids),
+    "seconds": elapsed,
+    "answers": answers,
+    "token_ids": token_ids,
+}, ensure_ascii=False))
+"""
+
+
+def run_mode(mode: str, base: str, adapter: str, max_new_tokens: int, questions: list) -> dict:
+    env = dict(os.environ)
+    env["CPU_PRECISION"] = mode
+    env["CUDA_VISIBLE_DEVICES"] = ""
+    env["PYTHONPATH"] = ROOT + os.pathsep + env.get("PYTHONPATH", "")
+    proc = subprocess.run(
+        [sys.executable, "-c", CHILD, base, adapter, str(max_new_tokens), json.dumps(questions, ensure_ascii=False)],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def drift(reference: dict, result: dict) -> tuple:
+    """(완전 일치 비율, 토큰 시퀀스 유사도 평균)"""
+    exact = sum(a == b for a, b in zip(reference["answers"], result["answers"])) / len(result["answers"])
+    ratios = [difflib.SequenceMatcher(a=a, b=b, autojunk=False).ratio()
+              for a, b in zip(reference["token_ids"], result["token_ids"])]
+    return exact, sum(ratios) / len(ratios)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base", default="beomi/Llama-3-Open-Ko-8B-Instruct-preview", help="베이스 모델 경로")
+    parser.add_argument("--adapter", default=os.path.join(ROOT, "ai_models", "criminal-qa-best"), help="LoRA 어댑터 경로")
+    parser.add_argument("--modes", nargs="+", default=["fp32", "bf16", "int8"], choices=["fp32", "bf16", "int8"])
+    parser.add_argument("--max-new-tokens", type=int, default=64)
+    parser.add_argument("--show-answers", action="store_true", help="모드별 첫 답변 출력")
+    args = parser.parse_args()
+
+    modes = args.modes if "fp32" in args.modes else ["fp32"] + args.modes  # 차이 비교 기준
+    results = {mode: run_mode(mode, args.base, args.adapter, args.max_new_tokens, QUESTIONS) for mode in modes}
+    reference = results["fp32"]
+
+    print(f"{'mode':<6} {'rss load':>9} {'rss peak':>9} {'tokens/s':>9} {'exact':>7} {'similarity':>11}")
+    for mode in modes:
+        result = results[mode]
+        exact, similarity = drift(reference, result)
+        tps = result["tokens"] / result["seconds"] if result["seconds"] else 0.0
+        print(f"{mode:<6} {result['rss_loaded_gb']:>7.2f}GB {result['rss_peak_gb']:>7.2f}GB {tps:>9.1f} "
+              f"{exact:>7.0%} {similarity:>11.3f}")
+        if args.show_answers:
+            print(f"       {result['answers'][0][:120]!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+CriminalQAModel 추론 마이크로 벤치마크: 배치 크기 × 프롬프트 길이 × 정밀도 스윕
+
+CPU만 있는 환경에서는 초소형 체크포인트로, 운영 장비에서는 실제 8B 모델로 같은 하네스를 실행합니다.
+
+    python -m benchmarks.make_tiny_checkpoint --out /tmp/tiny
+    python -m benchmarks.bench_inference --base /tmp/tiny/base --adapter /tmp/tiny/adapter \\
+        --batch-sizes 1 4 8 --prompt-tokens 32 256 --dtypes fp32 bf16 int8 --out results/inference.json
+
+    # 운영 장비 (GPU): 기본 경로의 모델/어댑터, 정밀도는 모델 로딩 규칙을 따름
+    python -m benchmarks.bench_inference --dtypes auto --batch-sizes 1 8 --out results/inference-gpu.json
+
+정밀도마다 새 프로세스에서 모델을 로드합니다. fp32/bf16/int8은 CPU_PRECISION으로 적용되며 GPU를 숨기고,
+auto는 환경 그대로 로드합니다. 생성은 그리디 + min_new_tokens = max_new_tokens로 고정해
+모든 설정이 같은 수의 토큰을 디코딩합니다.
+
+측정 항목 (설정별, --repeats 회 중앙값):
+- ttft_ms: 토큰화 + prefill (첫 토큰까지)
+- per_token_ms: 디코딩 스텝당 지연 (배치 전체가 한 스텝 진행하는 시간)
+- tokens_per_s: 생성 토큰 수 / 전체 시간 (배치 합계)
+- rss_mb / rss_peak_mb, vram_peak_mb (CUDA일 때)
+
+결과는 --out JSON 파일로 저장합니다 (meta + results 목록).
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SENTENCE = "피고인이 타인의 재물을 절취한 경우 절도죄의 구성요건과 위법성, 책임을 순서대로 검토합니다. "
+
+# 자식 프로세스에서 실행되는 측정 코드 (설정별 결과를 한 줄씩 JSON으로 출력)
+CHILD = """
+import json, resource, statistics, sys, time
+import psutil, torch
+from ai_models.criminal_qa_model import CriminalQAModel
+
+args = json.loads(sys.argv[1])
+kwargs = {"adapter_path": args["adapter"]}
+if args["base"]:
+    kwargs["base_model_path"] = args["base"]
+start = time.perf_counter()
+model = CriminalQAModel(**kwargs)
+load_s = time.perf_counter() - start
+process = psutil.Process()
+
+config = model.generation_config
+config.update(do_sample=False, max_new_tokens=args["max_new_tokens"], min_new_tokens=args["max_new_tokens"])
+config.pop("temperature", None)
+config.pop("top_p", None)
+
+stages = []
+model.stage_observer = lambda stage, seconds, tokens: stages.append((stage, seconds, tokens))
+
+def question_of(n_tokens):
+    ids = model.tokenizer.encode(args["sentence"] * (n_tokens // 8 + 2), add_special_tokens=False)[:n_tokens]
+    return model.tokenizer.decode(ids)
+
+def run(questions):
+    stages.clear()
+    t0 = time.perf_counter()
+    if len(questions) == 1:
+        model.generate_answer(questions[0])
+    else:
+        model.batch_generate(questions)
+    total = time.perf_counter() - t0
+    seconds = {stage: s for stage, s, _ in stages}
+    tokens = sum(t for stage, _, t in stages if stage == "decode")
+    return total, seconds, tokens
+
+print(json.dumps({"event": "loaded", "load_s": load_s, "precision": model.cpu_precision,
+                  "cuda": model.is_model_on_cuda, "snapshot": model.snapshot_path}), flush=True)
+for prompt_tokens in args["prompt_tokens"]:
+    question = question_of(prompt_tokens)
+    for batch_size in args["batch_sizes"]:
+        questions = [question] * batch_size
+        run(questions)  # 워밍업
+        if torch.cuda.is_available():
+            torch.cuda.reset_peak_memory_stats()
+        samples = [run(questions) for _ in range(args["repeats"])]
+        ttft = [s.get("tokenize", 0.0) + s.get("prefill", 0.0) for _, s, _ in samples]
+        steps = max(1, args["max_new_tokens"] - 1)
+        per_token = [s.get("decode", 0.0) / steps for _, s, _ in samples]
+        throughput = [tokens / total for total, _, tokens in samples if total > 0]
+        print(json.dumps({
+            "event": "result",
+            "batch_size": batch_size,
+            "prompt_tokens": prompt_tokens,
+            "input_tokens": len(model.tokenizer(model._build_input_text(question, "형사법 질문에 답변하세요"))["input_ids"]),
+            "max_new_tokens": args["max_new_tokens"],
+            "ttft_ms": statistics.median(ttft) * 1000,
+            "per_token_ms": statistics.median(per_token) * 1000,
+            "tokens_per_s": statistics.median(throughput) if throughput else 0.0,
+            "total_s": statistics.median(total for total, _, _ in samples),
+            "rss_mb": process.memory_info().rss / 2 ** 20,
+            "rss_peak_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+            "vram_peak_mb": torch.cuda.max_memory_allocated() / 2 ** 20 if torch.cuda.is_available() else None,
+        }), flush=True)
+"""
+
+
+def run_dtype(dtype: str, args) -> list:
+    env = dict(os.environ)
+    if dtype != "auto":
+        env["CPU_PRECISION"] = dtype
+        env["CUDA_VISIBLE_DEVICES"] = ""  # CPU 정밀도 비교는 GPU를 숨기고 실행
+    child_args = {
+        "base": args.base,
+        "adapter": args.adapter,
+        "batch_sizes": args.batch_sizes,
+        "prompt_tokens": args.prompt_tokens,
+        "max_new_tokens": args.max_new_tokens,
+        "repeats": args.repeats,
+        "sentence": SENTENCE,
+    }
+    proc = subprocess.run(
+        [sys.executable, "-c", CHILD, json.dumps(child_args)],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    rows, loaded = [], {}
+    for line in proc.stdout.splitlines():
+        if not line.startswith("{"):
+            continue
+        event = json.loads(line)
+        if event.pop("event") == "loaded":
+            loaded = event
+        else:
+            rows.append({"dtype": dtype, **loaded, **event})
+    if proc.returncode != 0:
+        print(f"[{dtype}] 실패 (exit {proc.returncode}):\n{proc.stderr[-2000:]}", file=sys.stderr)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base", default=None, help="베이스 모델 경로 (기본: CriminalQAModel 기본값)")
+    parser.add_argument("--adapter", default=None, help="LoRA 어댑터 경로 (기본: ai_models/criminal-qa-best)")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--prompt-tokens", type=int, nargs="+", default=[32, 256],
+                        help="질문 길이(토큰, 프롬프트 템플릿 제외)")
+    parser.add_argument("--dtypes", nargs="+", default=["fp32", "bf16", "int8"],
+                        choices=["fp32", "bf16", "int8", "auto"])
+    parser.add_argument("--max-new-tokens", type=int, default=32)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--out", default=os.path.join("benchmarks", "results", "inference.json"))
+    args = parser.parse_args()
+
+    results = []
+    for dtype in args.dtypes:
+        rows = run_dtype(dtype, args)
+        results.extend(rows)
+        for row in rows:
+            print(f"{dtype:<5} batch={row['batch_size']:<3} prompt={row['input_tokens']:<5} "
+                  f"ttft={row['ttft_ms']:8.1f}ms per_token={row['per_token_ms']:7.2f}ms "
+                  f"tput={row['tokens_per_s']:8.1f} tok/s rss_peak={row['rss_peak_mb']:7.0f}MB"
+                  + (f" vram_peak={row['vram_peak_mb']:.0f}MB" if row["vram_peak_mb"] is not None else ""))
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump({
+            "meta": {
+                "saved_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "host": platform.node(),
+                "python": platform.python_version(),
+                "args": vars(args),
+            },
+            "results": results,
+        }, f, ensure_ascii=False, indent=2)
+    print(f"결과 저장: {args.out} ({len(results)}개 설정)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+로깅 호출 지연 벤치마크: 동기 StreamHandler vs logging_setup(큐 + 리스너 스레드)
+
+출력 대상이 느린 상황(write 한 번에 --sink-ms 지연)을 흉내 내고,
+요청 스레드 입장에서 logger.info 한 번에 걸리는 시간을 잽니다.
+
+사용법:
+    python -m benchmarks.bench_logging --records 2000 --threads 4 --sink-ms 1
+
+측정 항목: 호출 지연 p50/p99 (µs), 버린 레코드 수(큐 가득 참)
+"""
+
+import argparse
+import logging
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import logging_setup  # noqa: E402
+
+
+def percentile(values: list, p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+class SlowSink:
+    """write마다 지정한 시간만큼 지연되는 출력 대상 (느린 디스크/네트워크 수집기 흉내)."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.lines = 0
+
+    def write(self, text: str) -> None:
+        time.sleep(self.delay)
+        self.lines += text.count("\n")
+
+    def flush(self) -> None:
+        pass
+
+
+def run(label: str, records: int, threads: int) -> None:
+    logger = logging.getLogger("bench.login")
+    latencies = []
+    lock = threading.Lock()
+
+    def worker():
+        local = []
+        for i in range(records // threads):
+            t0 = time.perf_counter()
+            logger.info("로그인 성공", extra={"user_id": i, "token": "eyJhbGciOiJIUzI1NiJ9.e30.sig"})
+            local.append((time.perf_counter() - t0) * 1e6)
+        with lock:
+            latencies.extend(local)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    print(f"{label:<6}: p50={percentile(latencies, 0.5):8.1f}µs p99={percentile(latencies, 0.99):8.1f}µs "
+          f"stats={logging_setup.logging_stats()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--sink-ms", type=float, default=1.0, help="출력 한 줄당 지연(ms)")
+    args = parser.parse_args()
+
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+
+    sync_sink = SlowSink(args.sink_ms / 1000)
+    handler = logging.StreamHandler(sync_sink)
+    handler.setFormatter(logging_setup.JsonFormatter())
+    root.addHandler(handler)
+    run("sync", args.records, args.threads)
+    root.removeHandler(handler)
+
+    queue_sink = SlowSink(args.sink_ms / 1000)
+    logging_setup.configure_logging(queue_sink)
+    run("queue", args.records, args.threads)
+    start = time.perf_counter()
+    logging_setup.shutdown_logging()
+    print(f"queue : 남은 레코드 출력에 {time.perf_counter() - start:.2f}s, 출력 {queue_sink.lines}줄")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+로그인 폭주 벤치마크: 요청 스레드에서 직접 해시 검증 vs 제한된 해시 풀(passwords.PasswordHasher)
+
+DB/모델 없이 해시 검증만 재현합니다. --logins개의 로그인 스레드가 계속 비밀번호를 검증하는 동안
+채팅 요청 대용 스레드가 짧은 CPU 작업(JSON 직렬화 + 토큰화 흉내)을 반복하며 지연을 잽니다.
+
+사용법:
+    python -m benchmarks.bench_login_storm --logins 16 --seconds 10 --workers 2
+
+측정 항목 (모드별):
+- 로그인 처리량 (logins/s)
+- 채팅 요청 지연 p50/p99 (ms) — 기준선(로그인 없음)과 비교
+- 해시 풀 모드의 거절 수 (PasswordHashBusy)
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from werkzeug.security import check_password_hash, generate_password_hash  # noqa: E402
+
+from passwords import PasswordHashBusy, PasswordHasher  # noqa: E402
+
+
+def percentile(values: list, p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+def chat_request() -> None:
+    # 라우트 처리 중 파이썬 코드 부분(JSON 직렬화, 문자열 처리)을 흉내 낸 고정 작업
+    payload = {"question": "절도죄의 구성요건은 무엇인가요?", "answer": "형법 제329조 " * 50}
+    for _ in range(20):
+        json.loads(json.dumps(payload, ensure_ascii=False))
+        payload["answer"].split()
+
+
+def run(label: str, verify, logins: int, seconds: float) -> None:
+    stop = threading.Event()
+    counts = {"ok": 0, "busy": 0}
+    lock = threading.Lock()
+    chat_latencies = []
+
+    def login_worker():
+        while not stop.is_set():
+            try:
+                verify()
+                key = "ok"
+            except PasswordHashBusy:
+                key = "busy"
+                time.sleep(0.01)
+            with lock:
+                counts[key] += 1
+
+    def chat_worker():
+        while not stop.is_set():
+            t0 = time.perf_counter()
+            chat_request()
+            chat_latencies.append((time.perf_counter() - t0) * 1000)
+            time.sleep(0.005)
+
+    threads = [threading.Thread(target=login_worker) for _ in range(logins)]
+    threads.append(threading.Thread(target=chat_worker))
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<10}: logins={counts['ok'] / elapsed:6.1f}/s busy={counts['busy']:<5} | "
+          f"chat p50={percentile(chat_latencies, 0.5):.2f}ms p99={percentile(chat_latencies, 0.99):.2f}ms "
+          f"(n={len(chat_latencies)})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=16, help="동시 로그인 스레드 수")
+    parser.add_argument("--seconds", type=float, default=10.0, help="모드별 측정 시간")
+    parser.add_argument("--workers", type=int, default=2, help="해시 풀 크기 (PASSWORD_HASH_WORKERS)")
+    parser.add_argument("--method", default="scrypt", help="해시 방식 (PASSWORD_HASH_METHOD)")
+    parser.add_argument("--pool", choices=["thread", "process"], default="thread")
+    args = parser.parse_args()
+
+    stored = generate_password_hash("correct horse", method=args.method)
+    print(f"method={stored.split('$', 1)[0]} logins={args.logins} workers={args.workers} pool={args.pool}")
+
+    run("baseline", lambda: None, 0, args.seconds)
+    run("inline", lambda: check_password_hash(stored, "correct horse"), args.logins, args.seconds)
+
+    hasher = PasswordHasher(method=args.method, workers=args.workers, pool=args.pool,
+                            max_pending=args.workers * 4, timeout=30.0)
+    run("pool", lambda: hasher.verify(stored, "correct horse"), args.logins, args.seconds)
+    print(f"pool stats: {hasher.stats()}")
+    hasher.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+유사 질문 캐시(SemanticCache) 조회 지연 벤치마크
+
+사용법:
+    python -m benchmarks.bench_semantic_cache --size 100000 --lookups 2000
+
+측정 항목:
+- 일괄 적재 처리량 (insert_many, 질문/초)
+- 서비스 경로 삽입 지연 (insert, 중복 검사 = 조회 한 번 포함)
+- 조회 지연 p50/p95/p99 (ms) — 임베딩 + 행렬-벡터 곱 + argmax 포함
+- 벡터 행렬 메모리 (MB)
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from semantic_cache import SemanticCache  # noqa: E402
+
+CRIMES = ["절도죄", "강도죄", "사기죄", "횡령죄", "배임죄", "살인죄", "상해죄", "폭행죄", "협박죄", "명예훼손죄"]
+TOPICS = ["구성요건", "처벌 수위", "공소시효", "미수범 처벌", "판례 경향", "친고죄 여부", "양형 기준", "위법성 조각사유"]
+FORMS = ["{c}의 {t}은 무엇인가요?", "{c} {t} 알려주세요", "{c}에서 {t}는 어떻게 되나요?", "{c}의 {t}에 대해 설명해 주세요"]
+
+
+def make_question(rng: random.Random, i: int) -> str:
+    return rng.choice(FORMS).format(c=rng.choice(CRIMES), t=rng.choice(TOPICS)) + f" (사례 {i})"
+
+
+def percentile(values: list, p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100000, help="캐시에 채울 질문 수")
+    parser.add_argument("--lookups", type=int, default=2000, help="측정할 조회 횟수")
+    parser.add_argument("--dim", type=int, default=256, help="임베딩 차원")
+    parser.add_argument("--threshold", type=float, default=0.95)
+    parser.add_argument("--mmap-path", default=None, help="지정 시 벡터 행렬을 파일에 메모리 매핑")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    cache = SemanticCache(dim=args.dim, capacity=args.size, threshold=args.threshold, mmap_path=args.mmap_path)
+
+    # 채우기는 중복 검사 없는 일괄 적재 (항목마다 전체 검색하면 O(n²))
+    items = [(make_question(rng, i), {"answer": f"답변 {i}", "refined": False}) for i in range(args.size)]
+    start = time.perf_counter()
+    cache.insert_many(items)
+    insert_elapsed = time.perf_counter() - start
+
+    latencies = []
+    for i in range(args.lookups):
+        question = make_question(rng, rng.randrange(args.size))
+        t0 = time.perf_counter()
+        cache.lookup(question)
+        latencies.append((time.perf_counter() - t0) * 1000)
+
+    insert_latencies = []
+    for i in range(min(args.lookups, 200)):
+        # 서비스 경로: 미적중 후 답변 저장 (중복 검사 포함)
+        question = make_question(rng, args.size + i)
+        t0 = time.perf_counter()
+        cache.insert(question, {"answer": "새 답변", "refined": False})
+        insert_latencies.append((time.perf_counter() - t0) * 1000)
+
+    stats = cache.stats()
+    print(f"cached questions : {stats['size']:,} (dim={args.dim}, mmap={'yes' if args.mmap_path else 'no'})")
+    print(f"matrix memory    : {args.size * args.dim * 4 / 1024 ** 2:.1f} MB")
+    print(f"bulk load rate   : {args.size / insert_elapsed:,.0f} questions/s")
+    print(f"insert latency   : p50={percentile(insert_latencies, 0.50):.2f}ms "
+          f"p99={percentile(insert_latencies, 0.99):.2f}ms (dedupe)")
+    print(f"lookup latency   : p50={percentile(latencies, 0.50):.2f}ms "
+          f"p95={percentile(latencies, 0.95):.2f}ms p99={percentile(latencies, 0.99):.2f}ms")
+    print(f"hit rate         : {stats['hit_rate']:.2%} (threshold={args.threshold})")
+
+
+if __name__ == "__main__":
+    main()
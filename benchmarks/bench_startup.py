@@ -0,0 +1,73 @@
+"""
+모델 시작 시간 벤치마크: 베이스 + LoRA 어댑터 로딩 vs 병합 스냅샷 로딩
+
+사용법:
+    python -m ai_models.snapshot --out ai_models/criminal-qa-merged
+    python -m benchmarks.bench_startup --snapshot ai_models/criminal-qa-merged --runs 3
+
+각 실행은 새 프로세스에서 수행합니다 (페이지 캐시는 공유되므로 두 번째 실행부터는 warm 시작).
+
+측정 항목:
+- 모델 생성(가중치 + 토크나이저 + 어댑터 로딩) 시간 (s)
+- 첫 generate_answer 지연 (s)
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 자식 프로세스에서 실행되는 측정 코드 (결과를 마지막 줄에 JSON으로 출력)
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+from ai_models.criminal_qa_model import CriminalQAModel
+model = CriminalQAModel(base_model_path=sys.argv[1], adapter_path=sys.argv[2])
+loaded = time.perf_counter()
+model.generation_config["max_new_tokens"] = int(sys.argv[3])
+model.generate_answer("절도죄의 구성요건은 무엇인가요?")
+done = time.perf_counter()
+print(json.dumps({"load_s": loaded - start, "first_generate_s": done - loaded,
+                  "snapshot": model.snapshot_path is not None}))
+"""
+
+
+def run_once(base: str, adapter: str, snapshot: str, max_new_tokens: int) -> dict:
+    env = dict(os.environ)
+    env.pop("MODEL_SNAPSHOT_PATH", None)
+    if snapshot:
+        env["MODEL_SNAPSHOT_PATH"] = snapshot
+    env["PYTHONPATH"] = ROOT + os.pathsep + env.get("PYTHONPATH", "")
+    proc = subprocess.run(
+        [sys.executable, "-c", CHILD, base, adapter, str(max_new_tokens)],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base", default="beomi/Llama-3-Open-Ko-8B-Instruct-preview", help="베이스 모델 경로")
+    parser.add_argument("--adapter", default=os.path.join(ROOT, "ai_models", "criminal-qa-best"), help="LoRA 어댑터 경로")
+    parser.add_argument("--snapshot", default=os.path.join(ROOT, "ai_models", "criminal-qa-merged"),
+                        help="병합 스냅샷 폴더")
+    parser.add_argument("--runs", type=int, default=3, help="모드별 실행 횟수")
+    parser.add_argument("--max-new-tokens", type=int, default=16, help="첫 생성에서 만들 토큰 수")
+    args = parser.parse_args()
+
+    for label, snapshot in (("base+adapter", None), ("snapshot", args.snapshot)):
+        results = [run_once(args.base, args.adapter, snapshot, args.max_new_tokens) for _ in range(args.runs)]
+        if snapshot and not all(r["snapshot"] for r in results):
+            print(f"{label:<13}: 스냅샷 검증 실패로 기존 경로가 사용되었습니다. 스냅샷을 다시 빌드하세요.")
+            continue
+        loads = [r["load_s"] for r in results]
+        firsts = [r["first_generate_s"] for r in results]
+        print(f"{label:<13}: load min={min(loads):.2f}s avg={sum(loads) / len(loads):.2f}s | "
+              f"first generate min={min(firsts):.2f}s avg={sum(firsts) / len(firsts):.2f}s")
+
+
+if __name__ == "__main__":
+    main()
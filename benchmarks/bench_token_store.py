@@ -0,0 +1,99 @@
+"""
+폐기 토큰 저장소 벤치마크: memory vs sqlite
+
+사용법:
+    python -m benchmarks.bench_token_store --tokens 1000000 --lookups 100000
+
+측정 항목 (백엔드별):
+- 폐기 등록 처리량 (tokens/s, revoke_many를 --chunk 단위로 호출)
+- is_revoked 지연 p50/p99 (µs) — 폐기된 토큰(hit) / 정상 토큰(miss)
+- 메모리 증가량 (RSS, MB) 및 SQLite 파일 크기
+- 만료 버킷 제거 시간 (purge)
+"""
+
+import argparse
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from token_store import MemoryRevocationStore, SQLiteRevocationStore  # noqa: E402
+
+
+def percentile(values: list, p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def lookup_latencies(store, tokens: list) -> list:
+    latencies = []
+    for token in tokens:
+        t0 = time.perf_counter()
+        store.is_revoked(token)
+        latencies.append((time.perf_counter() - t0) * 1e6)
+    return latencies
+
+
+def run(label: str, store, n_tokens: int, n_lookups: int, chunk: int, ttl: float) -> None:
+    # 실제 JWT 길이와 비슷한 임의 문자열 (해시 키만 저장되므로 내용은 무관)
+    now = time.time()
+    tokens = [f"eyJhbGciOiJIUzI1NiJ9.{i:012d}.{random.getrandbits(128):032x}" for i in range(n_tokens)]
+    exps = [now + random.uniform(1, ttl) for _ in range(n_tokens)]
+
+    rss_before = rss_mb()
+    start = time.perf_counter()
+    for i in range(0, n_tokens, chunk):
+        store.revoke_many(zip(tokens[i:i + chunk], exps[i:i + chunk]))
+    elapsed = time.perf_counter() - start
+    rss_after = rss_mb()
+
+    hits = lookup_latencies(store, random.sample(tokens, min(n_lookups, n_tokens)))
+    misses = lookup_latencies(store, [f"fresh.{i}.{random.getrandbits(64):x}" for i in range(n_lookups)])
+
+    t0 = time.perf_counter()
+    store.purge()
+    purge_ms = (time.perf_counter() - t0) * 1000
+
+    size = ""
+    if isinstance(store, SQLiteRevocationStore):
+        size = f" | file={os.path.getsize(store.path) / 2**20:.1f}MB"
+    print(f"{label:<7}: {n_tokens} revoked in {elapsed:.2f}s ({n_tokens / elapsed:,.0f}/s) | "
+          f"hit p50={percentile(hits, 0.5):.1f}µs p99={percentile(hits, 0.99):.1f}µs | "
+          f"miss p50={percentile(misses, 0.5):.1f}µs p99={percentile(misses, 0.99):.1f}µs | "
+          f"purge={purge_ms:.1f}ms | rss +{rss_after - rss_before:.0f}MB{size}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=100_000)
+    parser.add_argument("--chunk", type=int, default=10_000, help="revoke_many 한 번에 넣을 토큰 수")
+    parser.add_argument("--ttl", type=float, default=3600.0, help="토큰 exp 범위(초)")
+    parser.add_argument("--backend", choices=["memory", "sqlite", "all"], default="all")
+    args = parser.parse_args()
+
+    if args.backend in ("memory", "all"):
+        run("memory", MemoryRevocationStore(), args.tokens, args.lookups, args.chunk, args.ttl)
+    if args.backend in ("sqlite", "all"):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = SQLiteRevocationStore(os.path.join(tmp, "revoked.sqlite3"))
+            run("sqlite", store, args.tokens, args.lookups, args.chunk, args.ttl)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+ChatMessage 저장 벤치마크: 동기 INSERT+COMMIT vs 지연 쓰기(WriteBehindWriter)
+
+로컬 MySQL이 필요합니다 (DB_HOST/DB_PORT/DB_USER/DB_PASSWORD/DB_NAME, 스키마는 python -m migrations upgrade).
+측정용 사용자/채팅방을 만들고 끝나면 삭제합니다 (ON DELETE CASCADE로 메시지도 삭제).
+
+사용법:
+    python -m benchmarks.bench_write_behind --messages 2000 --threads 8
+
+측정 항목:
+- 요청 스레드 기준 저장 지연 p50/p99 (ms) — 동기 모드는 INSERT+COMMIT, 지연 쓰기는 큐 적재
+- 전체 소요 시간 (마지막 행 커밋까지)
+- 서버 COMMIT 횟수 (SHOW GLOBAL STATUS Com_commit 증가분, 다른 부하가 없을 때 정확)
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db_connection import INSERT_CHAT_MESSAGE_SQL, _connect, connection  # noqa: E402
+from message_writer import WriteBehindWriter  # noqa: E402
+
+
+def percentile(values: list, p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+def commit_count() -> int:
+    conn = _connect()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SHOW GLOBAL STATUS LIKE 'Com_commit'")
+            return int(cursor.fetchone()["Value"])
+    finally:
+        conn.close()
+
+
+def sync_insert(row) -> None:
+    with connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(INSERT_CHAT_MESSAGE_SQL, row)
+        conn.commit()
+
+
+def run(label: str, save, messages: int, threads: int, row, finish=None) -> None:
+    latencies = []
+    lock = threading.Lock()
+    per_thread = messages // threads
+
+    def worker():
+        local = []
+        for _ in range(per_thread):
+            t0 = time.perf_counter()
+            save(row)
+            local.append((time.perf_counter() - t0) * 1000)
+        with lock:
+            latencies.extend(local)
+
+    commits_before = commit_count()
+    start = time.perf_counter()
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    if finish is not None:
+        finish()
+    elapsed = time.perf_counter() - start
+    commits = commit_count() - commits_before
+    print(f"{label:<12}: {len(latencies)} msgs in {elapsed:.2f}s | save p50={percentile(latencies, 0.5):.2f}ms "
+          f"p99={percentile(latencies, 0.99):.2f}ms | commits={commits}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--rows", type=int, default=100, help="지연 쓰기 한 번에 저장할 최대 행 수")
+    parser.add_argument("--interval-ms", type=float, default=50.0, help="지연 쓰기 최대 대기 시간")
+    args = parser.parse_args()
+
+    conn = _connect()
+    user_id = None
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("INSERT INTO User (email, password, name) VALUES (%s, %s, %s)",
+                           (f"bench-{uuid.uuid4().hex}@example.com", "x", "bench"))
+            user_id = cursor.lastrowid
+            cursor.execute("INSERT INTO ChatRoom (user_id, title) VALUES (%s, %s)", (user_id, "bench"))
+            room_id = cursor.lastrowid
+        conn.commit()
+
+        row = (user_id, room_id, "절도죄의 구성요건은 무엇인가요?", "벤치마크 응답 " * 20)
+        run("sync", sync_insert, args.messages, args.threads, row)
+
+        writer = WriteBehindWriter(flush_rows=args.rows, flush_interval_ms=args.interval_ms)
+        run("write-behind", lambda r: writer.submit(*r), args.messages, args.threads, row, finish=writer.flush)
+        writer.close()
+        print(f"write-behind stats: {writer.stats()}")
+    finally:
+        if user_id is not None:
+            with conn.cursor() as cursor:
+                cursor.execute("DELETE FROM User WHERE id = %s", (user_id,))
+            conn.commit()
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+RefineClient 동작 점검 (로컬 스텁 chat.completions 서버 대상)
+
+사용법:
+    python -m benchmarks.check_refine_client
+
+시나리오:
+1) 정상 응답 / 스트리밍
+2) 503 응답 → 재시도 소진 후 실패 기록
+3) 읽기 타임아웃 → 지정 시간 안에 실패
+4) 연속 실패로 서킷 오픈 → 업스트림 호출 없이 CircuitOpenError
+5) reset 시간 경과 후 half-open 시험 호출 성공 → 서킷 닫힘
+6) half-open 시험 스트림을 중간에 닫음 → 시험 슬롯 반납(중립), 다음 호출이 통과해 서킷 닫힘
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_models.refine_client import CircuitBreaker, CircuitOpenError, RefineClient  # noqa: E402
+from benchmarks.stub_openai import start_stub_server  # noqa: E402
+
+MESSAGES = [{"role": "user", "content": "절도죄의 구성요건은 무엇인가요?"}]
+
+
+def check(name, condition):
+    print(f"[{'OK' if condition else 'FAIL'}] {name}")
+    return condition
+
+
+def main():
+    server, base_url = start_stub_server()
+    config = server.config
+    client = RefineClient(
+        api_key="stub", base_url=base_url, connect_timeout=1.0, read_timeout=0.5,
+        max_retries=2, breaker=CircuitBreaker(failure_threshold=2, reset_timeout=1.0),
+        backoff_base=0.05, backoff_cap=0.2,
+    )
+    results = []
+
+    resp = client.create(model="stub", messages=MESSAGES)
+    results.append(check("정상 응답", resp.choices[0].message.content == config.answer))
+    text = "".join(c.choices[0].delta.content or "" for c in client.create(model="stub", messages=MESSAGES, stream=True)
+                   if c.choices)
+    results.append(check("스트리밍 응답", text == config.answer))
+
+    config.fail_rate = 1.0
+    before = config.requests
+    try:
+        client.create(model="stub", messages=MESSAGES)
+        results.append(check("503 재시도 후 실패", False))
+    except Exception:
+        results.append(check("503 재시도 후 실패 (요청 3회)", config.requests - before == 3))
+
+    config.fail_rate = 0.0
+    config.latency_ms = 2000
+    start = time.monotonic()
+    try:
+        client.create(model="stub", messages=MESSAGES)
+        results.append(check("읽기 타임아웃", False))
+    except Exception:
+        elapsed = time.monotonic() - start
+        results.append(check(f"읽기 타임아웃 ({elapsed:.2f}s, 재시도 포함)", elapsed < 2.5))
+    results.append(check("서킷 오픈", client.breaker.state == "open"))
+
+    before = config.requests
+    try:
+        client.create(model="stub", messages=MESSAGES)
+        results.append(check("서킷 오픈 시 단락", False))
+    except CircuitOpenError:
+        results.append(check("서킷 오픈 시 업스트림 호출 없이 단락", config.requests == before))
+
+    config.latency_ms = 0
+    time.sleep(1.1)
+    resp = client.create(model="stub", messages=MESSAGES)
+    results.append(check("half-open 시험 호출 후 서킷 닫힘", client.breaker.state == "closed"))
+
+    # 서킷을 다시 열고, half-open 시험 스트림을 첫 청크만 읽고 버림
+    config.fail_rate = 1.0
+    for _ in range(2):
+        try:
+            client.create(model="stub", messages=MESSAGES)
+        except Exception:
+            pass
+    config.fail_rate = 0.0
+    results.append(check("서킷 재오픈", client.breaker.state == "open"))
+    time.sleep(1.1)
+    stream = client.create(model="stub", messages=MESSAGES, stream=True)
+    next(stream)
+    stream.close()
+    results.append(check("시험 스트림 중도 종료 후 half-open 유지 (실패로 기록하지 않음)",
+                         client.breaker.state == "half_open"))
+    try:
+        client.create(model="stub", messages=MESSAGES)
+        results.append(check("중도 종료 뒤 시험 슬롯 반납 → 다음 호출 통과, 서킷 닫힘",
+                             client.breaker.state == "closed"))
+    except CircuitOpenError:
+        results.append(check("중도 종료 뒤 시험 슬롯 반납", False))
+
+    print(client.stats())
+    client.close()
+    server.shutdown()
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+유사 질문 캐시(SemanticCache) 적중/오적중 점검
+
+사용법:
+    python -m benchmarks.check_semantic_cache
+
+점검 시나리오 (기본 임계값 0.95):
+1) 같은 뜻의 다른 표현(조사/의문형 어미/동의어 차이)은 적중
+2) 띄어쓰기/구두점만 다른 질문은 적중
+3) 죄명이 다른 질문(절도죄 ↔ 강도죄)은 유사도와 무관하게 미적중
+4) 조문 번호가 다른 질문은 미적중
+5) 같은 죄명이라도 묻는 내용이 다르면(요건 ↔ 공소시효) 미적중
+6) 네임스페이스가 다르면 미적중
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from semantic_cache import SemanticCache  # noqa: E402
+
+CACHED = "절도죄 요건이 뭐예요?"
+HITS = [
+    "절도죄의 구성요건은 무엇인가요?",
+    "절도죄 성립요건 알려주세요",
+    "절도죄 요건이 뭐예요",
+    "절도죄,요건이 뭐예요??",
+]
+MISSES = [
+    "강도죄 요건이 뭐예요?",
+    "강도죄의 구성요건은 무엇인가요?",
+    "절도죄와 강도죄 요건이 뭐예요?",
+    "절도죄 공소시효가 뭐예요?",
+    "절도 요건이 뭐예요?",
+]
+
+
+def check(name: str, condition: bool) -> bool:
+    print(f"[{'OK' if condition else 'FAIL'}] {name}")
+    return condition
+
+
+def main():
+    cache = SemanticCache()
+    cache.insert(CACHED, "절도죄 답변", namespace="ns")
+    cache.insert("형법 제329조의 내용은 무엇인가요?", "제329조 답변", namespace="ns")
+
+    results = []
+    for question in HITS:
+        value, score = cache.lookup(question, namespace="ns")
+        results.append(check(f"적중: {question!r} (유사도 {score:.3f})", value == "절도죄 답변"))
+    for question in MISSES:
+        value, score = cache.lookup(question, namespace="ns")
+        results.append(check(f"미적중: {question!r} (유사도 {score:.3f})", value is None))
+
+    value, _ = cache.lookup("형법 제 329조 내용이 뭐예요", namespace="ns")
+    results.append(check("같은 조문 적중", value == "제329조 답변"))
+    value, _ = cache.lookup("형법 제330조의 내용은 무엇인가요?", namespace="ns")
+    results.append(check("다른 조문 미적중", value is None))
+    value, _ = cache.lookup(HITS[0], namespace="other")
+    results.append(check("다른 네임스페이스 미적중", value is None))
+
+    print(cache.stats())
+    if not all(results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,400 @@
+"""
+HTTP 부하 테스트: 실제 app(등록된 블루프린트 전체)을 띄우고 GPU/OpenAI 없이 처리량과 꼬리 지연을 측정
+
+대역(stand-in)
+- 모델: FakeCriminalQAModel — 질문 해시로 정해지는 결정적 답변, 토큰당 --token-ms 지연
+  (--weak-rate 비율의 질문은 짧은 답변 → is_weak → 보강 호출)
+- OpenAI: benchmarks.stub_openai 스텁 서버 (--refine-ms 지연), OPENAI_BASE_URL로 연결
+- MySQL: DB_HOST/DB_PORT/DB_USER/DB_PASSWORD 서버에 일회용 데이터베이스(mcs_load_xxxx)를 만들고
+  python -m migrations 스키마를 적용한 뒤, 끝나면 삭제 (--keep-db로 유지)
+  로컬 서버가 없으면 예: docker run --rm -p 3306:3306 -e MYSQL_ROOT_PASSWORD=1234 mysql:8
+  DB가 필요 없는 조합(--mix chat=1)이면 MySQL 없이 실행
+
+트래픽 조합 (--mix, 가중치)
+- login: POST /login          - chat: POST /api/chat
+- save: POST /chat/message    - messages: GET /chat/messages/<room>
+- rooms: GET /api/chatrooms/user/<user>
+
+사용법:
+    python -m benchmarks.loadtest --duration 30 --concurrency 16 --save benchmarks/results/baseline.json
+    python -m benchmarks.loadtest --duration 30 --concurrency 16 --compare benchmarks/results/baseline.json
+
+shed 열은 수락 제어(admission.py)가 429/503으로 거절한 요청 수입니다 (err에는 포함하지 않음).
+과부하 동작을 보려면 예: ADMISSION_MAX_ACTIVE=2 ADMISSION_MAX_QUEUE=4 --concurrency 32 --mix chat=1
+
+--compare는 엔드포인트별 p50/p95/p99, RPS 변화를 출력하고, p95가 --max-regression(기본 20%) 넘게
+나빠졌으면 종료 코드 1을 반환합니다.
+"""
+
+import argparse
+import hashlib
+import http.client
+import json
+import os
+import platform
+import random
+import sys
+import threading
+import time
+import uuid
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.stub_openai import start_stub_server  # noqa: E402
+
+DEFAULT_MIX = "login=5,chat=30,save=30,messages=20,rooms=15"
+DB_ENDPOINTS = {"login", "save", "messages", "rooms"}
+
+QUESTIONS = [
+    "절도죄의 구성요건은 무엇인가요?",
+    "강도죄와 절도죄의 차이점은 무엇인가요?",
+    "형사법에서 자백의 증거능력은 어떻게 되나요?",
+    "정당방위가 인정되는 요건은 무엇인가요?",
+    "사기죄에서 기망행위란 무엇인가요?",
+    "미수범은 어떻게 처벌되나요?",
+    "공소시효는 어떻게 계산하나요?",
+    "긴급체포의 요건은 무엇인가요?",
+]
+
+
+class FakeCriminalQAModel:
+    """CriminalQAModel과 같은 공개 인터페이스를 가진 결정적 가짜 모델 (GPU/가중치 불필요)."""
+
+    def __init__(self, token_ms: float = 5.0, max_new_tokens: int = 64, weak_rate: float = 0.2):
+        self.token_delay = token_ms / 1000.0
+        self.weak_rate = weak_rate
+        self.adapter_path = "fake-adapter"
+        self.snapshot_path = None
+        self.cpu_precision = "fp32"
+        self.is_model_on_cuda = False
+        self.stage_observer = None
+        self.generation_config = dict(max_new_tokens=max_new_tokens, do_sample=False)
+
+    def _tokens(self, question: str, max_new_tokens: int = None) -> list:
+        digest = hashlib.sha256(question.encode("utf-8")).digest()
+        n = min(max_new_tokens or self.generation_config["max_new_tokens"], self.generation_config["max_new_tokens"])
+        if digest[0] / 255.0 < self.weak_rate:
+            n = max(1, n // 8)  # 짧은 답변 → is_weak
+        # 충분히 긴 답변은 300자를 넘도록 토큰당 약 6자
+        return [f"형법{digest[i % len(digest)]:03d} " for i in range(n)]
+
+    def stream_answer(self, question: str, instruction: str = "형사법 질문에 답변하세요", max_new_tokens: int = None):
+        for token in self._tokens(question, max_new_tokens):
+            time.sleep(self.token_delay)
+            yield token
+
+    def generate_answer(self, question: str, instruction: str = "형사법 질문에 답변하세요",
+                        max_new_tokens: int = None) -> str:
+        return "".join(self.stream_answer(question, instruction, max_new_tokens)).strip()
+
+    def batch_generate(self, questions: list, instruction: str = "형사법 질문에 답변하세요",
+                       max_new_tokens: int = None) -> list:
+        # 배치는 가장 긴 행만큼 디코딩 스텝이 돈다고 보고 한 번만 대기
+        answers = [self._tokens(q, max_new_tokens) for q in questions]
+        time.sleep(self.token_delay * max((len(a) for a in answers), default=0))
+        return ["".join(a).strip() for a in answers]
+
+
+def percentile(values: list, p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))] if ordered else 0.0
+
+
+def parse_mix(text: str) -> list:
+    mix = []
+    for item in text.split(","):
+        name, weight = item.split("=")
+        mix.append((name.strip(), float(weight)))
+    return mix
+
+
+# ---- 일회용 MySQL 데이터베이스 ----
+
+def create_throwaway_database() -> str:
+    import pymysql
+
+    name = f"mcs_load_{uuid.uuid4().hex[:8]}"
+    conn = pymysql.connect(
+        host=os.getenv("DB_HOST", "localhost"),
+        port=int(os.getenv("DB_PORT", "3306")),
+        user=os.getenv("DB_USER", "root"),
+        password=os.getenv("DB_PASSWORD", "1234"),
+        charset="utf8mb4",
+    )
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(f"CREATE DATABASE `{name}` CHARACTER SET utf8mb4")
+    finally:
+        conn.close()
+    os.environ["DB_NAME"] = name
+
+    import migrations
+    migrations.upgrade()
+    return name
+
+
+def drop_database(name: str) -> None:
+    import pymysql
+
+    conn = pymysql.connect(
+        host=os.getenv("DB_HOST", "localhost"),
+        port=int(os.getenv("DB_PORT", "3306")),
+        user=os.getenv("DB_USER", "root"),
+        password=os.getenv("DB_PASSWORD", "1234"),
+    )
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(f"DROP DATABASE IF EXISTS `{name}`")
+    finally:
+        conn.close()
+
+
+# ---- 앱 기동 ----
+
+def boot_app(fake_model):
+    """실제 app 모듈을 가짜 모델로 띄우고 (server, port)를 반환합니다."""
+    from werkzeug.serving import make_server
+
+    import runtime
+    runtime._create_model = lambda: fake_model
+    runtime.start_model_loading()
+    if runtime.get_model() is not fake_model:
+        raise RuntimeError(f"가짜 모델 주입 실패: {runtime.model_status()}")
+
+    import app as app_module
+    server = make_server("127.0.0.1", 0, app_module.app, threaded=True)
+    threading.Thread(target=server.serve_forever, name="loadtest-http", daemon=True).start()
+    return server, server.server_port
+
+
+class Client:
+    """스레드별 keep-alive HTTP 연결."""
+
+    def __init__(self, port: int):
+        self.port = port
+        self.conn = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+
+    def request(self, method: str, path: str, body=None, headers=None):
+        payload = json.dumps(body).encode("utf-8") if body is not None else None
+        headers = dict(headers or {})
+        if payload is not None:
+            headers["Content-Type"] = "application/json"
+        try:
+            self.conn.request(method, path, body=payload, headers=headers)
+            response = self.conn.getresponse()
+            data = response.read()
+        except (http.client.HTTPException, OSError):
+            # 서버가 연결을 닫았으면 다시 연결해 한 번 재시도
+            self.conn.close()
+            self.conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=120)
+            self.conn.request(method, path, body=payload, headers=headers)
+            response = self.conn.getresponse()
+            data = response.read()
+        return response.status, data
+
+
+def seed_users(port: int, count: int) -> list:
+    """회원가입 → 로그인 → 채팅방 생성으로 부하용 사용자를 만듭니다."""
+    import jwt
+
+    client = Client(port)
+    users = []
+    for i in range(count):
+        email = f"load-{uuid.uuid4().hex[:10]}@example.com"
+        password = f"pw-{i}-{uuid.uuid4().hex[:6]}"
+        status, _ = client.request("POST", "/signup", {"email": email, "password": password, "name": f"load{i}"})
+        if status != 201:
+            raise RuntimeError(f"회원가입 실패: HTTP {status}")
+        status, data = client.request("POST", "/login", {"email": email, "password": password})
+        if status != 200:
+            raise RuntimeError(f"로그인 실패: HTTP {status}")
+        token = json.loads(data)["token"]
+        user_id = jwt.decode(token, options={"verify_signature": False})["user_id"]
+        status, data = client.request("POST", "/api/chatrooms", {"user_id": user_id, "title": "load"})
+        if status != 201:
+            raise RuntimeError(f"채팅방 생성 실패: HTTP {status}")
+        users.append({"email": email, "password": password, "user_id": user_id,
+                      "room_id": json.loads(data)["room_id"]})
+    return users
+
+
+def make_actions(users: list) -> dict:
+    def login(client, rng):
+        user = rng.choice(users)
+        return client.request("POST", "/login", {"email": user["email"], "password": user["password"]})
+
+    def chat(client, rng):
+        question = f"{rng.choice(QUESTIONS)} ({rng.randrange(1000)})"
+        return client.request("POST", "/api/chat", {"message": question})
+
+    def save(client, rng):
+        user = rng.choice(users)
+        return client.request("POST", "/chat/message", {
+            "user_id": user["user_id"], "chat_room_id": user["room_id"],
+            "question": rng.choice(QUESTIONS), "response": "부하 테스트 응답 " * 20,
+        })
+
+    def messages(client, rng):
+        return client.request("GET", f"/chat/messages/{rng.choice(users)['room_id']}?limit=50")
+
+    def rooms(client, rng):
+        return client.request("GET", f"/api/chatrooms/user/{rng.choice(users)['user_id']}")
+
+    return {"login": login, "chat": chat, "save": save, "messages": messages, "rooms": rooms}
+
+
+def drive(port: int, actions: dict, mix: list, concurrency: int, duration: float, seed: int) -> dict:
+    names = [name for name, _ in mix]
+    weights = [weight for _, weight in mix]
+    results = {name: {"latencies": [], "errors": 0, "shed": 0} for name in names}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(index):
+        rng = random.Random(seed + index)
+        client = Client(port)
+        local = {name: ([], 0, 0) for name in names}
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights)[0]
+            start = time.perf_counter()
+            try:
+                status, _ = actions[name](client, rng)
+                ok = status < 400
+                shed = status in (429, 503)
+            except Exception:
+                ok, shed = False, False
+            elapsed = (time.perf_counter() - start) * 1000
+            latencies, errors, shed_count = local[name]
+            latencies.append(elapsed)
+            local[name] = (latencies, errors + (0 if ok or shed else 1), shed_count + (1 if shed else 0))
+        with lock:
+            for name, (latencies, errors, shed_count) in local.items():
+                results[name]["latencies"].extend(latencies)
+                results[name]["errors"] += errors
+                results[name]["shed"] += shed_count
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    report = {}
+    all_latencies = []
+    for name, data in results.items():
+        latencies = data["latencies"]
+        all_latencies.extend(latencies)
+        report[name] = summarize(latencies, data["errors"], elapsed, data["shed"])
+    report["total"] = summarize(all_latencies, sum(d["errors"] for d in results.values()), elapsed,
+                                sum(d["shed"] for d in results.values()))
+    return report
+
+
+def summarize(latencies: list, errors: int, elapsed: float, shed: int = 0) -> dict:
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "shed": shed,
+        "rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50), 2),
+        "p95_ms": round(percentile(latencies, 0.95), 2),
+        "p99_ms": round(percentile(latencies, 0.99), 2),
+    }
+
+
+def print_report(report: dict) -> None:
+    print(f"{'endpoint':<10} {'reqs':>7} {'err':>5} {'shed':>5} {'rps':>8} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for name, row in report.items():
+        print(f"{name:<10} {row['requests']:>7} {row['errors']:>5} {row.get('shed', 0):>5} {row['rps']:>8.1f} "
+              f"{row['p50_ms']:>7.1f}ms {row['p95_ms']:>7.1f}ms {row['p99_ms']:>7.1f}ms")
+
+
+def compare(report: dict, baseline: dict, max_regression: float) -> bool:
+    """기준선 대비 변화를 출력하고, p95가 허용치를 넘게 나빠진 엔드포인트가 없으면 True."""
+    ok = True
+    print(f"\n기준선 비교 ({baseline.get('saved_at', '?')})")
+    for name, row in report.items():
+        base = baseline["results"].get(name)
+        if not base or not base["requests"]:
+            continue
+        deltas = []
+        for key in ("p50_ms", "p95_ms", "p99_ms", "rps"):
+            change = (row[key] - base[key]) / base[key] if base[key] else 0.0
+            deltas.append(f"{key}={change:+.0%}")
+        regressed = base["p95_ms"] and (row["p95_ms"] - base["p95_ms"]) / base["p95_ms"] > max_regression
+        ok = ok and not regressed
+        print(f"{name:<10} {' '.join(deltas)}{'  ← p95 회귀' if regressed else ''}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=30.0, help="측정 시간(초)")
+    parser.add_argument("--concurrency", type=int, default=16, help="동시 클라이언트 수")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="엔드포인트 가중치 (예: chat=1,save=1)")
+    parser.add_argument("--users", type=int, default=20, help="미리 만들 사용자/채팅방 수")
+    parser.add_argument("--token-ms", type=float, default=5.0, help="가짜 모델의 토큰당 지연")
+    parser.add_argument("--max-new-tokens", type=int, default=64)
+    parser.add_argument("--weak-rate", type=float, default=0.2, help="보강이 필요한 짧은 답변 비율")
+    parser.add_argument("--refine-ms", type=float, default=200.0, help="스텁 OpenAI 응답 지연")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--keep-db", action="store_true", help="일회용 데이터베이스를 삭제하지 않음")
+    parser.add_argument("--save", help="결과를 기준선 JSON으로 저장")
+    parser.add_argument("--compare", help="기준선 JSON과 비교")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="허용 p95 악화 비율")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    needs_db = any(name in DB_ENDPOINTS for name, _ in mix)
+
+    # 실제 앱 설정 중 부하 측정을 왜곡하는 것만 끔 (답변 캐시 → 모델 경로 측정, 사전 로딩 → 가짜 모델 주입)
+    os.environ.setdefault("ANSWER_CACHE", "0")
+    os.environ["PRELOAD_MODEL"] = "0"
+    os.environ["MODEL_WARMUP"] = "0"
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ.setdefault("LOG_LEVELS", "werkzeug=WARNING")  # 요청마다 찍히는 접근 로그
+
+    stub, base_url = start_stub_server(latency_ms=args.refine_ms)
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ.setdefault("OPENAI_API_KEY", "loadtest")
+
+    db_name = create_throwaway_database() if needs_db else None
+    try:
+        model = FakeCriminalQAModel(args.token_ms, args.max_new_tokens, args.weak_rate)
+        server, port = boot_app(model)
+        users = seed_users(port, args.users) if needs_db else []
+        print(f"app=127.0.0.1:{port} db={db_name or '-'} users={len(users)} mix={args.mix} "
+              f"concurrency={args.concurrency} duration={args.duration}s")
+
+        report = drive(port, make_actions(users), mix, args.concurrency, args.duration, args.seed)
+        server.shutdown()
+        print_report(report)
+        print(f"stub openai: requests={stub.config.requests} failures={stub.config.failures}")
+    finally:
+        stub.shutdown()
+        if db_name and not args.keep_db:
+            drop_database(db_name)
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({
+                "saved_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "host": platform.node(),
+                "args": vars(args),
+                "results": report,
+            }, f, ensure_ascii=False, indent=2)
+        print(f"기준선 저장: {args.save}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if not compare(report, baseline, args.max_regression):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+CPU 전용 환경에서 벤치마크/스모크 테스트용 초소형 Llama 체크포인트 + 더미 LoRA 어댑터 생성
+
+CriminalQAModel이 그대로 로드할 수 있는 구조(베이스 디렉터리 + PEFT 어댑터 디렉터리)를 만듭니다.
+가중치는 무작위라 답변 내용은 의미가 없고, 지연/메모리/처리량 측정 경로 확인용입니다.
+
+사용법:
+    python -m benchmarks.make_tiny_checkpoint --out /tmp/tiny
+    python -m benchmarks.bench_inference --base /tmp/tiny/base --adapter /tmp/tiny/adapter
+"""
+
+import argparse
+import os
+
+CORPUS = [
+    "절도죄의 구성요건은 무엇인가요?",
+    "강도죄와 절도죄의 차이점은 무엇인가요?",
+    "주어진 질문에 적합한 내용의 답변을 생성합니다",
+    "지시 : 형사법 질문에 답변하세요",
+]
+
+SPECIAL_TOKENS = ["<|begin_of_text|>", "<|end_of_text|>", "<|start_header_id|>", "<|end_header_id|>", "<|eot_id|>"]
+
+# Llama-3 Instruct와 같은 형식의 채팅 템플릿 (CriminalQAModel._build_input_text가 사용)
+CHAT_TEMPLATE = (
+    "{{ bos_token }}{% for m in messages %}<|start_header_id|>{{ m['role'] }}<|end_header_id|>\n\n"
+    "{{ m['content'] }}<|eot_id|>{% endfor %}"
+)
+
+
+def build_tokenizer(vocab_size: int):
+    from tokenizers import Tokenizer, decoders, models, pre_tokenizers, trainers
+    from tokenizers.processors import TemplateProcessing
+    from transformers import PreTrainedTokenizerFast
+
+    tokenizer = Tokenizer(models.BPE())
+    tokenizer.pre_tokenizer = pre_tokenizers.ByteLevel(add_prefix_space=False)
+    tokenizer.decoder = decoders.ByteLevel()
+    trainer = trainers.BpeTrainer(
+        vocab_size=vocab_size,
+        special_tokens=SPECIAL_TOKENS,
+        initial_alphabet=pre_tokenizers.ByteLevel.alphabet(),
+    )
+    tokenizer.train_from_iterator(CORPUS * 50, trainer)
+    tokenizer.post_processor = TemplateProcessing(
+        single="<|begin_of_text|> $A", special_tokens=[("<|begin_of_text|>", 0)]
+    )
+    fast = PreTrainedTokenizerFast(tokenizer_object=tokenizer, bos_token="<|begin_of_text|>", eos_token="<|eot_id|>")
+    fast.chat_template = CHAT_TEMPLATE
+    return fast
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", required=True, help="출력 디렉터리 (base/, adapter/ 생성)")
+    parser.add_argument("--hidden", type=int, default=64)
+    parser.add_argument("--layers", type=int, default=2)
+    parser.add_argument("--heads", type=int, default=4)
+    parser.add_argument("--vocab", type=int, default=600)
+    parser.add_argument("--max-positions", type=int, default=2048)
+    parser.add_argument("--lora-rank", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    import torch
+    from peft import LoraConfig, get_peft_model
+    from transformers import LlamaConfig, LlamaForCausalLM
+
+    tokenizer = build_tokenizer(args.vocab)
+    config = LlamaConfig(
+        vocab_size=len(tokenizer),
+        hidden_size=args.hidden,
+        intermediate_size=args.hidden * 2,
+        num_hidden_layers=args.layers,
+        num_attention_heads=args.heads,
+        num_key_value_heads=max(1, args.heads // 2),
+        max_position_embeddings=args.max_positions,
+        bos_token_id=tokenizer.bos_token_id,
+        eos_token_id=tokenizer.eos_token_id,
+    )
+    torch.manual_seed(args.seed)
+    model = LlamaForCausalLM(config)
+
+    base_dir = os.path.join(args.out, "base")
+    adapter_dir = os.path.join(args.out, "adapter")
+    model.save_pretrained(base_dir)
+    tokenizer.save_pretrained(base_dir)
+
+    # init_lora_weights=False: 0이 아닌 LoRA 가중치 → 어댑터 적용/병합 경로가 실제로 결과를 바꿈
+    peft_model = get_peft_model(
+        model, LoraConfig(r=args.lora_rank, target_modules=["q_proj", "v_proj"], init_lora_weights=False)
+    )
+    peft_model.save_pretrained(adapter_dir)
+
+    params = sum(p.numel() for p in model.parameters())
+    print(f"base: {base_dir} ({params / 1e6:.2f}M params)")
+    print(f"adapter: {adapter_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+chat.completions API를 흉내 내는 로컬 스텁 HTTP 서버
+
+refine_with_chatgpt / RefineClient를 OpenAI 없이 시험·부하 측정할 때 사용합니다.
+OPENAI_BASE_URL=http://127.0.0.1:<port>/v1 로 지정하면 됩니다.
+
+사용법:
+    python -m benchmarks.stub_openai --port 8089 --latency-ms 200 --fail-rate 0.1
+
+코드에서:
+    server, base_url = start_stub_server(latency_ms=50)
+    ...
+    server.shutdown()
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_ANSWER = (
+    "개요: 질문하신 쟁점에 대한 보강 답변입니다.\n"
+    "핵심 쟁점: 구성요건과 위법성, 책임을 순서대로 검토합니다.\n"
+    "※ 본 답변은 일반 정보이며 법률 자문이 아닙니다."
+)
+
+
+class StubConfig:
+    """스텁 서버 동작 설정 (실행 중에도 바꿀 수 있음)."""
+
+    def __init__(self, latency_ms=0.0, fail_rate=0.0, fail_status=503, answer=DEFAULT_ANSWER,
+                 stream_chunk_chars=8, retry_after=None):
+        self.latency_ms = latency_ms
+        self.fail_rate = fail_rate
+        self.fail_status = fail_status
+        self.answer = answer
+        self.stream_chunk_chars = stream_chunk_chars
+        self.retry_after = retry_after
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.failures = 0
+
+
+def _make_handler(config: StubConfig):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):  # noqa: A002 - BaseHTTPRequestHandler 시그니처
+            pass
+
+        def _send_json(self, status, payload, headers=None):
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            try:
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                # 클라이언트가 타임아웃으로 먼저 끊은 경우
+                self.close_connection = True
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            request = json.loads(self.rfile.read(length) or b"{}")
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self._send_json(404, {"error": {"message": "not found"}})
+                return
+
+            with config.lock:
+                config.requests += 1
+                fail = random.random() < config.fail_rate
+                if fail:
+                    config.failures += 1
+            if config.latency_ms:
+                time.sleep(config.latency_ms / 1000.0)
+            if fail:
+                headers = {"Retry-After": str(config.retry_after)} if config.retry_after is not None else None
+                self._send_json(config.fail_status, {"error": {"message": "stub failure", "type": "server_error"}},
+                                headers)
+                return
+
+            model = request.get("model", "stub-model")
+            created = int(time.time())
+            if request.get("stream"):
+                self._stream(model, created)
+                return
+            self._send_json(200, {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": config.answer},
+                    "finish_reason": "stop",
+                }],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+            })
+
+        def _stream(self, model, created):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+            step = max(1, config.stream_chunk_chars)
+            try:
+                for i in range(0, len(config.answer), step):
+                    chunk = {
+                        "id": "chatcmpl-stub",
+                        "object": "chat.completion.chunk",
+                        "created": created,
+                        "model": model,
+                        "choices": [{"index": 0, "delta": {"content": config.answer[i:i + step]},
+                                     "finish_reason": None}],
+                    }
+                    self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+    return Handler
+
+
+def start_stub_server(host="127.0.0.1", port=0, **config_kwargs):
+    """백그라운드 스레드로 스텁 서버를 띄우고 (server, base_url)을 반환합니다.
+
+    server.config로 실행 중 동작을 바꿀 수 있고, server.shutdown()으로 종료합니다.
+    """
+    config = StubConfig(**config_kwargs)
+    server = ThreadingHTTPServer((host, port), _make_handler(config))
+    server.daemon_threads = True
+    server.config = config
+    thread = threading.Thread(target=server.serve_forever, name="stub-openai", daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}/v1"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="응답 전 지연(ms)")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="실패 응답 비율 (0~1)")
+    parser.add_argument("--fail-status", type=int, default=503, help="실패 시 HTTP 상태 코드")
+    parser.add_argument("--retry-after", type=float, default=None, help="실패 응답의 Retry-After(초)")
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(
+        host=args.host, port=args.port, latency_ms=args.latency_ms, fail_rate=args.fail_rate,
+        fail_status=args.fail_status, retry_after=args.retry_after,
+    )
+    print(f"stub chat-completions server: OPENAI_BASE_URL={base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+"""
+답변 캐시 유틸
+- 질문 정규화(normalize_question) 및 캐시 키 생성(answer_namespace, make_answer_key)
+- 스레드 안전 TTL/LRU 메모리 캐시(TTLLRUCache)
+- SQLite 기반 영속 캐시(SQLiteStore)
+- 메모리 → 디스크 2단 캐시(AnswerCache) 및 전역 핸들(get_answer_cache)
+
+환경변수
+- ANSWER_CACHE: '0'이면 답변 캐시 비활성화 (기본 '1')
+- ANSWER_CACHE_SIZE: 메모리 LRU 최대 항목 수 (기본 1024)
+- ANSWER_CACHE_TTL: 항목 유효 시간(초, 기본 86400)
+- ANSWER_CACHE_PATH: SQLite 파일 경로 (기본 .cache/answer_cache.sqlite3, 빈 값이면 메모리만 사용)
+- ANSWER_CACHE_MAX_ENTRIES: SQLite 최대 항목 수 (기본 100000)
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+_answer_cache = None
+_answer_cache_lock = threading.Lock()
+
+
+def normalize_question(text: str) -> str:
+    """캐시 키용 질문 정규화.
+
+    - NFKC 정규화로 전각/반각 문자 통일 (예: 'ＡＢＣ？' → 'ABC?')
+    - 소문자화, 구두점/기호 제거, 연속 공백을 한 칸으로 축소
+    """
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    text = "".join(
+        " " if unicodedata.category(ch)[0] in ("P", "S") else ch
+        for ch in text
+    )
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def answer_namespace(instruction: str, adapter_path: str, generation_config: dict) -> str:
+    """질문을 제외한 답변 결정 요소(지시사항/어댑터/생성 파라미터)의 해시."""
+    payload = json.dumps(
+        {
+            "instruction": instruction,
+            "adapter_path": adapter_path,
+            "generation_config": generation_config,
+        },
+        ensure_ascii=False,
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def make_answer_key(question: str, instruction: str, adapter_path: str, generation_config: dict) -> str:
+    """정규화된 질문 + 지시사항 + 어댑터 경로 + 생성 파라미터로 캐시 키를 만듭니다."""
+    namespace = answer_namespace(instruction, adapter_path, generation_config)
+    payload = f"{namespace}\n{normalize_question(question)}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TTLLRUCache:
+    """항목별 만료 시각을 갖는 스레드 안전 LRU 캐시."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600.0):
+        self.maxsize = max(1, maxsize)
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at <= time.time():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl: float = None, expires_at: float = None) -> None:
+        """항목 저장. expires_at(절대 시각)이 주어지면 ttl보다 우선합니다."""
+        if expires_at is None:
+            expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key) -> bool:
+        with self._lock:
+            return self._data.pop(key, None) is not None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "expirations": self.expirations,
+                "evictions": self.evictions,
+            }
+
+
+class SQLiteStore:
+    """SQLite 파일 기반 영속 캐시 (TTL + 최대 항목 수 초과 시 오래 안 쓰인 항목부터 제거)."""
+
+    EVICT_EVERY = 64
+
+    def __init__(self, path: str, ttl: float = 86400.0, max_entries: int = 100000):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS answer_cache ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_answer_cache_accessed ON answer_cache (accessed_at)"
+        )
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._writes = 0
+
+    def get(self, key: str):
+        return self.get_with_expiry(key)[0]
+
+    def get_with_expiry(self, key: str):
+        """(값, 만료 시각)을 반환합니다 (없거나 만료되면 (None, None))."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM answer_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] <= now:
+                if row is not None:
+                    self._conn.execute("DELETE FROM answer_cache WHERE key = ?", (key,))
+                self.misses += 1
+                return None, None
+            self._conn.execute(
+                "UPDATE answer_cache SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self.hits += 1
+        return json.loads(row[0]), row[1]
+
+    def set(self, key: str, value) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO answer_cache (key, value, expires_at, accessed_at)"
+                " VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), now + self.ttl, now),
+            )
+            # COUNT(*)는 전체 스캔이므로 매 쓰기마다가 아니라 주기적으로 정리
+            self._writes += 1
+            if self._writes % self.EVICT_EVERY == 0:
+                self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        self._conn.execute("DELETE FROM answer_cache WHERE expires_at <= ?", (now,))
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM answer_cache").fetchone()
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM answer_cache WHERE key IN"
+                " (SELECT key FROM answer_cache ORDER BY accessed_at ASC LIMIT ?)",
+                (overflow,),
+            )
+            self.evictions += overflow
+
+    def stats(self) -> dict:
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM answer_cache").fetchone()
+            return {
+                "path": self.path,
+                "size": count,
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class AnswerCache:
+    """메모리 LRU(1차) + SQLite(2차) 답변 캐시. 2차 적중 시 저장된 만료 시각 그대로 1차로 승격합니다."""
+
+    def __init__(self, memory: TTLLRUCache, store: SQLiteStore = None):
+        self.memory = memory
+        self.store = store
+
+    def get(self, key: str):
+        value = self.memory.get(key)
+        if value is not None or self.store is None:
+            return value
+        value, expires_at = self.store.get_with_expiry(key)
+        if value is not None:
+            # 승격할 때 TTL을 새로 시작하면 재시작/승격을 반복하는 동안 항목이 만료되지 않음
+            self.memory.set(key, value, expires_at=expires_at)
+        return value
+
+    def set(self, key: str, value: dict) -> None:
+        self.memory.set(key, value)
+        if self.store is not None:
+            self.store.set(key, value)
+
+    def stats(self) -> dict:
+        return {
+            "memory": self.memory.stats(),
+            "store": self.store.stats() if self.store is not None else None,
+        }
+
+
+def get_answer_cache():
+    """환경변수 설정으로 만든 전역 답변 캐시를 반환합니다 (비활성화 시 None)."""
+    global _answer_cache
+    if os.getenv("ANSWER_CACHE", "1") != "1":
+        return None
+
+    if _answer_cache is None:
+        with _answer_cache_lock:
+            if _answer_cache is None:
+                ttl = float(os.getenv("ANSWER_CACHE_TTL", "86400"))
+                memory = TTLLRUCache(
+                    maxsize=int(os.getenv("ANSWER_CACHE_SIZE", "1024")),
+                    ttl=ttl,
+                )
+                path = os.getenv("ANSWER_CACHE_PATH", os.path.join(".cache", "answer_cache.sqlite3"))
+                store = None
+                if path:
+                    store = SQLiteStore(
+                        path,
+                        ttl=ttl,
+                        max_entries=int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "100000")),
+                    )
+                _answer_cache = AnswerCache(memory, store)
+    return _answer_cache
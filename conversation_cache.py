@@ -0,0 +1,330 @@
+"""
+채팅방별 대화 KV 캐시 (멀티턴 문맥)
+
+같은 ChatRoom의 후속 질문이 이전 대화를 문맥으로 갖도록, 활성 채팅방마다 지금까지의 토큰 ids와
+past_key_values를 보관하고 새 턴의 토큰만 prefill 합니다. 대화가 길어져도 턴당 prefill 양은
+새 질문 길이에 비례하므로 후속 질문 지연이 대화 길이와 무관하게 유지됩니다.
+
+- 전역 메모리 예산(바이트) 안에서 LRU로 채팅방 상태를 제거, 오래 쓰지 않은 방은 TTL로 제거
+- 캐시에 없는(콜드) 방은 DB의 최근 질문/답변(get_recent_chat_turns)으로 대화를 재구성해 한 번 전체 prefill
+- 대화가 토큰 예산을 넘으면 오래된 턴부터 잘라 예산의 약 3/4까지 줄인 뒤 다시 prefill
+  (자를 때마다 재-prefill이 일어나지 않도록 여유를 둠)
+- 답변이 보강(revise)되면 KV를 마지막 답변 직전까지 잘라 두고, 보강된 답변은 다음 턴에 새 질문과 함께 prefill
+  (KV를 자를 수 없는 캐시 형식이면 버리고 다음 턴에 전체 재-prefill — stats의 revise_rebuilds)
+- 같은 방의 동시 요청은 방 단위 락(스트라이프)으로 직렬화, 생성 중 오류가 나면 그 방 상태는 버림
+- 로컬 CriminalQAModel(generate_with_context)에서만 동작. 추론 데몬(MODEL_SERVER_ADDRESS) 사용 시에는
+  KV가 다른 프로세스에 있으므로 기존 단건(무상태) 경로로 응답합니다.
+
+환경변수
+- CHAT_MULTI_TURN: '1'이면 chat_room_id가 있는 /api/chat/turn, /api/chat/stream 요청을 멀티턴으로 처리 (기본 '0')
+- CONVERSATION_CACHE_MAX_MB: 전체 채팅방 KV 메모리 예산(MB, 기본 512)
+- CONVERSATION_MAX_TOKENS: 한 대화의 최대 토큰 수 (생성 토큰 포함, 기본 2048)
+- CONVERSATION_HISTORY_TURNS: 콜드 재구성 시 DB에서 읽을 최근 턴 수 (기본 20)
+- CONVERSATION_CACHE_TTL: 마지막 사용 후 상태를 유지할 시간(초, 기본 1800)
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+_conversation_cache = None
+_conversation_cache_lock = threading.Lock()
+
+# 잘라낼 때 목표 길이 = (최대 토큰 - 생성 예약분) × 이 비율
+TRUNCATE_TARGET_RATIO = 0.75
+
+
+def cache_nbytes(past_key_values) -> int:
+    """past_key_values(DynamicCache 또는 레거시 튜플)가 차지하는 텐서 바이트 수"""
+    layers = getattr(past_key_values, "layers", None)
+    if layers is not None:
+        tensors = [t for layer in layers for t in (getattr(layer, "keys", None), getattr(layer, "values", None))]
+    else:
+        tensors = [t for layer in past_key_values for t in layer]
+    return sum(t.numel() * t.element_size() for t in tensors if t is not None and hasattr(t, "numel"))
+
+
+def _past_length(past_key_values) -> int:
+    if past_key_values is None:
+        return 0
+    if hasattr(past_key_values, "get_seq_length"):
+        return int(past_key_values.get_seq_length())
+    return int(past_key_values[0][0].shape[-2])
+
+
+class ConversationState:
+    """한 채팅방의 대화 기록과 KV 캐시."""
+
+    __slots__ = ("turns", "ids", "past", "nbytes", "answer_start", "used_at")
+
+    def __init__(self, turns: list):
+        self.turns = turns      # [(질문, 답변), ...] — 잘라내기/재구성용 텍스트
+        self.ids = None         # 대화 토큰 ids (past가 덮는 앞부분 + 아직 prefill 안 된 뒷부분)
+        self.past = None        # past_key_values (None이면 다음 턴에 전체 prefill)
+        self.nbytes = 0
+        self.answer_start = 0   # ids에서 마지막 답변이 시작하는 위치 (revise 시 KV를 자를 지점)
+        self.used_at = time.monotonic()
+
+
+class ConversationCache:
+    """채팅방 id → ConversationState, 메모리 예산 기반 LRU.
+
+    chat_room_id는 JSON에서 숫자/문자열 어느 쪽으로 와도 같은 방이 되도록 문자열 키로 보관합니다.
+    """
+
+    def __init__(self, model, max_bytes: int = 512 * 2 ** 20, max_tokens: int = 2048, history_turns: int = 20,
+                 ttl: float = 1800.0, load_history=None, instruction: str = "형사법 질문에 답변하세요",
+                 lock_stripes: int = 64):
+        self.model = model
+        self.max_bytes = max_bytes
+        self.max_tokens = max_tokens
+        self.history_turns = history_turns
+        self.ttl = ttl
+        self.instruction = instruction
+        self._load_history = load_history
+        self._states = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._room_locks = [threading.Lock() for _ in range(max(1, lock_stripes))]
+        self._counters = {"turns": 0, "warm": 0, "cold": 0, "truncations": 0, "evictions": 0, "expired": 0,
+                          "errors": 0, "prefill_tokens": 0, "reused_tokens": 0, "revisions": 0,
+                          "revise_rebuilds": 0}
+
+    # ---- 공개 API ----
+    def answer(self, room_id, question: str, max_new_tokens: int = None) -> str:
+        """room_id 대화의 문맥으로 question에 답하고 상태를 갱신합니다 (max_new_tokens: 부하 시 줄인 생성 예산)."""
+        with self._room_lock(room_id):
+            state, input_ids, past = self._begin(room_id, question)
+            try:
+                answer, sequence, past = self.model.generate_with_context(input_ids, past,
+                                                                          max_new_tokens=max_new_tokens)
+            except Exception:
+                self._count("errors")
+                raise
+            self._finish(room_id, state, question, answer, input_ids, sequence, past)
+            return answer
+
+    def stream(self, room_id, question: str, max_new_tokens: int = None):
+        """answer와 같지만 디코딩되는 대로 텍스트 조각을 반환합니다 (생성은 별도 스레드).
+
+        중간에 close()되면 생성을 취소하고 스레드가 끝날 때까지 기다립니다 (그 턴의 상태는 버려 다음 턴은 콜드).
+        """
+        from transformers import TextIteratorStreamer
+
+        with self._room_lock(room_id):
+            state, input_ids, past = self._begin(room_id, question)
+            streamer = TextIteratorStreamer(self.model.tokenizer, skip_prompt=True, skip_special_tokens=True)
+            cancel = threading.Event()
+            result, errors = [], []
+
+            def _run():
+                try:
+                    result.append(self.model.generate_with_context(input_ids, past, streamer=streamer,
+                                                                   max_new_tokens=max_new_tokens, cancel=cancel))
+                except Exception as e:
+                    logger.error(f"멀티턴 스트리밍 생성 중 오류: {e}")
+                    errors.append(e)
+                    streamer.end()
+
+            thread = threading.Thread(target=_run, name="conversation-generate", daemon=True)
+            thread.start()
+            try:
+                for text in streamer:
+                    if text:
+                        yield text
+            finally:
+                # 클라이언트가 끊기면 다음 토큰에서 멈추고, 생성이 끝날 때까지 방 락을 유지 (KV를 동시에 확장하지 않도록)
+                cancel.set()
+                thread.join()
+            if errors:
+                self._count("errors")
+                raise errors[0]
+            answer, sequence, past = result[0]
+            self._finish(room_id, state, question, answer, input_ids, sequence, past)
+
+    def revise(self, room_id, answer: str) -> None:
+        """마지막 턴의 답변을 교체합니다 (ChatGPT 보강 등).
+
+        KV는 초안 답변 직전까지만 남기고, 보강된 답변 토큰은 ids 뒤에 붙여 다음 턴에 새 질문과 함께 prefill 합니다.
+        """
+        with self._room_lock(room_id):
+            with self._lock:
+                state = self._states.get(str(room_id))
+                if state is None or not state.turns:
+                    return
+                question, _ = state.turns[-1]
+                state.turns[-1] = (question, answer)
+                self._counters["revisions"] += 1
+                self._bytes -= state.nbytes
+                if state.past is not None and hasattr(state.past, "crop") and state.answer_start > 0:
+                    drop = _past_length(state.past) - state.answer_start
+                    if drop > 0:
+                        state.past.crop(-drop)  # 음수 = 뒤에서 drop개 토큰 제거
+                    state.ids = state.ids[:state.answer_start] + self.model.answer_ids(answer)
+                    state.nbytes = cache_nbytes(state.past)
+                    self._bytes += state.nbytes
+                else:
+                    self._counters["revise_rebuilds"] += 1
+                    state.ids, state.past, state.nbytes = None, None, 0
+
+    def drop(self, room_id) -> None:
+        """채팅방 상태를 지웁니다 (방 삭제 등)."""
+        with self._lock:
+            state = self._states.pop(str(room_id), None)
+            if state is not None:
+                self._bytes -= state.nbytes
+
+    def clear(self) -> None:
+        with self._lock:
+            self._states.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "rooms": len(self._states),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "max_tokens": self.max_tokens,
+                **self._counters,
+            }
+
+    # ---- 내부 ----
+    def _room_lock(self, room_id) -> threading.Lock:
+        return self._room_locks[hash(str(room_id)) % len(self._room_locks)]
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += amount
+
+    def _reserved_tokens(self) -> int:
+        config = getattr(self.model, "generation_config", None) or {}
+        return int(config.get("max_new_tokens", 512))
+
+    def _begin(self, room_id, question: str):
+        """생성 입력 (state, 전체 ids, 재사용할 past)을 준비합니다. 상태는 생성하는 동안 LRU에서 빠져 있음."""
+        with self._lock:
+            state = self._states.pop(str(room_id), None)
+            if state is not None:
+                self._bytes -= state.nbytes
+                if time.monotonic() - state.used_at > self.ttl:
+                    self._counters["expired"] += 1
+                    state = None
+
+        if state is None:
+            turns = self._load_turns(room_id)
+            state = ConversationState(turns)
+            self._count("cold")
+        else:
+            self._count("warm")
+
+        past = state.past
+        if past is not None:
+            input_ids = state.ids + self.model.followup_ids(question, self.instruction)
+        else:
+            input_ids = self.model.conversation_ids(state.turns, question, self.instruction)
+
+        budget = max(1, self.max_tokens - self._reserved_tokens())
+        if len(input_ids) > budget and state.turns:
+            # 오래된 턴부터 버려 목표 길이 이하로 줄이고 전체 재-prefill
+            target = int(budget * TRUNCATE_TARGET_RATIO)
+            turns = list(state.turns)
+            while turns:
+                turns.pop(0)
+                input_ids = self.model.conversation_ids(turns, question, self.instruction)
+                if len(input_ids) <= target:
+                    break
+            state.turns = turns
+            past = None
+            self._count("truncations")
+
+        reused = _past_length(past)
+        self._count("prefill_tokens", len(input_ids) - reused)
+        self._count("reused_tokens", reused)
+        state.ids, state.past, state.nbytes = None, None, 0
+        return state, input_ids, past
+
+    def _load_turns(self, room_id) -> list:
+        if self._load_history is None or self.history_turns <= 0:
+            return []
+        try:
+            return list(self._load_history(room_id, self.history_turns))
+        except Exception as e:
+            logger.warning(f"대화 기록 조회 실패, 새 대화로 시작합니다 (chat_room_id={room_id}): {e}")
+            return []
+
+    def _finish(self, room_id, state: ConversationState, question: str, answer: str, input_ids: list,
+                sequence: list, past) -> None:
+        eos_token_id = self.model.tokenizer.eos_token_id
+        if sequence and sequence[-1] != eos_token_id:
+            # 길이 제한으로 끝난 답변도 콜드 재구성(답변 + EOS)과 같은 형태로 맞춤
+            sequence = sequence + [eos_token_id]
+        state.turns.append((question, answer))
+        del state.turns[:-max(1, self.history_turns)]
+        state.ids = sequence
+        state.answer_start = len(input_ids)
+        state.past = past
+        state.nbytes = cache_nbytes(past)
+        state.used_at = time.monotonic()
+
+        with self._lock:
+            self._counters["turns"] += 1
+            if state.nbytes > self.max_bytes:
+                return  # 한 방이 예산 전체보다 크면 보관하지 않음 (다음 턴은 콜드)
+            self._states[str(room_id)] = state
+            self._bytes += state.nbytes
+            self._evict_locked()
+
+    def _evict_locked(self) -> None:
+        now = time.monotonic()
+        for room_id in [r for r, s in self._states.items() if now - s.used_at > self.ttl]:
+            self._bytes -= self._states.pop(room_id).nbytes
+            self._counters["expired"] += 1
+        while self._bytes > self.max_bytes and self._states:
+            _, state = self._states.popitem(last=False)
+            self._bytes -= state.nbytes
+            self._counters["evictions"] += 1
+
+
+def _load_recent_turns(chat_room_id, limit: int) -> list:
+    from db_connection import get_recent_chat_turns
+    return get_recent_chat_turns(chat_room_id, limit)
+
+
+def get_conversation_cache(model):
+    """멀티턴이 켜져 있고 로컬 모델이면 전역 대화 캐시를, 아니면 None을 반환합니다."""
+    global _conversation_cache
+    if os.getenv("CHAT_MULTI_TURN", "0") != "1" or not hasattr(model, "generate_with_context"):
+        return None
+
+    if _conversation_cache is None or _conversation_cache.model is not model:
+        with _conversation_cache_lock:
+            # 모델이 다시 로드되면 이전 KV는 쓸 수 없으므로 새로 만듦
+            if _conversation_cache is None or _conversation_cache.model is not model:
+                _conversation_cache = ConversationCache(
+                    model,
+                    max_bytes=int(float(os.getenv("CONVERSATION_CACHE_MAX_MB", "512")) * 2 ** 20),
+                    max_tokens=int(os.getenv("CONVERSATION_MAX_TOKENS", "2048")),
+                    history_turns=int(os.getenv("CONVERSATION_HISTORY_TURNS", "20")),
+                    ttl=float(os.getenv("CONVERSATION_CACHE_TTL", "1800")),
+                    load_history=_load_recent_turns,
+                )
+    return _conversation_cache
+
+
+def drop_conversation(room_id) -> None:
+    """채팅방 삭제 시 보관 중인 대화 상태를 지웁니다 (캐시가 없으면 무시)."""
+    if _conversation_cache is not None:
+        _conversation_cache.drop(room_id)
+
+
+def conversation_cache_stats() -> dict:
+    """/health, /metrics용 대화 캐시 상태 (멀티턴 비활성 또는 아직 생성 전이면 enabled=False)."""
+    cache = _conversation_cache
+    if os.getenv("CHAT_MULTI_TURN", "0") != "1" or cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
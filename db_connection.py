@@ -1,16 +1,263 @@
+"""
+MySQL 연결 및 CRUD 헬퍼
+- get_db(): 커넥션 풀에서 연결을 빌려옴 (close() 시 실제로 닫지 않고 풀에 반납)
+- connection(): 반납이 보장되는 컨텍스트 매니저 API
+- pool_stats(): 풀 상태(사용 중/유휴/대기/생성/폐기 수)
+
+환경변수
+- DB_HOST / DB_PORT / DB_USER / DB_PASSWORD / DB_NAME: 접속 정보 (기본 localhost/3306/root/1234/micro)
+- DB_POOL_MIN_SIZE: 풀 생성 시 미리 여는 연결 수 (기본 1)
+- DB_POOL_MAX_SIZE: 최대 연결 수 (기본 10)
+- DB_POOL_TIMEOUT: 풀이 가득 찼을 때 대여 대기 시간(초, 기본 5)
+- DB_POOL_MAX_LIFETIME: 연결 최대 수명(초, 기본 3600) — 초과 시 반납/대여 시점에 교체
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
 import pymysql  
 from datetime import datetime
 
-def get_db():
-    conn = pymysql.connect(
-        host='localhost',
-        user='root',
-        password='1234',
-        database='micro',
+import auth_cache
+from metrics import observe_stage
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class PoolTimeoutError(Exception):
+    """대여 대기 시간 안에 풀에서 연결을 얻지 못했을 때 발생합니다."""
+
+
+class _TimedDictCursor(pymysql.cursors.DictCursor):
+    """쿼리 실행 시간을 mcs_stage_seconds{stage="db"}에 기록하는 DictCursor (executemany도 execute 경유)."""
+
+    def execute(self, query, args=None):
+        start = time.perf_counter()
+        try:
+            return super().execute(query, args)
+        finally:
+            observe_stage("db", time.perf_counter() - start)
+
+
+def _connect():
+    return pymysql.connect(
+        host=os.getenv("DB_HOST", "localhost"),
+        port=int(os.getenv("DB_PORT", "3306")),
+        user=os.getenv("DB_USER", "root"),
+        password=os.getenv("DB_PASSWORD", "1234"),
+        database=os.getenv("DB_NAME", "micro"),
         charset='utf8mb4',
-        cursorclass=pymysql.cursors.DictCursor
+        cursorclass=_TimedDictCursor
     )
-    return conn
+
+
+class PooledConnection:
+    """풀에서 빌린 pymysql 연결 래퍼. close() 호출 시 풀에 반납합니다."""
+
+    def __init__(self, pool, raw, created_at):
+        self._pool = pool
+        self._raw = raw
+        self._created_at = created_at
+
+    def __getattr__(self, name):
+        raw = self.__dict__.get("_raw")
+        if raw is None:
+            raise pymysql.err.InterfaceError("이미 풀에 반납된 연결입니다.")
+        return getattr(raw, name)
+
+    def close(self):
+        raw, self._raw = self._raw, None
+        if raw is not None:
+            self._pool._release(raw, self._created_at)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __del__(self):
+        # close() 없이 버려진 연결도 풀 용량을 잃지 않도록 반납
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    """스레드 안전한 유한 크기 MySQL 커넥션 풀.
+
+    - 대여 시 유휴 연결에 ping으로 생존 확인, 끊겼거나 수명이 지난 연결은 교체
+    - 최대 크기에 도달하면 timeout 동안 반납을 기다린 뒤 PoolTimeoutError
+    - 반납 시 rollback으로 트랜잭션/스냅샷을 정리해 다음 사용자에게 상태가 새지 않게 함
+    """
+
+    def __init__(self, connect=_connect, min_size=1, max_size=10, timeout=5.0, max_lifetime=3600.0):
+        self._connect = connect
+        self.min_size = max(0, min_size)
+        self.max_size = max(1, max_size, self.min_size)
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self._idle = deque()  # (raw, created_at)
+        self._size = 0  # 대여 중 + 유휴 연결 수
+        self._waiting = 0
+        self._cond = threading.Condition()
+        self.created = 0
+        self.closed = 0
+        self.borrowed = 0
+        self.timeouts = 0
+        for _ in range(self.min_size):
+            self._idle.append((self._open(), time.monotonic()))
+            self._size += 1
+
+    def _open(self):
+        raw = self._connect()
+        self.created += 1
+        return raw
+
+    def _discard(self, raw):
+        self.closed += 1
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def _expired(self, created_at):
+        return self.max_lifetime and time.monotonic() - created_at > self.max_lifetime
+
+    def acquire(self, timeout=None) -> PooledConnection:
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                if self._idle:
+                    raw, created_at = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    raw = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.timeouts += 1
+                    raise PoolTimeoutError(f"{timeout}초 안에 DB 연결을 얻지 못했습니다 (max_size={self.max_size})")
+                self._waiting += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+
+        # 네트워크 I/O(연결 생성/ping)는 락 밖에서 수행
+        try:
+            if raw is not None and (self._expired(created_at) or not self._is_alive(raw)):
+                self._discard(raw)
+                raw = None
+            if raw is None:
+                raw, created_at = self._open(), time.monotonic()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+        self.borrowed += 1
+        return PooledConnection(self, raw, created_at)
+
+    @staticmethod
+    def _is_alive(raw):
+        try:
+            raw.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    def _release(self, raw, created_at):
+        keep = not self._expired(created_at)
+        if keep:
+            try:
+                raw.rollback()
+            except Exception:
+                keep = False
+        if not keep:
+            self._discard(raw)
+        with self._cond:
+            if keep:
+                self._idle.append((raw, created_at))
+            else:
+                self._size -= 1
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self, timeout=None):
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def close_all(self):
+        """유휴 연결을 모두 닫습니다 (대여 중인 연결은 반납 시 정상 처리)."""
+        with self._cond:
+            idle, self._idle = list(self._idle), deque()
+            self._size -= len(idle)
+        for raw, _ in idle:
+            self._discard(raw)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "waiting": self._waiting,
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "created": self.created,
+                "closed": self.closed,
+                "borrowed": self.borrowed,
+                "timeouts": self.timeouts,
+            }
+
+
+def get_pool() -> ConnectionPool:
+    """환경변수 설정으로 만든 전역 커넥션 풀을 반환합니다 (최초 호출 시 생성)."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    min_size=int(os.getenv("DB_POOL_MIN_SIZE", "1")),
+                    max_size=int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+                    timeout=float(os.getenv("DB_POOL_TIMEOUT", "5")),
+                    max_lifetime=float(os.getenv("DB_POOL_MAX_LIFETIME", "3600")),
+                )
+    return _pool
+
+
+def get_db():
+    """풀에서 연결을 빌려옵니다. 기존처럼 사용 후 close()하면 풀로 반납됩니다."""
+    return get_pool().acquire()
+
+
+def connection(timeout=None):
+    """반납이 보장되는 연결 컨텍스트 매니저: `with connection() as conn: ...`"""
+    return get_pool().connection(timeout)
+
+
+def pool_stats() -> dict:
+    """커넥션 풀 상태를 반환합니다 (풀이 아직 없으면 빈 dict)."""
+    return _pool.stats() if _pool is not None else {}
+
+# 조회 컬럼은 명시적으로 나열 (SELECT * 금지: 스키마 변경 시 응답 크기/형태 고정)
+CHAT_ROOM_COLUMNS = "id, user_id, title, created_at"
+CHAT_MESSAGE_COLUMNS = "id, question, response, created_at"
+INSERT_CHAT_MESSAGE_SQL = (
+    "INSERT INTO ChatMessage (user_id, chat_room_id, question, response) VALUES (%s, %s, %s, %s)"
+)
 
 # ChatRoom 관련 CRUD 함수들
 def create_chat_room(user_id, title):
@@ -32,16 +279,26 @@ def create_chat_room(user_id, title):
         cursor.close()
         conn.close()
 
-def get_chat_rooms_by_user(user_id):
-    """사용자의 모든 채팅방을 가져옵니다."""
+def get_chat_rooms_by_user(user_id, before_id=None, limit=None):
+    """사용자의 채팅방을 최신순으로 가져옵니다.
+
+    before_id/limit를 주면 키셋 페이지네이션 (id < before_id 중 최신 limit건).
+    id는 AUTO_INCREMENT라 생성 순서와 같으므로 id 내림차순 = created_at 내림차순입니다.
+    """
     conn = get_db()
     cursor = conn.cursor()
     
     try:
-        cursor.execute(
-            "SELECT * FROM ChatRoom WHERE user_id = %s ORDER BY created_at DESC",
-            (user_id,)
-        )
+        sql = f"SELECT {CHAT_ROOM_COLUMNS} FROM ChatRoom WHERE user_id = %s"
+        params = [user_id]
+        if before_id is not None:
+            sql += " AND id < %s"
+            params.append(before_id)
+        sql += " ORDER BY id DESC"
+        if limit is not None:
+            sql += " LIMIT %s"
+            params.append(limit)
+        cursor.execute(sql, params)
         return cursor.fetchall()
     finally:
         cursor.close()
@@ -54,7 +311,7 @@ def get_chat_room_by_id(room_id):
     
     try:
         cursor.execute(
-            "SELECT * FROM ChatRoom WHERE id = %s",
+            f"SELECT {CHAT_ROOM_COLUMNS} FROM ChatRoom WHERE id = %s",
             (room_id,)
         )
         return cursor.fetchone()
@@ -100,8 +357,28 @@ def delete_chat_room(room_id):
         cursor.close()
         conn.close()
 
+def get_recent_chat_turns(chat_room_id, limit):
+    """채팅방의 최근 limit개 질문/답변을 오래된 순 [(question, response), ...]으로 가져옵니다."""
+    conn = get_db()
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute(
+            "SELECT question, response FROM ChatMessage WHERE chat_room_id = %s ORDER BY id DESC LIMIT %s",
+            (chat_room_id, limit)
+        )
+        rows = cursor.fetchall()
+        return [(row["question"], row["response"]) for row in reversed(rows)]
+    finally:
+        cursor.close()
+        conn.close()
+
 def get_user_by_id(user_id):
-    """사용자 정보를 가져옵니다."""
+    """사용자 정보를 가져옵니다 (auth_cache 사용자 캐시 우선)."""
+    cached = auth_cache.get_user(user_id)
+    if cached is not None:
+        return cached
+
     conn = get_db()
     cursor = conn.cursor()
     
@@ -110,17 +387,33 @@ def get_user_by_id(user_id):
             "SELECT id, email, name FROM User WHERE id = %s",
             (user_id,)
         )
-        return cursor.fetchone()
+        row = cursor.fetchone()
+        auth_cache.put_user(user_id, row)
+        return row
     finally:
         cursor.close()
         conn.close()
 
 def verify_jwt_token(token):
-    """JWT 토큰을 검증하고 사용자 정보를 반환합니다."""
+    """JWT 토큰을 검증하고 사용자 정보를 반환합니다.
+
+    폐기 저장소(token_store)를 먼저 확인하고, 한 번 검증된 토큰은 exp까지(최대 AUTH_TOKEN_CACHE_TTL)
+    서명 검증 없이 user_id를 재사용합니다.
+    """
     import jwt
     import os
     from datetime import datetime
     
+    # 로그아웃/탈퇴로 폐기된 토큰은 캐시 여부와 무관하게 거부 (워커 간 공유 저장소)
+    from token_store import get_token_store
+    if get_token_store().is_revoked(token):
+        auth_cache.invalidate_token(token)
+        return None
+
+    user_id = auth_cache.get_token_user_id(token)
+    if user_id is not None:
+        return get_user_by_id(user_id)
+
     try:
         secret_key = os.getenv("SECRET_KEY", "shinhanmicrostone")
         payload = jwt.decode(token, secret_key, algorithms=["HS256"])
@@ -128,9 +421,10 @@ def verify_jwt_token(token):
         # 토큰이 유효하면 사용자 정보 반환
         user_id = payload.get("user_id")
         if user_id:
+            auth_cache.put_token(token, user_id, payload.get("exp"))
             return get_user_by_id(user_id)
         return None
     except jwt.ExpiredSignatureError:
         return None
     except jwt.InvalidTokenError:
-        return None
\ No newline at end of file
+        return None
@@ -1,11 +1,13 @@
 from flask import Blueprint, request, jsonify
 import jwt
 from db_connection import get_db
+import auth_cache
+from token_store import get_token_store
+from message_writer import flush_pending
 from datetime import datetime
 from functools import wraps
 
-# 블랙리스트 (로그아웃된 토큰들을 저장)
-blacklist = set()
+# 탈퇴한 사용자의 토큰은 공용 폐기 저장소(token_store)에 exp까지 보관
 
 
 import os
@@ -23,7 +25,7 @@ def token_required(f):
         except IndexError:
             return jsonify({"message": "유효하지 않은 토큰 형식입니다"}), 401
 
-        if token in blacklist:
+        if get_token_store().is_revoked(token):
             return jsonify({"message": "유효하지 않은 토큰입니다"}), 401
         try:
             decoded = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
@@ -45,10 +47,12 @@ def withdraw(decoded_token):
     cursor = db.cursor()
 
     try:
-        cursor.execute("DELETE FROM user WHERE email=%s", (email,))
+        # 지연 쓰기 대기 중인 메시지를 먼저 저장 (탈퇴 뒤 INSERT는 FK 오류)
+        flush_pending()
+        cursor.execute("DELETE FROM User WHERE email=%s", (email,))
         db.commit()
 
-        # 탈퇴 후 토큰 블랙리스트에 실제 토큰만 추가
+        # 탈퇴 후 실제 토큰만 폐기 목록에 추가
         token_header = request.headers.get("Authorization")
         token = None
         if token_header:
@@ -57,7 +61,9 @@ def withdraw(decoded_token):
             except IndexError:
                 pass
         if token:
-            blacklist.add(token)
+            get_token_store().revoke(token, decoded_token.get("exp"))
+            auth_cache.invalidate_token(token)
+        auth_cache.invalidate_user(decoded_token.get("user_id"))
 
         return jsonify({"message": "회원 탈퇴가 완료되었습니다"}), 200
     finally:
@@ -0,0 +1,199 @@
+"""
+프로젝트 공통 로깅 설정 — 큐 기반 비동기 출력 + JSON + 민감정보 마스킹
+
+요청 스레드는 레코드를 큐에 넣기만 하고(QueueHandler), 실제 포맷/출력은 별도 스레드의
+QueueListener가 맡습니다. 출력 대상(stdout, 파일, 수집기)이 느려도 요청 지연에 영향이 없고,
+큐가 가득 차면 기다리지 않고 버린 뒤 개수만 셉니다(logging_stats의 dropped).
+
+- JSON 한 줄 출력: ts, level, logger, msg, thread + extra 필드 (+ exc)
+- 로거별 레벨: LOG_LEVELS="werkzeug=WARNING,ai_models=DEBUG"
+- 샘플링: 많이 찍히는 로거의 INFO 이하 레코드를 비율만 남김 (WARNING 이상은 항상 남김)
+- 마스킹: password/token/secret/authorization 등의 extra 값과
+  메시지 안의 JWT, Bearer 토큰, password=..., sk-... 형태의 API 키를 '***'로 치환
+
+환경변수
+- LOG_LEVEL: 루트 레벨 (기본 INFO)
+- LOG_FORMAT: json(기본) | text
+- LOG_LEVELS: 로거별 레벨, 쉼표 구분 name=LEVEL
+- LOG_SAMPLE: 로거별 샘플링 비율, 쉼표 구분 name=0.1 (하위 로거 포함)
+- LOG_QUEUE_SIZE: 출력 대기 큐 최대 길이 (기본 10000)
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import re
+import sys
+import threading
+from datetime import datetime, timezone
+
+_listener = None
+_queue_handler = None
+_setup_lock = threading.Lock()
+
+SECRET_KEYS = ("password", "passwd", "token", "secret", "authorization", "api_key", "apikey", "cookie")
+
+_SECRET_PATTERNS = (
+    (re.compile(r"eyJ[\w-]+\.[\w-]+\.[\w-]+"), "***"),  # JWT
+    (re.compile(r"(?i)(bearer\s+)\S+"), r"\1***"),
+    (re.compile(r"(?i)\b(password|passwd|secret|token|api_key)(\s*[=:]\s*)[^\s,&]+"), r"\1\2***"),
+    (re.compile(r"\bsk-[A-Za-z0-9_-]{8,}"), "***"),  # OpenAI API 키
+)
+
+# LogRecord 기본 속성 (이 외의 속성은 extra로 보고 JSON에 포함)
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "taskName"}
+
+
+def redact(text: str) -> str:
+    """문자열 안의 토큰/비밀번호/API 키를 '***'로 치환합니다."""
+    for pattern, replacement in _SECRET_PATTERNS:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def _redact_value(key: str, value):
+    if any(secret in key.lower() for secret in SECRET_KEYS):
+        return "***"
+    if isinstance(value, str):
+        return redact(value)
+    return value
+
+
+class JsonFormatter(logging.Formatter):
+    """레코드를 JSON 한 줄로 출력합니다 (extra 필드 포함, 민감정보 마스킹)."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": redact(record.getMessage()),
+            "thread": record.threadName,
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = _redact_value(key, value)
+        if record.exc_text:
+            entry["exc"] = redact(record.exc_text)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class RedactingTextFormatter(logging.Formatter):
+    """사람이 읽는 텍스트 형식 (개발용), 민감정보 마스킹."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        return redact(super().format(record))
+
+
+class SamplingFilter(logging.Filter):
+    """지정한 로거(및 하위 로거)의 INFO 이하 레코드를 rate 비율만 통과시킵니다."""
+
+    def __init__(self, rates: dict):
+        super().__init__()
+        # 가장 구체적인 이름이 먼저 매칭되도록 긴 이름 순
+        self.rates = sorted(rates.items(), key=lambda item: -len(item[0]))
+        self.sampled_out = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        for name, rate in self.rates:
+            if record.name == name or record.name.startswith(name + "."):
+                if random.random() < rate:
+                    return True
+                self.sampled_out += 1
+                return False
+        return True
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """큐가 가득 차면 기다리지 않고 레코드를 버리는 QueueHandler."""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 포맷은 리스너 스레드에서 — 여기서는 메시지/예외만 문자열로 고정해 다른 스레드로 넘김
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _parse_pairs(value: str) -> dict:
+    pairs = {}
+    for item in (value or "").split(","):
+        if "=" in item:
+            name, setting = item.split("=", 1)
+            pairs[name.strip()] = setting.strip()
+    return pairs
+
+
+def configure_logging(stream=None) -> None:
+    """루트 로거를 큐 기반 비동기 출력으로 설정합니다 (여러 번 호출해도 한 번만 적용)."""
+    global _listener, _queue_handler
+    with _setup_lock:
+        if _listener is not None:
+            return
+
+        output = logging.StreamHandler(stream or sys.stdout)
+        if os.getenv("LOG_FORMAT", "json") == "text":
+            output.setFormatter(RedactingTextFormatter("%(asctime)s %(levelname)s [%(name)s] %(message)s"))
+        else:
+            output.setFormatter(JsonFormatter())
+
+        log_queue = queue.Queue(maxsize=int(os.getenv("LOG_QUEUE_SIZE", "10000")))
+        _queue_handler = NonBlockingQueueHandler(log_queue)
+        rates = {name: float(rate) for name, rate in _parse_pairs(os.getenv("LOG_SAMPLE", "")).items()}
+        if rates:
+            _queue_handler.addFilter(SamplingFilter(rates))
+
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(_queue_handler)
+        root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+        for name, level in _parse_pairs(os.getenv("LOG_LEVELS", "")).items():
+            logging.getLogger(name).setLevel(level.upper())
+
+        _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+        _listener.start()
+        # 종료 시 큐에 남은 레코드 출력
+        atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """리스너를 멈추고 남은 레코드를 모두 출력합니다."""
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+def logging_stats() -> dict:
+    """헬스체크용 로깅 큐 상태 (설정 전이면 빈 dict)."""
+    handler = _queue_handler
+    if handler is None:
+        return {}
+    sampled_out = sum(getattr(f, "sampled_out", 0) for f in handler.filters)
+    return {
+        "queued": handler.queue.qsize(),
+        "max_queue": handler.queue.maxsize,
+        "dropped": handler.dropped,
+        "sampled_out": sampled_out,
+    }
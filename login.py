@@ -1,15 +1,17 @@
 from flask import Flask, request, jsonify, render_template
-from werkzeug.security import check_password_hash
 import jwt
 import datetime
+import logging
 import os
 from flask import Blueprint
 from db_connection import get_db  # 기존 DB 연결 함수 사용
+from passwords import PasswordHashBusy, get_password_hasher
 
 app = Flask(__name__)
 app.config["SECRET_KEY"] = os.getenv("SECRET_KEY", "shinhanmicrostone")  # JWT 서명용 비밀키
 
 bp_login = Blueprint("login", __name__)
+logger = logging.getLogger(__name__)
 
 @bp_login.route("/login", methods=["GET"])
 def login_page():
@@ -21,8 +23,6 @@ def login():
     email = data.get("email")
     password = data.get("password")
 
-    print(f"로그인 시도: email={email}, password={password}")
-
     if not email:
         return jsonify({"message": "이메일을 입력해주세요"}), 400
     
@@ -35,43 +35,52 @@ def login():
 
     try:
         # DB에서 이메일 검색
-        cursor.execute("SELECT id, password FROM user WHERE email=%s", (email,))
+        cursor.execute("SELECT id, password FROM User WHERE email=%s", (email,))
         row = cursor.fetchone()
-        print(f"DB 조회 결과: {row}")
-        
-        if not row:
-            print("사용자를 찾을 수 없음")
-            return jsonify({"message": "이메일 또는 비밀번호가 잘못되었습니다"}), 401
-
-        stored_password = row["password"]
-        print(f"저장된 비밀번호 해시: {stored_password[:50]}...")
-
-        # 비밀번호 체크
-        password_check = check_password_hash(stored_password, password)
-        print(f"비밀번호 체크 결과: {password_check}")
-        
-        if not password_check:
-            print("비밀번호 불일치")
-            return jsonify({"message": "이메일 또는 비밀번호가 잘못되었습니다"}), 401
-
-        # JWT 생성
-        token = jwt.encode(
-            {
-                "user_id": row["id"],
-                "email": email,
-                "exp": datetime.datetime.utcnow() + datetime.timedelta(hours=1)  # 1시간 유효
-            },
-            app.config["SECRET_KEY"],
-            algorithm="HS256"
-        )
-
-        response = jsonify({"token": token})
-        response.set_cookie('token', token, httponly=True, secure=False, samesite='Lax')
-        return response, 200
-
     finally:
+        # 해시 검증은 오래 걸리므로 DB 연결을 먼저 반납
         cursor.close()
         db.close()
 
+    if not row:
+        logger.info("로그인 실패: 사용자 없음")
+        return jsonify({"message": "이메일 또는 비밀번호가 잘못되었습니다"}), 401
+
+    stored_password = row["password"]
+
+    # 비밀번호 체크 (해시 풀에서 실행, 포화 시 503)
+    hasher = get_password_hasher()
+    try:
+        password_check = hasher.verify(stored_password, password)
+    except PasswordHashBusy:
+        response = jsonify({"message": "로그인 요청이 많습니다. 잠시 후 다시 시도해주세요"})
+        response.headers["Retry-After"] = "1"
+        return response, 503
+
+    if not password_check:
+        logger.info("로그인 실패: 비밀번호 불일치", extra={"user_id": row["id"]})
+        return jsonify({"message": "이메일 또는 비밀번호가 잘못되었습니다"}), 401
+
+    # 예전 방식/비용으로 저장된 해시는 백그라운드에서 현재 설정으로 교체
+    if hasher.needs_rehash(stored_password):
+        hasher.schedule_rehash(row["id"], stored_password, password)
+
+    logger.info("로그인 성공", extra={"user_id": row["id"]})
+
+    # JWT 생성
+    token = jwt.encode(
+        {
+            "user_id": row["id"],
+            "email": email,
+            "exp": datetime.datetime.utcnow() + datetime.timedelta(hours=1)  # 1시간 유효
+        },
+        app.config["SECRET_KEY"],
+        algorithm="HS256"
+    )
+
+    response = jsonify({"token": token})
+    response.set_cookie('token', token, httponly=True, secure=False, samesite='Lax')
+    return response, 200
+
 if __name__ == "__main__":
     app.run(debug=True)
@@ -4,9 +4,10 @@ import os
 from flask import Blueprint
 from datetime import datetime
 from db_connection import get_db
+import auth_cache
+from token_store import get_token_store
 
-# 블랙리스트 (로그아웃된 토큰들을 저장)
-blacklist = set()
+# 로그아웃된 토큰은 공용 폐기 저장소(token_store)에 exp까지 보관
 
 app = Flask(__name__)
 app.config["SECRET_KEY"] = os.getenv("SECRET_KEY", "shinhanmicrostone")
@@ -23,18 +24,20 @@ def logout():
     if not token:
         return jsonify({"message": "토큰이 필요합니다"}), 400
 
-    if token in blacklist:
+    store = get_token_store()
+    if store.is_revoked(token):
         return jsonify({"message": "이미 로그아웃된 토큰입니다"}), 400
 
     try:
-        jwt.decode(token, app.config["SECRET_KEY"], algorithms=["HS256"])
+        payload = jwt.decode(token, app.config["SECRET_KEY"], algorithms=["HS256"])
     except jwt.ExpiredSignatureError:
         return jsonify({"message": "이미 만료된 토큰입니다"}), 400
     except jwt.InvalidTokenError:
         return jsonify({"message": "유효하지 않은 토큰입니다"}), 400
 
-    # 블랙리스트에 추가
-    blacklist.add(token)
+    # 폐기 목록에 추가 (exp 이후 자동 제거) + 검증 캐시에서 제거
+    store.revoke(token, payload.get("exp"))
+    auth_cache.invalidate_token(token)
     
     # 쿠키 삭제
     response = jsonify({"message": "로그아웃 완료"})
@@ -51,7 +54,7 @@ def token_required(f):
         token = request.headers.get("Authorization")
         if not token:
             return jsonify({"message": "토큰이 필요합니다"}), 401
-        if token in blacklist:
+        if get_token_store().is_revoked(token):
             return jsonify({"message": "로그아웃된 토큰입니다"}), 401
         try:
             jwt.decode(token, app.config["SECRET_KEY"], algorithms=["HS256"])
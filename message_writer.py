@@ -0,0 +1,258 @@
+"""
+ChatMessage 지연 쓰기(write-behind) 버퍼
+
+채팅 한 턴마다 연결 대여 → INSERT → COMMIT(fsync)을 하던 것을, 메시지를 큐에 넣고 바로 응답한 뒤
+백그라운드 스레드가 N ms 또는 M건마다 executemany + 한 번의 COMMIT으로 모아서 저장합니다.
+
+- 큐 크기 제한: 가득 차면 put_timeout 동안 대기(backpressure), 그래도 못 넣으면 MessageQueueFull
+  → 호출 측(routing/chat.py)은 동기 INSERT로 폴백
+- 종료 시(atexit) 남은 메시지를 모두 flush
+- 일시적 오류(연결 끊김 등)는 한 번 재시도, 데이터 오류(FK 위반 — 이미 삭제된 채팅방/사용자 등)는
+  배치를 반씩 나눠 다시 저장 → 문제 행만 실패로 기록(로그 + 해당 future 예외)
+- 채팅방 삭제/회원 탈퇴 전에는 flush_pending()으로 대기 중인 메시지를 먼저 저장
+
+환경변수
+- CHAT_WRITE_BEHIND: '1'이면 사용 (기본 '0' = 기존 동기 저장)
+- CHAT_WRITE_BEHIND_ROWS: 한 번에 저장할 최대 행 수 (기본 100)
+- CHAT_WRITE_BEHIND_INTERVAL_MS: 첫 메시지 이후 최대 대기 시간(ms, 기본 50)
+- CHAT_WRITE_BEHIND_QUEUE: 큐 최대 길이 (기본 10000)
+- CHAT_WRITE_BEHIND_PUT_TIMEOUT: 큐가 가득 찼을 때 대기 시간(초, 기본 1)
+"""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import pymysql
+
+from db_connection import INSERT_CHAT_MESSAGE_SQL, connection
+
+logger = logging.getLogger(__name__)
+
+_writer = None
+_writer_lock = threading.Lock()
+
+# 재시도해도 같은 결과인 행 단위 오류 → 배치를 나눠 문제 행만 골라냄
+_DATA_ERRORS = (pymysql.err.IntegrityError, pymysql.err.DataError)
+
+
+class MessageQueueFull(Exception):
+    """지연 쓰기 큐가 가득 차 제한 시간 안에 메시지를 넣지 못했을 때 발생합니다."""
+
+
+class _FlushMarker:
+    """flush() 호출 시 큐에 넣는 표식. 앞선 메시지가 모두 저장되면 event가 set 됩니다."""
+
+    def __init__(self):
+        self.event = threading.Event()
+
+
+class WriteBehindWriter:
+    """ChatMessage 행을 모아 executemany 한 번과 COMMIT 한 번으로 저장하는 백그라운드 쓰기기."""
+
+    def __init__(self, flush_rows: int = 100, flush_interval_ms: float = 50.0, max_queue: int = 10000,
+                 put_timeout: float = 1.0, connection_factory=connection):
+        self.flush_rows = max(1, flush_rows)
+        self.flush_interval = max(0.0, flush_interval_ms) / 1000.0
+        self.put_timeout = put_timeout
+        self._connection = connection_factory
+        self._queue = queue.Queue(maxsize=max(1, max_queue))
+        self._closed = False
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.written = 0
+        self.commits = 0
+        self.failed = 0
+        self.splits = 0
+        self.rejected = 0
+        self._worker = threading.Thread(target=self._run, name="chat-message-writer", daemon=True)
+        self._worker.start()
+
+    def submit(self, user_id, chat_room_id, question: str, response: str) -> Future:
+        """메시지를 큐에 넣고 저장 완료 시 True가 되는 Future를 반환합니다 (기다릴 필요 없음)."""
+        if self._closed:
+            raise MessageQueueFull("지연 쓰기 버퍼가 종료되었습니다.")
+        future = Future()
+        try:
+            self._queue.put(((user_id, chat_room_id, question, response), future), timeout=self.put_timeout)
+        except queue.Full:
+            with self._lock:
+                self.rejected += 1
+            raise MessageQueueFull(f"지연 쓰기 큐가 가득 찼습니다 (max={self._queue.maxsize}).")
+        with self._lock:
+            self.submitted += 1
+        return future
+
+    def flush(self, timeout: float = None) -> bool:
+        """지금까지 넣은 메시지가 모두 저장될 때까지 기다립니다 (timeout 안에 못 끝내면 False).
+
+        큐가 가득 차 표식을 넣지 못하는 시간도 timeout에 포함됩니다 (DB 정체 시 요청 스레드가 묶이지 않도록).
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        marker = _FlushMarker()
+        try:
+            self._queue.put(marker, timeout=timeout)
+        except queue.Full:
+            return False
+        remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+        return marker.event.wait(remaining)
+
+    def close(self, timeout: float = 10.0) -> None:
+        """새 메시지를 막고 남은 메시지를 저장한 뒤 워커를 종료합니다."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._worker.join(timeout)
+
+    def _collect(self):
+        """(행 목록, future 목록, flush 표식 목록, 종료 여부)"""
+        rows, futures, markers = [], [], []
+        item = self._queue.get()
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            if item is None:
+                return rows, futures, markers, True
+            if isinstance(item, _FlushMarker):
+                markers.append(item)
+                break  # 표식 이전 메시지를 즉시 저장
+            row, future = item
+            rows.append(row)
+            futures.append(future)
+            if len(rows) >= self.flush_rows:
+                break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+        return rows, futures, markers, False
+
+    def _write(self, rows: list) -> None:
+        with self._connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.executemany(INSERT_CHAT_MESSAGE_SQL, rows)
+            conn.commit()
+
+    def _write_batch(self, rows: list) -> list:
+        """rows를 저장하고 행별 오류 목록(성공은 None)을 반환합니다.
+
+        데이터 오류면 반씩 나눠 다시 저장해 문제 행만 실패시키고, 그 밖의 오류는 한 번 재시도합니다.
+        """
+        error = None
+        for attempt in range(2):
+            try:
+                self._write(rows)
+                with self._lock:
+                    self.written += len(rows)
+                    self.commits += 1
+                return [None] * len(rows)
+            except _DATA_ERRORS as e:
+                error = e
+                break
+            except Exception as e:
+                error = e
+                logger.warning(f"채팅 메시지 일괄 저장 실패 ({len(rows)}건, 시도 {attempt + 1}/2): {e}")
+        if len(rows) == 1 or not isinstance(error, _DATA_ERRORS):
+            return [error] * len(rows)
+        with self._lock:
+            self.splits += 1
+        middle = len(rows) // 2
+        return self._write_batch(rows[:middle]) + self._write_batch(rows[middle:])
+
+    def _flush_rows(self, rows: list, futures: list) -> None:
+        if not rows:
+            return
+        errors = self._write_batch(rows)
+        failed = [error for error in errors if error is not None]
+        if failed:
+            with self._lock:
+                self.failed += len(failed)
+            logger.error(f"채팅 메시지 {len(failed)}/{len(rows)}건을 저장하지 못했습니다: {failed[0]}")
+        for future, error in zip(futures, errors):
+            if error is None:
+                future.set_result(True)
+            else:
+                future.set_exception(error)
+
+    def _run(self) -> None:
+        while True:
+            rows, futures, markers, stop = self._collect()
+            if stop:
+                # 종료 신호 뒤에 남은 메시지까지 모두 저장
+                while True:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if isinstance(item, _FlushMarker):
+                        markers.append(item)
+                    elif item is not None:
+                        rows.append(item[0])
+                        futures.append(item[1])
+            for start in range(0, len(rows), self.flush_rows):
+                self._flush_rows(rows[start:start + self.flush_rows], futures[start:start + self.flush_rows])
+            for marker in markers:
+                marker.event.set()
+            if stop:
+                return
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "queued": self._queue.qsize(),
+                "max_queue": self._queue.maxsize,
+                "submitted": self.submitted,
+                "written": self.written,
+                "commits": self.commits,
+                "rows_per_commit": round(self.written / self.commits, 1) if self.commits else 0.0,
+                "failed": self.failed,
+                "splits": self.splits,
+                "rejected": self.rejected,
+            }
+
+
+def get_message_writer():
+    """CHAT_WRITE_BEHIND=1이면 전역 지연 쓰기 버퍼를, 아니면 None을 반환합니다."""
+    global _writer
+    if os.getenv("CHAT_WRITE_BEHIND", "0") != "1":
+        return None
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = WriteBehindWriter(
+                    flush_rows=int(os.getenv("CHAT_WRITE_BEHIND_ROWS", "100")),
+                    flush_interval_ms=float(os.getenv("CHAT_WRITE_BEHIND_INTERVAL_MS", "50")),
+                    max_queue=int(os.getenv("CHAT_WRITE_BEHIND_QUEUE", "10000")),
+                    put_timeout=float(os.getenv("CHAT_WRITE_BEHIND_PUT_TIMEOUT", "1")),
+                )
+                # 프로세스 종료 시 남은 메시지 저장
+                atexit.register(_writer.close)
+    return _writer
+
+
+def flush_pending(timeout: float = 5.0) -> bool:
+    """지연 쓰기 버퍼에 남은 메시지를 저장할 때까지 기다립니다 (버퍼를 쓰지 않으면 바로 True).
+
+    채팅방/사용자를 삭제하기 전에 호출해, 삭제 뒤에 늦게 INSERT되어 FK 오류가 나는 것을 막습니다.
+    """
+    if _writer is None or _writer._closed:
+        return True
+    if _writer.flush(timeout):
+        return True
+    # 삭제는 그대로 진행 — 늦게 저장되는 행은 FK 오류로 그 행만 실패 처리됨
+    logger.warning(f"지연 쓰기 flush가 {timeout}초 안에 끝나지 않았습니다 (queued={_writer._queue.qsize()}).")
+    return False
+
+
+def message_writer_stats() -> dict:
+    """헬스체크용 지연 쓰기 상태 (비활성화 시 enabled=False)."""
+    if _writer is None:
+        return {"enabled": os.getenv("CHAT_WRITE_BEHIND", "0") == "1"}
+    return {"enabled": True, **_writer.stats()}
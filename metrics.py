@@ -0,0 +1,252 @@
+"""
+Prometheus 텍스트 형식 메트릭 (/metrics)
+
+외부 라이브러리 없이 카운터/게이지/히스토그램을 프로세스 메모리에 집계하고,
+스크레이프 시점에만 텍스트로 직렬화합니다. 관측 한 번은 락 + bisect 한 번이라 상시 켜 둘 수 있습니다.
+
+- mcs_stage_seconds{stage}: /api/chat 파이프라인 단계별 지연
+  tokenize / prefill / decode (모델 stage_observer), is_weak / refine (routing/chat), db (쿼리 실행)
+- mcs_generated_tokens_total, mcs_decode_tokens_per_second: 생성 토큰 수와 디코딩 속도
+- mcs_is_weak_total{result}, mcs_refine_total{outcome}: 보강 발동률/실패
+- mcs_http_request_seconds{route,method,status}, mcs_http_requests_in_flight: 라우트별 지연, 처리 중 요청
+- register_collector로 등록한 상태 dict(풀/캐시/지연 쓰기 등)는 스크레이프 시 게이지로 변환
+  (mcs_<이름>_<키>, 숫자/불리언 값만)
+
+추론 데몬(MODEL_SERVER_ADDRESS) 사용 시 토큰화/prefill/decode는 데몬 프로세스에서 일어나므로
+웹 워커의 /metrics에는 나타나지 않습니다.
+
+환경변수
+- METRICS: '1'(기본)이면 수집, '0'이면 관측을 건너뛰고 /metrics는 404
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+_registry = []
+_collectors = {}
+_registry_lock = threading.Lock()
+_enabled = None
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def enabled() -> bool:
+    global _enabled
+    if _enabled is None:
+        _enabled = os.getenv("METRICS", "1") == "1"
+    return _enabled
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        with _registry_lock:
+            _registry.append(self)
+
+    def _header(self) -> list:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """단조 증가 카운터."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, labels: tuple = ()) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> list:
+        with self._lock:
+            items = list(self._values.items())
+        return self._header() + [
+            f"{self.name}{_label_text(self.labelnames, labels)} {_number(value)}" for labels, value in items
+        ]
+
+
+class Gauge(Counter):
+    """임의로 오르내리는 값."""
+
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, labels: tuple = ()) -> None:
+        self.inc(-amount, labels)
+
+    def set(self, value: float, labels: tuple = ()) -> None:
+        with self._lock:
+            self._values[labels] = float(value)
+
+
+class Histogram(_Metric):
+    """고정 버킷 히스토그램 (버킷별 개수 + 합계 + 개수)."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, labels: tuple = ()) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def render(self) -> list:
+        with self._lock:
+            items = [(labels, (list(state[0]), state[1], state[2])) for labels, state in self._values.items()]
+        lines = self._header()
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_label_text(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_label_text(self.labelnames, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_label_text(self.labelnames, labels)} {count}")
+        return lines
+
+
+STAGE_SECONDS = Histogram("mcs_stage_seconds", "Latency of /api/chat pipeline stages", ("stage",))
+GENERATED_TOKENS = Counter("mcs_generated_tokens_total", "Tokens generated by the LLM")
+DECODE_TOKENS_PER_SECOND = Histogram(
+    "mcs_decode_tokens_per_second", "Decode throughput per generate call",
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, 1000),
+)
+IS_WEAK_TOTAL = Counter("mcs_is_weak_total", "Draft quality checks by result", ("result",))
+REFINE_TOTAL = Counter("mcs_refine_total", "ChatGPT refinements by outcome", ("outcome",))
+HTTP_SECONDS = Histogram("mcs_http_request_seconds", "HTTP request latency", ("route", "method", "status"))
+HTTP_IN_FLIGHT = Gauge("mcs_http_requests_in_flight", "HTTP requests currently being handled")
+
+
+def observe_stage(stage: str, seconds: float) -> None:
+    if enabled():
+        STAGE_SECONDS.observe(seconds, (stage,))
+
+
+@contextmanager
+def stage_timer(stage: str):
+    """with 블록 실행 시간을 mcs_stage_seconds{stage}에 기록합니다 (예외가 나도 기록)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - start)
+
+
+def observe_model_stage(stage: str, seconds: float, tokens: int = 0) -> None:
+    """CriminalQAModel.stage_observer 콜백 (tokenize/prefill/decode)."""
+    if not enabled():
+        return
+    STAGE_SECONDS.observe(seconds, (stage,))
+    if stage == "decode" and tokens:
+        GENERATED_TOKENS.inc(tokens)
+        if seconds > 0:
+            DECODE_TOKENS_PER_SECOND.observe(tokens / seconds)
+
+
+def count(counter: Counter, *labels) -> None:
+    if enabled():
+        counter.inc(1.0, labels)
+
+
+def register_collector(name: str, fn) -> None:
+    """스크레이프 시 호출해 게이지로 내보낼 상태 함수(dict 반환)를 등록합니다."""
+    with _registry_lock:
+        _collectors[name] = fn
+
+
+def _flatten(prefix: str, value, out: list) -> None:
+    if isinstance(value, bool):
+        out.append((prefix, 1 if value else 0))
+    elif isinstance(value, (int, float)):
+        out.append((prefix, value))
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            _flatten(f"{prefix}_{key}", item, out)
+
+
+def _collector_lines() -> list:
+    with _registry_lock:
+        collectors = list(_collectors.items())
+    lines = []
+    for name, fn in collectors:
+        try:
+            state = fn()
+        except Exception:
+            continue  # 한 구성요소 오류로 전체 스크레이프가 실패하지 않도록
+        values = []
+        _flatten(f"mcs_{name}", state, values)
+        for metric, value in values:
+            metric = "".join(c if c.isalnum() or c == "_" else "_" for c in metric)
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric} {_number(value)}")
+    return lines
+
+
+def render() -> str:
+    """Prometheus 텍스트 노출 형식(0.0.4)으로 직렬화합니다."""
+    with _registry_lock:
+        metrics = list(_registry)
+    lines = []
+    for metric in metrics:
+        lines.extend(metric.render())
+    lines.extend(_collector_lines())
+    return "\n".join(lines) + "\n"
+
+
+def init_app(app) -> None:
+    """Flask 앱에 라우트별 지연/처리 중 요청 수 측정을 연결합니다."""
+    from flask import g, request
+
+    @app.before_request
+    def _metrics_start():
+        if enabled():
+            g._metrics_start = time.perf_counter()
+            HTTP_IN_FLIGHT.inc()
+
+    @app.after_request
+    def _metrics_status(response):
+        g._metrics_status = response.status_code
+        return response
+
+    @app.teardown_request
+    def _metrics_finish(exc):
+        # 스트리밍 응답(stream_with_context)은 본문 전송이 끝난 뒤 호출됨
+        start = g.pop("_metrics_start", None)
+        if start is None:
+            return
+        HTTP_IN_FLIGHT.dec()
+        status = 500 if exc is not None else g.pop("_metrics_status", 500)
+        route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        HTTP_SECONDS.observe(time.perf_counter() - start, (route, request.method, str(status)))
@@ -0,0 +1,297 @@
+"""
+MySQL 스키마 버전 관리 (마이그레이션) + 조회 인덱스 점검
+
+사용법:
+    python -m migrations upgrade   # 미적용 버전을 순서대로 적용 (새 DB 생성/기존 DB 업그레이드 공용)
+    python -m migrations status    # 현재 버전과 미적용 목록
+    python -m migrations check     # 앱에서 쓰는 조회 쿼리를 EXPLAIN → 전체 스캔/filesort면 실패(종료 코드 1)
+
+접속 정보는 db_connection과 같은 DB_HOST / DB_PORT / DB_USER / DB_PASSWORD / DB_NAME 환경변수를 씁니다.
+
+규칙
+- 적용된 버전은 schema_version 테이블에 기록하고, 새 변경은 MIGRATIONS 끝에 새 버전으로 추가합니다.
+  (이미 배포된 버전의 내용은 수정하지 않음)
+- 각 단계는 재실행해도 안전해야 합니다 (README의 수동 CREATE TABLE로 만든 DB도 그대로 업그레이드).
+- 여러 프로세스가 동시에 upgrade해도 GET_LOCK으로 한 번만 적용됩니다.
+- 쿼리를 추가/변경하면 CHECKED_QUERIES에도 반영해 check로 인덱스 사용 여부를 확인합니다.
+"""
+
+import argparse
+import logging
+import sys
+
+from db_connection import _connect
+
+logger = logging.getLogger(__name__)
+
+MIGRATION_LOCK = "mcs_schema_migration"
+
+SCHEMA_VERSION_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_version (
+    version INT PRIMARY KEY,
+    description VARCHAR(255) NOT NULL,
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+BASE_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS User (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        email VARCHAR(255) UNIQUE NOT NULL,
+        password VARCHAR(255) NOT NULL,
+        name VARCHAR(100) NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS ChatRoom (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        user_id INT NOT NULL,
+        title VARCHAR(255) NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES User(id) ON DELETE CASCADE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS ChatMessage (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        user_id INT NOT NULL,
+        chat_room_id INT NOT NULL,
+        question TEXT NOT NULL,
+        response TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES User(id) ON DELETE CASCADE,
+        FOREIGN KEY (chat_room_id) REFERENCES ChatRoom(id) ON DELETE CASCADE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS GeneratedDocument (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        user_id INT NOT NULL,
+        document_type VARCHAR(50) NOT NULL,
+        input_facts TEXT NOT NULL,
+        document_text MEDIUMTEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES User(id) ON DELETE CASCADE
+    )
+    """,
+]
+
+
+def _index_exists(cursor, table: str, columns: tuple, unique: bool) -> bool:
+    """같은 컬럼 순서(와 유일성)를 가진 인덱스가 이름과 무관하게 이미 있는지 확인합니다."""
+    cursor.execute(
+        "SELECT INDEX_NAME, NON_UNIQUE, COLUMN_NAME FROM information_schema.STATISTICS"
+        " WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s ORDER BY INDEX_NAME, SEQ_IN_INDEX",
+        (table,),
+    )
+    indexes = {}
+    for row in cursor.fetchall():
+        entry = indexes.setdefault(row["INDEX_NAME"], {"unique": not row["NON_UNIQUE"], "columns": []})
+        entry["columns"].append(row["COLUMN_NAME"].lower())
+    wanted = [c.lower() for c in columns]
+    return any(i["columns"] == wanted and (i["unique"] or not unique) for i in indexes.values())
+
+
+def _ensure_index(cursor, table: str, name: str, columns: tuple, unique: bool = False) -> None:
+    if _index_exists(cursor, table, columns, unique):
+        return
+    kind = "UNIQUE INDEX" if unique else "INDEX"
+    cursor.execute(f"CREATE {kind} {name} ON {table} ({', '.join(columns)})")
+    logger.info(f"인덱스 생성: {table}.{name} ({', '.join(columns)})")
+
+
+def _drop_index(cursor, table: str, name: str) -> None:
+    cursor.execute(
+        "SELECT 1 FROM information_schema.STATISTICS"
+        " WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s LIMIT 1",
+        (table, name),
+    )
+    if cursor.fetchone() is None:
+        return
+    cursor.execute(f"DROP INDEX {name} ON {table}")
+    logger.info(f"인덱스 삭제: {table}.{name}")
+
+
+def _v1_base_tables(cursor) -> None:
+    for ddl in BASE_TABLES:
+        cursor.execute(ddl)
+
+
+def _v2_query_indexes(cursor) -> None:
+    # 로그인/가입/탈퇴: WHERE email = ?
+    _ensure_index(cursor, "User", "uq_user_email", ("email",), unique=True)
+    # 사용자별 채팅방 최신순
+    _ensure_index(cursor, "ChatRoom", "idx_chatroom_user_created", ("user_id", "created_at"))
+    # 채팅방별 메시지 시간순
+    _ensure_index(cursor, "ChatMessage", "idx_chatmessage_room_created", ("chat_room_id", "created_at"))
+    # 사용자별 생성 문서 최신순
+    _ensure_index(cursor, "GeneratedDocument", "idx_document_user_created", ("user_id", "created_at"))
+
+
+def _v3_keyset_indexes(cursor) -> None:
+    # 목록/대화 기록 조회는 모두 ORDER BY id DESC (+ id < before_id) 키셋 페이지네이션이므로
+    # (소유자, id) 인덱스를 역순으로 읽어 filesort 없이 LIMIT만큼만 읽음.
+    # v2의 (소유자, created_at) 인덱스는 이 정렬을 못 쓰고, 대신 쓰는 쿼리도 없어 삭제 (FK는 새 인덱스가 지원)
+    _ensure_index(cursor, "ChatRoom", "idx_chatroom_user_id", ("user_id", "id"))
+    _ensure_index(cursor, "ChatMessage", "idx_chatmessage_room_id", ("chat_room_id", "id"))
+    _drop_index(cursor, "ChatRoom", "idx_chatroom_user_created")
+    _drop_index(cursor, "ChatMessage", "idx_chatmessage_room_created")
+
+
+# (버전, 설명, 적용 함수) — 새 변경은 끝에 추가
+MIGRATIONS = [
+    (1, "User/ChatRoom/ChatMessage/GeneratedDocument 기본 테이블", _v1_base_tables),
+    (2, "조회 경로 복합 인덱스 및 email 유일 제약", _v2_query_indexes),
+    (3, "키셋 페이지네이션용 (user_id, id) / (chat_room_id, id) 인덱스", _v3_keyset_indexes),
+]
+
+# EXPLAIN 점검 대상: (출처, SQL, 예시 파라미터) — 앱 코드의 쿼리와 같은 형태로 유지
+CHECKED_QUERIES = [
+    ("login.login", "SELECT id, password FROM User WHERE email=%s", ("user@example.com",)),
+    ("signup.signup", "SELECT id FROM User WHERE email=%s", ("user@example.com",)),
+    ("delete_account.delete_account", "DELETE FROM User WHERE email=%s", ("user@example.com",)),
+    ("db_connection.get_user_by_id", "SELECT id, email, name FROM User WHERE id = %s", (1,)),
+    ("db_connection.get_chat_rooms_by_user",
+     "SELECT id, user_id, title, created_at FROM ChatRoom WHERE user_id = %s ORDER BY id DESC LIMIT %s", (1, 51)),
+    ("db_connection.get_chat_rooms_by_user (before_id)",
+     "SELECT id, user_id, title, created_at FROM ChatRoom WHERE user_id = %s AND id < %s ORDER BY id DESC LIMIT %s",
+     (1, 1000, 51)),
+    ("db_connection.get_chat_room_by_id", "SELECT id, user_id, title, created_at FROM ChatRoom WHERE id = %s", (1,)),
+    ("db_connection.update_chat_room_title", "UPDATE ChatRoom SET title = %s WHERE id = %s", ("제목", 1)),
+    ("db_connection.delete_chat_room", "DELETE FROM ChatRoom WHERE id = %s", (1,)),
+    ("routing.chat.get_chat_messages",
+     "SELECT id, question, response, created_at FROM ChatMessage WHERE chat_room_id = %s ORDER BY id DESC LIMIT %s",
+     (1, 51)),
+    ("routing.chat.get_chat_messages (before_id)",
+     "SELECT id, question, response, created_at FROM ChatMessage"
+     " WHERE chat_room_id = %s AND id < %s ORDER BY id DESC LIMIT %s", (1, 1000, 51)),
+    ("db_connection.get_recent_chat_turns",
+     "SELECT question, response FROM ChatMessage WHERE chat_room_id = %s ORDER BY id DESC LIMIT %s", (1, 10)),
+]
+
+# 전체 테이블/전체 인덱스 스캔으로 간주하는 EXPLAIN access type
+FULL_SCAN_TYPES = {"ALL", "index"}
+
+
+def _ensure_version_table(cursor) -> None:
+    cursor.execute(SCHEMA_VERSION_TABLE)
+
+
+def applied_versions(cursor) -> set:
+    _ensure_version_table(cursor)
+    cursor.execute("SELECT version FROM schema_version")
+    return {row["version"] for row in cursor.fetchall()}
+
+
+def upgrade(conn=None) -> list:
+    """미적용 마이그레이션을 순서대로 적용하고 적용한 버전 목록을 반환합니다."""
+    own = conn is None
+    conn = conn or _connect()
+    applied = []
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT GET_LOCK(%s, 60) AS locked", (MIGRATION_LOCK,))
+            if not cursor.fetchone()["locked"]:
+                raise RuntimeError("다른 프로세스가 마이그레이션 중입니다 (잠금 대기 시간 초과).")
+            try:
+                done = applied_versions(cursor)
+                for version, description, apply in MIGRATIONS:
+                    if version in done:
+                        continue
+                    logger.info(f"마이그레이션 {version} 적용 중: {description}")
+                    apply(cursor)  # MySQL DDL은 자동 커밋되므로 단계별로 버전 기록
+                    cursor.execute(
+                        "INSERT INTO schema_version (version, description) VALUES (%s, %s)",
+                        (version, description),
+                    )
+                    conn.commit()
+                    applied.append(version)
+            finally:
+                cursor.execute("SELECT RELEASE_LOCK(%s)", (MIGRATION_LOCK,))
+    finally:
+        if own:
+            conn.close()
+    return applied
+
+
+def status(conn=None) -> dict:
+    own = conn is None
+    conn = conn or _connect()
+    try:
+        with conn.cursor() as cursor:
+            done = applied_versions(cursor)
+        conn.commit()
+    finally:
+        if own:
+            conn.close()
+    return {
+        "current": max(done) if done else 0,
+        "latest": MIGRATIONS[-1][0],
+        "pending": [(v, d) for v, d, _ in MIGRATIONS if v not in done],
+    }
+
+
+def explain_queries(conn=None) -> list:
+    """CHECKED_QUERIES를 EXPLAIN해 [(출처, 문제 목록, EXPLAIN 행들)]을 반환합니다.
+
+    type이 ALL/index(전체 스캔)이거나 filesort가 필요하면 문제입니다 (모두 요청마다 실행되는 쿼리라
+    정렬도 인덱스 순서로 끝나야 함).
+    테이블이 거의 비어 있으면 옵티마이저가 전체 스캔을 고를 수 있으므로 ANALYZE TABLE 후 실행하세요.
+    """
+    own = conn is None
+    conn = conn or _connect()
+    results = []
+    try:
+        with conn.cursor() as cursor:
+            for source, sql, params in CHECKED_QUERIES:
+                cursor.execute("EXPLAIN " + sql, params)
+                rows = cursor.fetchall()
+                problems = []
+                for row in rows:
+                    table = row.get("table")
+                    if row.get("type") in FULL_SCAN_TYPES:
+                        problems.append(f"FULL SCAN {table} (type={row['type']}, key={row.get('key')})")
+                    if "filesort" in (row.get("Extra") or ""):
+                        problems.append(f"FILESORT {table} (key={row.get('key')})")
+                results.append((source, problems, rows))
+        conn.rollback()
+    finally:
+        if own:
+            conn.close()
+    return results
+
+
+def check(conn=None) -> bool:
+    """전체 스캔하거나 filesort하는 쿼리가 하나라도 있으면 False."""
+    ok = True
+    for source, problems, rows in explain_queries(conn):
+        ok = ok and not problems
+        access = ", ".join(f"{r.get('table')}:{r.get('type')}/{r.get('key')}" for r in rows)
+        print(f"[{'FAIL' if problems else 'OK'}] {source} — {access}")
+        for problem in problems:
+            print(f"       {problem}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MySQL 스키마 마이그레이션 / 인덱스 점검")
+    parser.add_argument("command", choices=["upgrade", "status", "check"])
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    if args.command == "upgrade":
+        applied = upgrade()
+        print(f"적용한 버전: {applied or '없음 (최신 상태)'}")
+    elif args.command == "status":
+        info = status()
+        print(f"현재 버전 {info['current']} / 최신 버전 {info['latest']}")
+        for version, description in info["pending"]:
+            print(f"  미적용 {version}: {description}")
+    else:
+        sys.exit(0 if check() else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,393 @@
+"""
+형사법 LLM 추론 데몬 + 원격 클라이언트
+
+웹 워커(Flask/WSGI 프로세스)마다 CriminalQAModel을 따로 로드하면 메모리와 로딩 시간이
+워커 수만큼 늘어납니다. 이 모듈은 박스당 하나의 추론 데몬이 모델을 소유하고,
+웹 워커는 로컬 소켓으로 generate_answer / batch_generate / stream_answer를 호출하게 합니다.
+
+실행:
+    MODEL_SERVER_ADDRESS=/tmp/mcs-model.sock python -m model_server
+
+웹 워커:
+    같은 MODEL_SERVER_ADDRESS(와 MODEL_SERVER_AUTHKEY)를 지정하면 runtime.get_model()이
+    CriminalQAModel 대신 RemoteModel을 반환합니다 (routing/chat.py 변경 없음).
+    동시 질문 배칭은 데몬의 BatchScheduler가 전체 워커의 요청을 모아 수행합니다.
+
+환경변수
+- MODEL_SERVER_ADDRESS: Unix 소켓 경로 (예: /tmp/mcs-model.sock) 또는 host:port (TCP)
+- MODEL_SERVER_AUTHKEY: 데몬/클라이언트 공유 인증 키. 메시지가 pickle이라 키를 아는 쪽은 데몬에서 임의 코드를
+  실행할 수 있으므로 TCP 주소에서는 필수 (없으면 데몬 시작/클라이언트 연결 거부).
+  Unix 소켓(권한 0600)에서만 기본값 mcs-model-server 허용
+- MODEL_SERVER_POOL_SIZE: 클라이언트가 유지하는 유휴 연결 수 (기본 8)
+- MODEL_SERVER_MAX_ACTIVE: 데몬 안에서 동시에 실행할 generate 수 — 배치 한 번/스트림 하나가 각각 1 (기본 1,
+  웹 워커별 수락 제어와 별개로 박스 전체의 모델 호출 상한. 스트리밍과 배칭이 같은 제한을 공유)
+- MODEL_SERVER_MAX_QUEUE: 슬롯을 기다릴 수 있는 최대 요청 수 (기본 64)
+- MODEL_SERVER_QUEUE_TIMEOUT: 슬롯 최대 대기 시간(초, 기본 30)
+  → 넘치면 ("rejected", (메시지, 429|503, retry_after))를 보내고, 클라이언트는 AdmissionRejected로 올려
+    웹 워커가 429/503 + Retry-After로 응답
+- CHAT_BATCH_MAX_SIZE / CHAT_BATCH_WAIT_MS / CHAT_BATCH_RESULT_TIMEOUT: 데몬 배칭 스케줄러 설정 (runtime.py와 동일)
+
+프로토콜 (multiprocessing.connection, pickle 메시지):
+- 요청: (op, args, kwargs)
+- 응답: ("ok", 결과) | ("error", "예외타입: 메시지") | ("rejected", (메시지, status, retry_after))
+- stream_answer: ("chunk", 텍스트)* 후 ("end", None) 또는 ("error", ...)
+"""
+
+import logging
+import os
+import queue
+import signal
+import threading
+from contextlib import closing
+from multiprocessing.connection import AuthenticationError, Client, Listener
+
+from admission import AdmissionController, AdmissionRejected
+from runtime import DEFAULT_INSTRUCTION, BatchScheduler, warm_up_model
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_AUTHKEY = "mcs-model-server"
+
+
+class RemoteModelError(RuntimeError):
+    """추론 데몬 연결 실패 또는 데몬 측 예외."""
+
+
+def parse_address(address: str):
+    """'host:port'는 TCP 튜플, 그 외는 Unix 소켓 경로로 해석합니다."""
+    host, sep, port = address.rpartition(":")
+    if sep and "/" not in address and port.isdigit():
+        return host or "127.0.0.1", int(port)
+    return address
+
+
+def _authkey(address) -> bytes:
+    """공유 인증 키. TCP 주소인데 MODEL_SERVER_AUTHKEY가 없으면 RemoteModelError."""
+    authkey = os.getenv("MODEL_SERVER_AUTHKEY")
+    if not authkey:
+        if not isinstance(address, str):
+            raise RemoteModelError(
+                "TCP 주소(host:port)에는 MODEL_SERVER_AUTHKEY를 지정해야 합니다 (기본 키는 Unix 소켓 전용)."
+            )
+        authkey = DEFAULT_AUTHKEY
+    return authkey.encode("utf-8")
+
+
+class ModelServer:
+    """CriminalQAModel 하나를 소유하고 연결마다 스레드로 요청을 처리하는 데몬."""
+
+    def __init__(self, model, address, authkey: bytes, max_batch_size: int = 8, max_wait_ms: float = 10.0,
+                 admission: AdmissionController = None, result_timeout: float = 300.0):
+        self.model = model
+        self.address = address
+        self.authkey = authkey
+        # 모든 웹 워커의 generate(배치/단건/스트림)가 공유하는 박스 전체 동시 실행 제한
+        self.admission = admission or AdmissionController(max_active=1)
+        # 여러 워커에서 동시에 들어온 단건 질문을 한 번의 batch_generate로 묶음 (묶음 하나가 슬롯 하나)
+        self.scheduler = BatchScheduler(model, max_batch_size, max_wait_ms, gate=self.admission.admit,
+                                        result_timeout=result_timeout) if max_batch_size > 1 else None
+        self.listener = None
+        self._closed = threading.Event()
+
+    def serve_forever(self) -> None:
+        is_unix = isinstance(self.address, str)
+        if not is_unix and self.authkey == DEFAULT_AUTHKEY.encode("utf-8"):
+            # 알려진 기본 키로 네트워크에 pickle 소켓을 여는 것은 원격 코드 실행 통로
+            raise RemoteModelError("TCP 주소에서는 기본 인증 키로 데몬을 시작할 수 없습니다.")
+        if is_unix and os.path.exists(self.address):
+            os.unlink(self.address)  # 이전 실행이 남긴 소켓 파일
+        self.listener = Listener(self.address, authkey=self.authkey)
+        if is_unix:
+            os.chmod(self.address, 0o600)
+        logger.info(f"추론 데몬 대기 중: {self.address}")
+
+        while not self._closed.is_set():
+            try:
+                conn = self.listener.accept()
+            except AuthenticationError as e:
+                logger.warning(f"인증 실패한 연결을 거부했습니다: {e}")
+                continue
+            except OSError:
+                if self._closed.is_set():
+                    break
+                raise
+            threading.Thread(target=self._handle, args=(conn,), name="model-server-conn", daemon=True).start()
+
+    def close(self) -> None:
+        self._closed.set()
+        if self.listener is not None:
+            self.listener.close()
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.unlink(self.address)
+
+    def info(self) -> dict:
+        """클라이언트가 캐시 키 등에 쓰는 모델 속성."""
+        return {
+            "adapter_path": getattr(self.model, "adapter_path", None),
+            "generation_config": dict(getattr(self.model, "generation_config", {}) or {}),
+            "snapshot_path": getattr(self.model, "snapshot_path", None),
+            "cpu_precision": getattr(self.model, "cpu_precision", None),
+            "is_model_on_cuda": getattr(self.model, "is_model_on_cuda", False),
+        }
+
+    def _call(self, op: str, args: tuple, kwargs: dict):
+        if op == "generate_answer":
+            if self.scheduler is not None:
+                return self.scheduler.generate(*args, **kwargs)
+            with self.admission.admit():
+                return self.model.generate_answer(*args, **kwargs)
+        if op == "batch_generate":
+            with self.admission.admit():
+                return self.model.batch_generate(*args, **kwargs)
+        if op == "info":
+            return self.info()
+        if op == "ping":
+            return "pong"
+        if op == "stats":
+            return {"admission": self.admission.stats()}
+        raise ValueError(f"지원하지 않는 요청입니다: {op}")
+
+    def _handle(self, conn) -> None:
+        with conn:
+            while True:
+                try:
+                    op, args, kwargs = conn.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    if op == "stream_answer":
+                        # 스트림도 배치와 같은 슬롯을 씀 (생성이 끝날 때까지 점유)
+                        # 클라이언트가 끊기면 send 실패 → 스트림을 닫아 데몬 쪽 생성도 취소
+                        with self.admission.admit(), closing(self.model.stream_answer(*args, **kwargs)) as chunks:
+                            for chunk in chunks:
+                                conn.send(("chunk", chunk))
+                        conn.send(("end", None))
+                    else:
+                        conn.send(("ok", self._call(op, args, kwargs)))
+                except (BrokenPipeError, ConnectionResetError, EOFError):
+                    # 클라이언트가 먼저 연결을 끊음 (예: 스트리밍 도중 브라우저 종료)
+                    return
+                except AdmissionRejected as e:
+                    try:
+                        conn.send(("rejected", (str(e), e.status, e.retry_after)))
+                    except OSError:
+                        return
+                except Exception as e:
+                    logger.error(f"추론 요청 처리 실패 ({op}): {e}")
+                    try:
+                        conn.send(("error", f"{type(e).__name__}: {e}"))
+                    except OSError:
+                        return
+
+
+class RemoteModel:
+    """CriminalQAModel과 같은 공개 API를 추론 데몬 호출로 제공하는 클라이언트 (스레드 안전)."""
+
+    def __init__(self, address, authkey: bytes = None, pool_size: int = 8):
+        self.address = parse_address(address) if isinstance(address, str) else address
+        self.authkey = authkey if authkey is not None else _authkey(self.address)
+        self._idle = queue.LifoQueue(maxsize=max(1, pool_size))
+        self._info = {}
+        # 연결 확인 + 모델 속성 조회 (데몬이 없으면 RemoteModelError)
+        self._info = self._request("info")
+
+    # CriminalQAModel 호환 속성 (routing/chat.py 캐시 키 등에서 사용)
+    @property
+    def adapter_path(self):
+        return self._info.get("adapter_path")
+
+    @property
+    def generation_config(self) -> dict:
+        return self._info.get("generation_config", {})
+
+    @property
+    def snapshot_path(self):
+        return self._info.get("snapshot_path")
+
+    @property
+    def cpu_precision(self):
+        return self._info.get("cpu_precision")
+
+    @property
+    def is_model_on_cuda(self) -> bool:
+        return self._info.get("is_model_on_cuda", False)
+
+    def _connect(self):
+        try:
+            return Client(self.address, authkey=self.authkey)
+        except (OSError, EOFError, AuthenticationError) as e:
+            raise RemoteModelError(f"추론 데몬에 연결할 수 없습니다 ({self.address}): {e}") from e
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait(), True
+        except queue.Empty:
+            return self._connect(), False
+
+    def _release(self, conn) -> None:
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def _request(self, op: str, *args, **kwargs):
+        # 유휴 연결이 데몬 재시작 등으로 끊겨 있으면 새 연결로 한 번 더 시도
+        while True:
+            conn, pooled = self._acquire()
+            try:
+                conn.send((op, args, kwargs))
+                status, value = conn.recv()
+            except (EOFError, OSError) as e:
+                conn.close()
+                if pooled:
+                    continue
+                raise RemoteModelError(f"추론 데몬 연결이 끊어졌습니다: {e}") from e
+            self._release(conn)
+            if status == "rejected":
+                raise AdmissionRejected(*value)
+            if status == "error":
+                raise RemoteModelError(value)
+            return value
+
+    def ping(self) -> bool:
+        try:
+            return self._request("ping") == "pong"
+        except RemoteModelError:
+            return False
+
+    def server_stats(self) -> dict:
+        """데몬의 동시 generate 제한 상태 (active/queue_depth/거절 수 등)."""
+        return self._request("stats")
+
+    def refresh_info(self) -> dict:
+        self._info = self._request("info")
+        return self._info
+
+    def generate_answer(self, question: str, instruction: str = DEFAULT_INSTRUCTION, max_new_tokens: int = None) -> str:
+        try:
+            return self._request("generate_answer", question, instruction, **_budget(max_new_tokens))
+        except RemoteModelError as e:
+            # CriminalQAModel.generate_answer와 같은 오류 응답 형식
+            logger.error(f"답변 생성 중 오류: {e}")
+            return f"답변 생성 중 오류가 발생했습니다: {e}"
+
+    def batch_generate(self, questions: list, instruction: str = DEFAULT_INSTRUCTION, max_new_tokens: int = None) -> list:
+        if not questions:
+            return []
+        try:
+            return self._request("batch_generate", list(questions), instruction, **_budget(max_new_tokens))
+        except RemoteModelError as e:
+            logger.error(f"배치 답변 생성 중 오류: {e}")
+            return [f"답변 생성 중 오류가 발생했습니다: {e}" for _ in questions]
+
+    def stream_answer(self, question: str, instruction: str = DEFAULT_INSTRUCTION, max_new_tokens: int = None):
+        request = ("stream_answer", (question, instruction), _budget(max_new_tokens))
+        conn, pooled = self._acquire()
+        try:
+            conn.send(request)
+        except (EOFError, OSError):
+            conn.close()
+            if not pooled:
+                raise RemoteModelError(f"추론 데몬에 요청을 보낼 수 없습니다: {self.address}")
+            conn = self._connect()
+            conn.send(request)
+
+        finished = False
+        try:
+            while True:
+                try:
+                    status, value = conn.recv()
+                except (EOFError, OSError) as e:
+                    raise RemoteModelError(f"스트리밍 중 추론 데몬 연결이 끊어졌습니다: {e}") from e
+                if status == "chunk":
+                    yield value
+                elif status == "end":
+                    finished = True
+                    return
+                elif status == "rejected":
+                    # 데몬 슬롯 부족 → 웹 워커의 수락 제어 거절과 같은 429/503 경로
+                    finished = True
+                    raise AdmissionRejected(*value)
+                else:
+                    finished = True
+                    raise RemoteModelError(value)
+        finally:
+            # 스트림을 끝까지 읽은 연결만 재사용 (중단된 연결에는 남은 chunk가 있을 수 있음)
+            if finished:
+                self._release(conn)
+            else:
+                conn.close()
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+def _budget(max_new_tokens) -> dict:
+    # 예산을 줄이지 않은 요청은 kwargs 없이 보내 이전 버전 데몬과도 호환
+    return {"max_new_tokens": max_new_tokens} if max_new_tokens is not None else {}
+
+
+def remote_model_from_env():
+    """MODEL_SERVER_ADDRESS가 지정되어 있으면 RemoteModel을, 아니면 None을 반환합니다."""
+    address = os.getenv("MODEL_SERVER_ADDRESS")
+    if not address:
+        return None
+    return RemoteModel(address, pool_size=int(os.getenv("MODEL_SERVER_POOL_SIZE", "8")))
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="형사법 LLM 추론 데몬")
+    parser.add_argument("--address", default=os.getenv("MODEL_SERVER_ADDRESS", "/tmp/mcs-model.sock"),
+                        help="Unix 소켓 경로 또는 host:port")
+    parser.add_argument("--base", default=None, help="베이스 모델 경로 (기본: CriminalQAModel 기본값)")
+    parser.add_argument("--adapter", default=None, help="LoRA 어댑터 경로 (기본: CriminalQAModel 기본값)")
+    args = parser.parse_args()
+    address = parse_address(args.address)
+    try:
+        authkey = _authkey(address)  # 모델을 읽기 전에 설정 오류부터 확인
+    except RemoteModelError as e:
+        parser.error(str(e))
+
+    from logging_setup import configure_logging
+
+    configure_logging()
+    from ai_models.criminal_qa_model import CriminalQAModel
+
+    model_kwargs = {"adapter_path": args.adapter}
+    if args.base:
+        model_kwargs["base_model_path"] = args.base
+    model = CriminalQAModel(**model_kwargs)
+    if os.getenv("MODEL_WARMUP", "1") == "1":
+        warm_up_model(model)
+
+    server = ModelServer(
+        model,
+        address,
+        authkey,
+        max_batch_size=int(os.getenv("CHAT_BATCH_MAX_SIZE", "8")),
+        max_wait_ms=float(os.getenv("CHAT_BATCH_WAIT_MS", "10")),
+        result_timeout=float(os.getenv("CHAT_BATCH_RESULT_TIMEOUT", "300")),
+        admission=AdmissionController(
+            max_active=int(os.getenv("MODEL_SERVER_MAX_ACTIVE", "1")),
+            max_queue=int(os.getenv("MODEL_SERVER_MAX_QUEUE", "64")),
+            deadline=float(os.getenv("MODEL_SERVER_QUEUE_TIMEOUT", "30")),
+        ),
+    )
+
+    def _shutdown(signum, frame):
+        logger.info("추론 데몬 종료 중...")
+        server.close()
+
+    signal.signal(signal.SIGTERM, _shutdown)
+    signal.signal(signal.SIGINT, _shutdown)
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
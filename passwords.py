@@ -0,0 +1,173 @@
+"""
+비밀번호 해시/검증 — 요청 스레드 대신 크기가 제한된 풀에서 실행
+
+scrypt/pbkdf2는 일부러 CPU를 많이 쓰는 KDF라서, 로그인이 몰리면 모든 코어를 잡아
+같은 워커의 채팅 요청까지 느려집니다. 동시에 실행되는 해시 계산을 PASSWORD_HASH_WORKERS개로
+제한하고, 대기 중인 작업이 PASSWORD_HASH_MAX_PENDING을 넘으면 PasswordHashBusy로 거절합니다
+(호출 측은 503 + Retry-After).
+
+- hashlib의 scrypt/pbkdf2는 계산 중 GIL을 놓으므로 기본은 스레드 풀,
+  순수 파이썬 해시 등 GIL을 잡는 방식이면 PASSWORD_HASH_POOL=process
+- 저장된 해시의 방식/비용이 현재 설정과 다르면(needs_rehash) 로그인 성공 후
+  백그라운드에서 새 해시로 교체 (schedule_rehash)
+
+환경변수
+- PASSWORD_HASH_METHOD: werkzeug 해시 방식 (기본 scrypt, 예: scrypt:65536:8:1, pbkdf2:sha256:1000000)
+- PASSWORD_HASH_WORKERS: 동시에 실행할 해시 계산 수 (기본 min(4, CPU 수))
+- PASSWORD_HASH_POOL: thread(기본) | process
+- PASSWORD_HASH_MAX_PENDING: 실행+대기 중 작업 최대 수 (기본 64)
+- PASSWORD_HASH_TIMEOUT: 결과를 기다리는 최대 시간(초, 기본 10)
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+logger = logging.getLogger(__name__)
+
+_hasher = None
+_hasher_lock = threading.Lock()
+
+
+class PasswordHashBusy(Exception):
+    """해시 풀이 포화 상태여서 작업을 받을 수 없을 때 발생합니다."""
+
+
+def _method_prefix(method: str) -> str:
+    # werkzeug는 'scrypt' → 'scrypt:32768:8:1'처럼 기본 비용을 채워 저장하므로 실제 접두사를 한 번 계산
+    return generate_password_hash("", method=method).split("$", 1)[0]
+
+
+class PasswordHasher:
+    """제한된 풀에서 비밀번호 해시/검증을 실행합니다."""
+
+    def __init__(self, method: str = "scrypt", workers: int = 2, pool: str = "thread",
+                 max_pending: int = 64, timeout: float = 10.0):
+        self.method = method
+        self.prefix = _method_prefix(method)
+        self.workers = max(1, workers)
+        self.pool = pool
+        self.timeout = timeout
+        executor_class = ProcessPoolExecutor if pool == "process" else ThreadPoolExecutor
+        self._executor = executor_class(max_workers=self.workers)
+        self._slots = threading.BoundedSemaphore(max(self.workers, max_pending))
+        self.max_pending = max(self.workers, max_pending)
+        self._lock = threading.Lock()
+        self.hashed = 0
+        self.verified = 0
+        self.rehashed = 0
+        self.rejected = 0
+        self.busy_seconds = 0.0
+
+    def _submit(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise PasswordHashBusy(f"비밀번호 해시 작업이 밀려 있습니다 (max_pending={self.max_pending}).")
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def _run(self, fn, *args):
+        start = time.perf_counter()
+        try:
+            result = self._submit(fn, *args).result(timeout=self.timeout)
+        except FutureTimeoutError:
+            with self._lock:
+                self.rejected += 1
+            raise PasswordHashBusy(f"비밀번호 해시 작업이 {self.timeout}초 안에 끝나지 않았습니다.")
+        with self._lock:
+            self.busy_seconds += time.perf_counter() - start
+        return result
+
+    def hash(self, password: str) -> str:
+        result = self._run(generate_password_hash, password, self.method)
+        with self._lock:
+            self.hashed += 1
+        return result
+
+    def verify(self, stored_hash: str, password: str) -> bool:
+        result = self._run(check_password_hash, stored_hash, password)
+        with self._lock:
+            self.verified += 1
+        return result
+
+    def needs_rehash(self, stored_hash: str) -> bool:
+        """저장된 해시가 현재 방식/비용과 다르면 True."""
+        return stored_hash.split("$", 1)[0] != self.prefix
+
+    def schedule_rehash(self, user_id, old_hash: str, password: str) -> None:
+        """현재 설정으로 다시 해시해 User.password를 교체합니다 (응답을 기다리게 하지 않음).
+
+        그 사이 비밀번호가 바뀌었으면 덮어쓰지 않도록 기존 해시가 같을 때만 UPDATE 합니다.
+        """
+        try:
+            future = self._submit(generate_password_hash, password, self.method)
+        except PasswordHashBusy:
+            return  # 다음 로그인에서 다시 시도
+
+        def _store(done):
+            try:
+                new_hash = done.result()
+                from db_connection import connection
+
+                with connection() as conn:
+                    with conn.cursor() as cursor:
+                        cursor.execute(
+                            "UPDATE User SET password = %s WHERE id = %s AND password = %s",
+                            (new_hash, user_id, old_hash),
+                        )
+                    conn.commit()
+                with self._lock:
+                    self.rehashed += 1
+            except Exception as e:
+                logger.warning(f"비밀번호 해시 갱신 실패 (user_id={user_id}): {e}")
+
+        future.add_done_callback(_store)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "method": self.prefix,
+                "pool": self.pool,
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "hashed": self.hashed,
+                "verified": self.verified,
+                "rehashed": self.rehashed,
+                "rejected": self.rejected,
+                "busy_seconds": round(self.busy_seconds, 3),
+            }
+
+
+def get_password_hasher() -> PasswordHasher:
+    """환경변수 설정으로 만든 전역 PasswordHasher를 반환합니다."""
+    global _hasher
+    if _hasher is None:
+        with _hasher_lock:
+            if _hasher is None:
+                _hasher = PasswordHasher(
+                    method=os.getenv("PASSWORD_HASH_METHOD", "scrypt"),
+                    workers=int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1)))),
+                    pool=os.getenv("PASSWORD_HASH_POOL", "thread"),
+                    max_pending=int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64")),
+                    timeout=float(os.getenv("PASSWORD_HASH_TIMEOUT", "10")),
+                )
+    return _hasher
+
+
+def password_hasher_stats() -> dict:
+    """헬스체크용 해시 풀 상태 (아직 사용 전이면 빈 dict)."""
+    return _hasher.stats() if _hasher is not None else {}
@@ -1,13 +1,50 @@
 """
 기본 라우팅 (index, health)
+- /health       : 상태 요약 (모델 상태, DB 풀, 메시지 지연 쓰기, 인증 캐시, 폐기 토큰, 비밀번호 해시 풀, 로깅 큐, 보강 클라이언트,
+                  멀티턴 대화 캐시, LLM 수락 제어 대기열)
+- /health/live  : 프로세스 생존 여부 (항상 200)
+- /health/ready : 모델 로딩 완료 시 200, 로딩 중/실패 시 503 (로드밸런서 투입 판단용)
+- /metrics      : Prometheus 텍스트 형식 메트릭 (단계별/라우트별 지연 + 위 상태값, metrics.py)
 """
 
-from flask import Blueprint, jsonify, current_app, send_from_directory, render_template, request, redirect, url_for
-from db_connection import verify_jwt_token
+from flask import Blueprint, Response, jsonify, current_app, send_from_directory, render_template, request, redirect, url_for
+from admission import admission_stats
+from auth_cache import auth_cache_stats
+from conversation_cache import conversation_cache_stats
+from db_connection import pool_stats, verify_jwt_token
+from logging_setup import logging_stats
+from message_writer import message_writer_stats
+from metrics import enabled as metrics_enabled, register_collector, render as render_metrics
+from passwords import password_hasher_stats
+from runtime import MODEL_LOADING, MODEL_READY, loading_retry_after, model_status, start_model_loading
+from token_store import get_token_store
 
 bp_base = Blueprint("base", __name__)
 
 
+def _refine_stats() -> dict:
+    try:
+        from ai_models.chatgpt_api import refine_client_stats
+        return refine_client_stats()
+    except ImportError:
+        return {}
+
+
+def _model_ready() -> dict:
+    return {"ready": model_status()["state"] == MODEL_READY}
+
+
+# /metrics에서 게이지로 내보낼 구성요소 상태
+register_collector("model", _model_ready)
+register_collector("db_pool", pool_stats)
+register_collector("chat_writer", message_writer_stats)
+register_collector("auth_cache", auth_cache_stats)
+register_collector("token_store", lambda: get_token_store().stats())
+register_collector("passwords", password_hasher_stats)
+register_collector("logging", logging_stats)
+register_collector("refine", _refine_stats)
+
+
 @bp_base.get("/")
 def serve_index():
     # 로그인 페이지로 리다이렉트
@@ -30,6 +67,44 @@ def serve_main():
 
 @bp_base.get("/health")
 def health():
+    return jsonify({
+        "status": "ok",
+        "model": model_status(),
+        "db_pool": pool_stats(),
+        "chat_writer": message_writer_stats(),
+        "auth_cache": auth_cache_stats(),
+        "token_store": get_token_store().stats(),
+        "passwords": password_hasher_stats(),
+        "logging": logging_stats(),
+        "refine": _refine_stats(),
+        "conversation_cache": conversation_cache_stats(),
+        "admission": admission_stats()
+    })
+
+
+@bp_base.get("/health/live")
+def health_live():
     return jsonify({"status": "ok"})
 
 
+@bp_base.get("/health/ready")
+def health_ready():
+    # 아직 로딩 전이면 여기서 시작 (PRELOAD_MODEL=0 환경)
+    start_model_loading()
+    status = model_status()
+    if status["state"] == MODEL_READY:
+        return jsonify({"status": "ready", "model": status})
+    response = jsonify({"status": "not_ready", "model": status})
+    response.status_code = 503
+    if status["state"] == MODEL_LOADING:
+        response.headers["Retry-After"] = str(loading_retry_after())
+    return response
+
+
+@bp_base.get("/metrics")
+def metrics():
+    if not metrics_enabled():
+        return jsonify({"error": "METRICS=0"}), 404
+    return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
+
+
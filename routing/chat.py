@@ -2,18 +2,57 @@
 채팅 관련 라우팅 블루프린트
 
 파이프라인:
-  1) 형사법 LLM 1차 응답 (CriminalQAModel.generate_answer)
+  1) 형사법 LLM 1차 응답 (CriminalQAModel.generate_answer, 동시 요청은 runtime 배칭 스케줄러 경유)
   2) 품질 판정 (is_weak)
   3) 필요 시 ChatGPT 보강 (refine_with_chatgpt)
 
+멀티턴(CHAT_MULTI_TURN=1): chat_room_id가 있는 /api/chat/turn, /api/chat/stream 요청은 1)을
+채팅방 대화 문맥(conversation_cache)으로 생성합니다. 답변이 문맥에 따라 달라지므로 답변 캐시와
+동일 질문 병합은 건너뛰고, 2)/3)은 그대로 실행합니다.
+
+수락 제어(admission.py): 1)은 제한된 슬롯/대기열을 거쳐 실행됩니다. 넘치면 429/503 + Retry-After로
+바로 거절하고, 대기열이 차오르면 생성 예산(max_new_tokens)을 줄여 답합니다 (응답에 "degraded": true,
+이런 답변은 캐시하지 않음).
+
 [수정 금지] 위 3단계의 호출 순서/인터페이스를 변경하지 마세요.
 """
 
-from flask import Blueprint, request, jsonify
+import json
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextlib import closing
+
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from admission import AdmissionRejected, admission_stats, admitted, get_admission_controller
 from runtime import get_model, is_model_available  # [수정 금지]
-from db_connection import get_db
+from runtime import DEFAULT_INSTRUCTION, get_batch_scheduler, is_model_loading, loading_retry_after
+from caching import answer_namespace, get_answer_cache, make_answer_key
+from semantic_cache import get_semantic_cache
+from conversation_cache import conversation_cache_stats, get_conversation_cache
+from singleflight import SingleFlight, SingleFlightTimeout
+from db_connection import CHAT_MESSAGE_COLUMNS, INSERT_CHAT_MESSAGE_SQL, connection, get_db
+from message_writer import MessageQueueFull, get_message_writer
+from routing.pagination import page_args, split_page
+from metrics import IS_WEAK_TOTAL, REFINE_TOTAL, count, register_collector, stage_timer
 
 bp_chat = Blueprint("chat", __name__)
+logger = logging.getLogger(__name__)
+
+# 동일 질문 병합: follower 최대 대기 시간(초)은 SINGLEFLIGHT_TIMEOUT (기본 120)
+_inflight = SingleFlight(timeout=float(os.getenv("SINGLEFLIGHT_TIMEOUT", "120")))
+register_collector("singleflight", _inflight.stats)
+register_collector("answer_cache", lambda: _stats_or_empty(get_answer_cache()))
+register_collector("semantic_cache", lambda: _stats_or_empty(get_semantic_cache()))
+register_collector("conversation_cache", conversation_cache_stats)
+register_collector("admission", admission_stats)
+
+
+def _stats_or_empty(cache) -> dict:
+    # 캐시가 꺼져 있으면(None) /metrics에 내보낼 값 없음
+    return cache.stats() if cache is not None else {}
 
 
 @bp_chat.post("/api/chat")
@@ -23,46 +62,552 @@ def api_chat():
     if not question:
         return jsonify({"error": "message 필드는 필수입니다."}), 400
 
+    result = _answer_question(question)
+    if not isinstance(result, dict):
+        return result
+    return jsonify(result)
+
+
+@bp_chat.post("/api/chat/turn")
+def api_chat_turn():
+    """/api/chat과 같은 파이프라인으로 답변하고, 질문/답변을 서버에서 바로 ChatMessage로 저장합니다.
+
+    요청: {"message", "chat_room_id", "user_id"}
+    응답: /api/chat 응답 + {"saved", "message_id", "queued"}
+      - 지연 쓰기(CHAT_WRITE_BEHIND=1) 사용 시 응답 후 일괄 저장 → message_id는 null, queued=true
+      - 멀티턴(CHAT_MULTI_TURN=1)이면 같은 채팅방의 이전 대화를 문맥으로 답변 (응답에 "multi_turn": true)
+    """
+    data = request.get_json(silent=True) or {}
+    question = (data.get("message") or "").strip()
+    chat_room_id = data.get("chat_room_id")
+    user_id = data.get("user_id")
+    if not question:
+        return jsonify({"error": "message 필드는 필수입니다."}), 400
+    if not chat_room_id or not user_id:
+        return jsonify({"error": "chat_room_id와 user_id는 필수입니다."}), 400
+
+    result = _answer_question(question, chat_room_id)
+    if not isinstance(result, dict):
+        return result
+    if result["model_available"]:
+        result.update(_persist_turn(user_id, chat_room_id, question, result["answer"]))
+    return jsonify(result)
+
+
+def _answer_question(question: str, chat_room_id=None):
+    """캐시 → single-flight → 파이프라인 순으로 답변 dict를, 즉시 응답해야 하면 Response를 반환합니다.
+
+    chat_room_id가 있고 멀티턴이 켜져 있으면 채팅방 대화 문맥으로 답변합니다.
+    """
+    # 모델이 백그라운드에서 로딩 중이면 기다리지 않고 바로 503 (Retry-After)
+    if is_model_loading():
+        return _model_loading_response()
+
     # AI 모델 사용 가능 여부 확인
     if not is_model_available():
-        return jsonify({
+        return {
             "answer": "죄송합니다. 현재 AI 모델이 로드되지 않았습니다. ai_models 디렉토리가 있는지 확인해주세요.",
             "refined": False,
             "model_available": False
-        })
+        }
 
-    # 1) 형사법 LLM 1차 응답 — [수정 금지]
     model = get_model()
     if model is None:
-        return jsonify({
+        return {
             "answer": "AI 모델을 초기화할 수 없습니다.",
             "refined": False,
             "model_available": False
-        })
-    
-    law_answer = model.generate_answer(question)
+        }
+
+    conversation = get_conversation_cache(model) if chat_room_id else None
+    if conversation is not None:
+        try:
+            return _run_conversation_pipeline(conversation, chat_room_id, question)
+        except AdmissionRejected as e:
+            return _admission_rejected_response(e)
+
+    # 반복/유사 질문은 캐시에서 바로 응답 (정규화 질문 + 지시사항 + 어댑터 + 생성 파라미터 기준)
+    cached = _lookup_cached_answer(model, question)
+    if cached is not None:
+        return {
+            "answer": cached["answer"],
+            "refined": cached["refined"],
+            "model_available": True,
+            "cached": cached["cached"]
+        }
+
+    # 같은 질문이 이미 처리 중이면 새로 생성하지 않고 그 결과를 공유 (single-flight)
+    try:
+        result, coalesced = _inflight.do(_cache_key(model, question), lambda: _run_pipeline(model, question))
+    except SingleFlightTimeout as e:
+        return jsonify({"error": str(e)}), 504
+    except FutureTimeoutError:
+        # 배칭 스케줄러가 CHAT_BATCH_RESULT_TIMEOUT 안에 답을 못 준 경우
+        return jsonify({"error": "답변 생성 시간이 초과되었습니다."}), 504
+    except AdmissionRejected as e:
+        # 선행 요청이 거절되면 병합된 follower도 같은 응답
+        return _admission_rejected_response(e)
+
+    response = {
+        "answer": result["answer"],
+        "refined": result["refined"],
+        "model_available": True
+    }
+    if result.get("degraded"):
+        response["degraded"] = True
+    if coalesced:
+        response["coalesced"] = True
+    return response
+
+
+def _persist_turn(user_id, chat_room_id, question: str, answer: str) -> dict:
+    """질문/답변 한 턴을 저장합니다. 지연 쓰기가 켜져 있으면 큐에 넣고 바로 반환 (가득 차면 동기 저장).
+
+    반환: {"saved": bool, "message_id": int | None, "queued": bool}
+    """
+    writer = get_message_writer()
+    if writer is not None:
+        try:
+            writer.submit(user_id, chat_room_id, question, answer)
+            return {"saved": True, "message_id": None, "queued": True}
+        except MessageQueueFull as e:
+            logger.warning(f"지연 쓰기 큐 포화, 동기 저장으로 폴백합니다: {e}")
+
+    try:
+        with connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(INSERT_CHAT_MESSAGE_SQL, (user_id, chat_room_id, question, answer))
+                message_id = cursor.lastrowid
+            conn.commit()
+        return {"saved": True, "message_id": message_id, "queued": False}
+    except Exception as e:
+        # 답변은 이미 생성됐으므로 응답은 그대로 주고 저장 실패만 알림
+        logger.error(f"채팅 메시지 저장 실패 (chat_room_id={chat_room_id}): {e}")
+        return {"saved": False, "message_id": None, "queued": False}
+
+
+def _model_loading_response():
+    response = jsonify({
+        "error": "AI 모델을 로딩 중입니다. 잠시 후 다시 시도해주세요.",
+        "model_available": False,
+        "model_state": "loading"
+    })
+    response.status_code = 503
+    response.headers["Retry-After"] = str(loading_retry_after())
+    return response
+
+
+def _admission_rejected_response(e: AdmissionRejected):
+    response = jsonify({"error": str(e), "model_available": True, "retry_after": e.retry_after})
+    response.status_code = e.status
+    response.headers["Retry-After"] = str(e.retry_after)
+    return response
+
+
+def _budget_kwargs(ticket, model) -> dict:
+    """부하로 줄어든 생성 예산이 있으면 {"max_new_tokens": n}, 아니면 {} (기존 호출 그대로)."""
+    max_new_tokens = ticket.max_new_tokens(model)
+    return {"max_new_tokens": max_new_tokens} if max_new_tokens is not None else {}
+
+
+def _run_pipeline(model, question: str) -> dict:
+    """1차 응답 → 품질 점검 → 필요 시 보강을 실행하고 결과를 캐시에 저장합니다."""
+    # 1) 형사법 LLM 1차 응답 — [수정 금지]
+    # 동시 요청은 배칭 스케줄러가 모아 한 번의 generate로 처리 (비활성화 시 단건 호출)
+    # 수락 제어: 슬롯이 없으면 대기/거절, 대기열이 차오르면 생성 예산 축소
+    scheduler = get_batch_scheduler()
+    with admitted() as ticket, stage_timer("llm"):
+        budget = _budget_kwargs(ticket, model)
+        if scheduler is not None:
+            law_answer = scheduler.generate(question, **budget)
+        else:
+            law_answer = model.generate_answer(question, **budget)
 
     # 2) 품질 점검 + 필요 시 보강 — [수정 금지]
+    final_answer, refined, refine_failed = _check_and_refine(question, law_answer)
+
+    result = {"draft": law_answer, "answer": final_answer, "refined": refined}
+    if budget:
+        result["degraded"] = True
+    if _is_cacheable(law_answer, refine_failed, degraded=bool(budget)):
+        _store_answer(model, question, result)
+    return result
+
+
+def _run_conversation_pipeline(conversation, chat_room_id, question: str) -> dict:
+    """멀티턴: 채팅방 대화 문맥으로 1차 응답 → 품질 점검 → 필요 시 보강 (캐시/병합 없음)"""
+    with admitted() as ticket, stage_timer("llm"):
+        budget = _budget_kwargs(ticket, conversation.model)
+        try:
+            law_answer = conversation.answer(chat_room_id, question, **budget)
+        except Exception as e:
+            logger.error(f"멀티턴 답변 생성 중 오류 (chat_room_id={chat_room_id}): {e}")
+            law_answer = f"답변 생성 중 오류가 발생했습니다: {e}"
+
+    final_answer, refined, _ = _check_and_refine(question, law_answer)
+    if refined:
+        # 다음 턴 문맥은 사용자가 본 보강 답변 기준
+        conversation.revise(chat_room_id, final_answer)
+    response = {
+        "answer": final_answer,
+        "refined": refined,
+        "model_available": True,
+        "multi_turn": True
+    }
+    if budget:
+        response["degraded"] = True
+    return response
+
+
+def _check_and_refine(question: str, law_answer: str) -> tuple:
+    """품질 점검 후 필요하면 ChatGPT로 보강합니다. 반환: (최종 답변, 보강 여부, 보강 실패 여부)"""
     final_answer = law_answer
     refined = False
+    refine_failed = False
     try:
         from ai_models.chatgpt_api import is_weak, refine_with_chatgpt
-        if is_weak(law_answer):
-            final_answer = refine_with_chatgpt(question, law_answer)
+        with stage_timer("is_weak"):
+            weak = is_weak(law_answer)
+        count(IS_WEAK_TOTAL, "weak" if weak else "ok")
+        if weak:
+            with stage_timer("refine"):
+                final_answer = refine_with_chatgpt(question, law_answer)
             refined = True
+            count(REFINE_TOTAL, "ok")
     except ImportError:
         # ChatGPT API가 없으면 원본 답변 사용
         final_answer = law_answer
-    except Exception:
+    except Exception as e:
+        # 타임아웃/재시도 소진/서킷 오픈 시 LLM 초안으로 폴백
+        logger.warning(f"ChatGPT 보강 실패, 초안으로 응답합니다: {e}")
         final_answer = law_answer
+        refine_failed = True
+        count(REFINE_TOTAL, "failed")
+    return final_answer, refined, refine_failed
 
+
+@bp_chat.get("/api/chat/cache/stats")
+def answer_cache_stats():
+    """답변 캐시(정확 일치/유사 질문) 적중/미스/제거 카운터와 동일 요청 병합 카운터를 반환합니다."""
+    cache = get_answer_cache()
+    semantic = get_semantic_cache()
     return jsonify({
-        "answer": final_answer,
-        "refined": refined,
-        "model_available": True
+        "exact": {"enabled": True, **cache.stats()} if cache is not None else {"enabled": False},
+        "semantic": {"enabled": True, **semantic.stats()} if semantic is not None else {"enabled": False},
+        "singleflight": _inflight.stats(),
     })
 
 
+def _cache_namespace(model) -> str:
+    return answer_namespace(
+        DEFAULT_INSTRUCTION,
+        getattr(model, "adapter_path", None),
+        getattr(model, "generation_config", None),
+    )
+
+
+def _cache_key(model, question: str) -> str:
+    return make_answer_key(
+        question,
+        DEFAULT_INSTRUCTION,
+        getattr(model, "adapter_path", None),
+        getattr(model, "generation_config", None),
+    )
+
+
+def _lookup_cached_answer(model, question: str):
+    """정확 일치 캐시 → 유사 질문 캐시 순으로 조회합니다. 적중 시 "cached" 필드가 붙은 항목 반환."""
+    cache = get_answer_cache()
+    if cache is not None:
+        key = _cache_key(model, question)
+        entry = cache.get(key)
+        if entry is not None:
+            return {**entry, "cached": "exact"}
+
+    semantic = get_semantic_cache()
+    if semantic is not None:
+        entry, _score = semantic.lookup(question, _cache_namespace(model))
+        if entry is not None:
+            return {**entry, "cached": "semantic"}
+    return None
+
+
+def _store_answer(model, question: str, entry: dict) -> None:
+    cache = get_answer_cache()
+    if cache is not None:
+        key = _cache_key(model, question)
+        cache.set(key, entry)
+
+    semantic = get_semantic_cache()
+    if semantic is not None:
+        semantic.insert(question, entry, _cache_namespace(model))
+
+
+def _is_cacheable(law_answer: str, refine_failed: bool, degraded: bool = False) -> bool:
+    """생성 오류, 보강 실패, 부하로 줄인 예산으로 얻은 답변은 캐시하지 않습니다 (다음 요청에서 재시도)."""
+    if refine_failed or degraded:
+        return False
+    return not law_answer.startswith("답변 생성 중 오류가 발생했습니다")
+
+
+def _sse(event: str, data: dict) -> str:
+    """Server-Sent-Events 한 건을 직렬화합니다."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _sse_error(e: Exception) -> str:
+    """error 이벤트. 수락 제어 거절이면 HTTP 응답과 같은 status/retry_after를 함께 보냅니다."""
+    payload = {"error": str(e)}
+    if isinstance(e, AdmissionRejected):
+        payload.update(status=e.status, retry_after=e.retry_after)
+    return _sse("error", payload)
+
+
+_STREAM_END = object()
+
+
+def _detached(events):
+    """events 제너레이터를 별도 스레드에서 끝까지 실행하고, 나온 이벤트를 SSE 응답으로 넘깁니다.
+
+    클라이언트가 중간에 끊어도 생성 → 보강 → 턴 저장은 끝까지 진행됩니다 (끊긴 뒤 이벤트는 버림).
+    """
+    events_queue = queue.Queue()
+    abandoned = threading.Event()
+
+    def run():
+        try:
+            for event in events:
+                if not abandoned.is_set():
+                    events_queue.put(event)
+        except Exception as e:
+            logger.error(f"스트리밍 응답 처리 실패: {e}")
+            events_queue.put(_sse_error(e))
+        finally:
+            events_queue.put(_STREAM_END)
+
+    threading.Thread(target=run, name="chat-stream", daemon=True).start()
+
+    def relay():
+        try:
+            while True:
+                event = events_queue.get()
+                if event is _STREAM_END:
+                    return
+                yield event
+        finally:
+            abandoned.set()
+
+    return relay()
+
+
+@bp_chat.post("/api/chat/stream")
+def api_chat_stream():
+    """/api/chat과 같은 파이프라인을 SSE로 스트리밍합니다.
+
+    이벤트 순서:
+      draft  {"delta": ...}  — LLM 초안 토큰 조각 (디코딩되는 대로)
+      refine {"delta": ...}  — is_weak 시 ChatGPT 보강 델타 (첫 델타부터 초안을 대체)
+      done   {"answer": ..., "refined": bool, "model_available": bool}
+
+    chat_room_id/user_id를 함께 보내면 /api/chat/turn처럼 서버에서 턴을 저장하고
+    done 이벤트에 {"saved", "message_id", "queued"}를 붙입니다. 이때 파이프라인은 응답과 분리된
+    스레드에서 돌아, 클라이언트가 중간에 끊어도 답변 생성과 저장은 끝까지 진행됩니다.
+    멀티턴(CHAT_MULTI_TURN=1)이면 chat_room_id의 대화 문맥으로 생성합니다.
+    """
+    data = request.get_json(silent=True) or {}
+    question = (data.get("message") or "").strip()
+    if not question:
+        return jsonify({"error": "message 필드는 필수입니다."}), 400
+    chat_room_id = data.get("chat_room_id")
+    user_id = data.get("user_id")
+
+    def done(payload: dict) -> str:
+        if chat_room_id and user_id and payload.get("model_available"):
+            payload.update(_persist_turn(user_id, chat_room_id, question, payload["answer"]))
+        return _sse("done", payload)
+
+    if is_model_loading():
+        return _model_loading_response()
+
+    model = get_model() if is_model_available() else None
+
+    # 대기열이 이미 가득 찼으면 스트림을 열기 전에 429 (캐시 적중은 LLM을 쓰지 않으므로 통과)
+    controller = get_admission_controller() if model is not None else None
+    if controller is not None and controller.saturated():
+        multi_turn = chat_room_id and get_conversation_cache(model) is not None
+        if multi_turn or _lookup_cached_answer(model, question) is None:
+            try:
+                controller.check()
+            except AdmissionRejected as e:
+                return _admission_rejected_response(e)
+
+    def stream_draft(stream):
+        # 1) LLM 초안을 수락 제어를 거쳐 스트리밍. 반환: (초안, 예산 축소 여부)
+        # 대기 중 거절되면 AdmissionRejected (스트림이 이미 열렸으므로 error 이벤트로 전달)
+        # 클라이언트가 끊기면(GeneratorExit) 모델 스트림을 먼저 닫아 생성 스레드가 멈출 때까지 기다린 뒤
+        # 슬롯을 반납 → 수락 제어가 세는 LLM 작업 수 = 실제로 돌고 있는 generate 수
+        parts = []
+        with admitted() as ticket:
+            budget = _budget_kwargs(ticket, model)
+            try:
+                with stage_timer("llm"), closing(stream(**budget)) as chunks:
+                    for delta in chunks:
+                        parts.append(delta)
+                        yield _sse("draft", {"delta": delta})
+                law_answer = "".join(parts).strip()
+            except AdmissionRejected:
+                raise  # 추론 데몬의 슬롯 부족도 error 이벤트(status/retry_after)로 전달
+            except Exception as e:
+                law_answer = f"답변 생성 중 오류가 발생했습니다: {e}"
+                yield _sse("draft", {"delta": law_answer})
+        return law_answer, bool(budget)
+
+    def stream_conversation(conversation):
+        # 멀티턴: 채팅방 문맥으로 초안 스트리밍 (답변 캐시/동일 질문 병합 없음)
+        try:
+            law_answer, degraded = yield from stream_draft(
+                lambda **budget: conversation.stream(chat_room_id, question, **budget))
+        except AdmissionRejected as e:
+            yield _sse_error(e)
+            return
+
+        outcome = {}
+        yield from _stream_check_and_refine(question, law_answer, outcome)
+        if outcome["refined"]:
+            conversation.revise(chat_room_id, outcome["answer"])
+        payload = {
+            "answer": outcome["answer"],
+            "refined": outcome["refined"],
+            "model_available": True,
+            "multi_turn": True
+        }
+        if degraded:
+            payload["degraded"] = True
+        yield done(payload)
+
+    def generate():
+        if model is None:
+            yield _sse("done", {
+                "answer": "죄송합니다. 현재 AI 모델이 로드되지 않았습니다. ai_models 디렉토리가 있는지 확인해주세요.",
+                "refined": False,
+                "model_available": False
+            })
+            return
+
+        conversation = get_conversation_cache(model) if chat_room_id else None
+        if conversation is not None:
+            yield from stream_conversation(conversation)
+            return
+
+        cached = _lookup_cached_answer(model, question)
+        if cached is not None:
+            yield _sse("draft", {"delta": cached["answer"]})
+            yield done({
+                "answer": cached["answer"],
+                "refined": cached["refined"],
+                "model_available": True,
+                "cached": cached["cached"]
+            })
+            return
+
+        # 같은 질문이 이미 처리 중이면 그 결과를 기다려 한 번에 전달 (single-flight)
+        key = _cache_key(model, question)
+        call, is_leader = _inflight.begin(key)
+        if not is_leader:
+            try:
+                shared = _inflight.wait(call)
+            except Exception as e:
+                # 선행 요청이 수락 제어로 거절됐으면 같은 status/retry_after로 전달
+                yield _sse_error(e)
+                return
+            yield _sse("draft", {"delta": shared["answer"]})
+            yield done({
+                "answer": shared["answer"],
+                "refined": shared["refined"],
+                "model_available": True,
+                "coalesced": True
+            })
+            return
+
+        result = None
+        error = None
+        try:
+            # 1) 형사법 LLM 1차 응답 (스트리밍)
+            try:
+                law_answer, degraded = yield from stream_draft(
+                    lambda **budget: model.stream_answer(question, **budget))
+            except AdmissionRejected as e:
+                error = e
+                yield _sse_error(e)
+                return
+
+            # 2) 품질 점검 + 필요 시 보강 (스트리밍)
+            outcome = {}
+            yield from _stream_check_and_refine(question, law_answer, outcome)
+
+            result = {"draft": law_answer, "answer": outcome["answer"], "refined": outcome["refined"]}
+            if degraded:
+                result["degraded"] = True
+            if _is_cacheable(law_answer, outcome["refine_failed"], degraded):
+                _store_answer(model, question, result)
+
+            payload = {
+                "answer": outcome["answer"],
+                "refined": outcome["refined"],
+                "model_available": True
+            }
+            if degraded:
+                payload["degraded"] = True
+            yield done(payload)
+        finally:
+            # 클라이언트가 중간에 끊어도 follower가 무한 대기하지 않도록 항상 종료 기록
+            if result is None and error is None:
+                error = RuntimeError("동일 질문의 선행 요청이 중단되었습니다.")
+            _inflight.finish(key, call, result=None if error else result, error=error)
+
+    # 저장할 턴이면 SSE 소비 여부와 무관하게 끝까지 실행
+    # (아니면 끊긴 뒤 다음 토큰에서 생성을 취소하고, 생성 스레드가 끝나야 수락 슬롯을 반납)
+    events = _detached(generate()) if chat_room_id and user_id else generate()
+    return Response(
+        stream_with_context(events),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _stream_check_and_refine(question: str, law_answer: str, outcome: dict):
+    """품질 점검 후 필요하면 ChatGPT 보강을 refine 이벤트로 스트리밍합니다.
+
+    끝나면 outcome에 {"answer", "refined", "refine_failed"}를 채웁니다.
+    """
+    final_answer = law_answer
+    refined = False
+    refine_failed = False
+    try:
+        from ai_models.chatgpt_api import is_weak, stream_refine_with_chatgpt
+        with stage_timer("is_weak"):
+            weak = is_weak(law_answer)
+        count(IS_WEAK_TOTAL, "weak" if weak else "ok")
+        if weak:
+            refined_parts = []
+            with stage_timer("refine"):
+                for delta in stream_refine_with_chatgpt(question, law_answer):
+                    refined_parts.append(delta)
+                    yield _sse("refine", {"delta": delta})
+            if refined_parts:
+                final_answer = "".join(refined_parts)
+                refined = True
+            count(REFINE_TOTAL, "ok")
+    except ImportError:
+        final_answer = law_answer
+    except Exception as e:
+        logger.warning(f"ChatGPT 보강 스트리밍 실패, 초안으로 응답합니다: {e}")
+        final_answer = law_answer
+        refine_failed = True
+        count(REFINE_TOTAL, "failed")
+    outcome.update(answer=final_answer, refined=refined, refine_failed=refine_failed)
+
+
 @bp_chat.post("/chat/message")
 def save_chat_message():
     """채팅 메시지를 데이터베이스에 저장"""
@@ -75,14 +620,24 @@ def save_chat_message():
     if not all([user_id, chat_room_id, question, response]):
         return jsonify({"error": "필수 필드가 누락되었습니다"}), 400
 
+    # 지연 쓰기 사용 시 큐에 넣고 바로 응답 (저장은 백그라운드에서 일괄 커밋)
+    writer = get_message_writer()
+    if writer is not None:
+        try:
+            writer.submit(user_id, chat_room_id, question, response)
+            return jsonify({
+                "message": "채팅 메시지 저장 요청 접수",
+                "message_id": None,
+                "queued": True
+            }), 202
+        except MessageQueueFull as e:
+            logger.warning(f"지연 쓰기 큐 포화, 동기 저장으로 폴백합니다: {e}")
+
     try:
         db = get_db()
         cursor = db.cursor()
         
-        cursor.execute(
-            "INSERT INTO ChatMessage (user_id, chat_room_id, question, response) VALUES (%s, %s, %s, %s)",
-            (user_id, chat_room_id, question, response)
-        )
+        cursor.execute(INSERT_CHAT_MESSAGE_SQL, (user_id, chat_room_id, question, response))
         db.commit()
         
         return jsonify({
@@ -101,18 +656,32 @@ def save_chat_message():
 
 @bp_chat.get("/chat/messages/<int:chat_room_id>")
 def get_chat_messages(chat_room_id):
-    """특정 채팅방의 메시지들을 조회"""
+    """특정 채팅방의 메시지를 최신 페이지부터 조회 (?before_id=&limit=, 기본 50 / 최대 200)
+
+    각 페이지의 messages는 오래된 순(ASC)으로 정렬되어 있고,
+    더 오래된 메시지는 next_before_id를 before_id로 넘겨 이어서 가져옵니다.
+    """
+    try:
+        before_id, limit = page_args(request.args, default_limit=50, max_limit=200)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     try:
         db = get_db()
         cursor = db.cursor()
         
-        cursor.execute(
-            "SELECT question, response, created_at FROM ChatMessage WHERE chat_room_id = %s ORDER BY created_at ASC",
-            (chat_room_id,)
-        )
-        messages = cursor.fetchall()
+        sql = f"SELECT {CHAT_MESSAGE_COLUMNS} FROM ChatMessage WHERE chat_room_id = %s"
+        params = [chat_room_id]
+        if before_id is not None:
+            sql += " AND id < %s"
+            params.append(before_id)
+        sql += " ORDER BY id DESC LIMIT %s"
+        params.append(limit + 1)
+        cursor.execute(sql, params)
+        messages, page = split_page(cursor.fetchall(), limit)
+        messages.reverse()
         
-        return jsonify(messages), 200
+        return jsonify({"messages": messages, **page}), 200
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -121,5 +690,3 @@ def get_chat_messages(chat_room_id):
             cursor.close()
         if 'db' in locals():
             db.close()
-
-
@@ -12,6 +12,9 @@ from db_connection import (
     delete_chat_room,
     get_user_by_id
 )
+from conversation_cache import drop_conversation
+from message_writer import flush_pending
+from routing.pagination import page_args, split_page
 
 bp_chatroom = Blueprint("chatroom", __name__)
 
@@ -42,12 +45,19 @@ def create_new_chatroom():
 
 @bp_chatroom.get("/api/chatrooms/user/<int:user_id>")
 def get_user_chatrooms(user_id):
-    """사용자의 모든 채팅방을 가져옵니다."""
+    """사용자의 채팅방을 최신순으로 한 페이지씩 가져옵니다 (?before_id=&limit=, 기본 50 / 최대 100)."""
     try:
-        chatrooms = get_chat_rooms_by_user(user_id)
+        before_id, limit = page_args(request.args, default_limit=50, max_limit=100)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        rows = get_chat_rooms_by_user(user_id, before_id=before_id, limit=limit + 1)
+        chatrooms, page = split_page(rows, limit)
         return jsonify({
             "chatrooms": chatrooms,
-            "count": len(chatrooms)
+            "count": len(chatrooms),
+            **page
         }), 200
     except Exception as e:
         return jsonify({"error": f"채팅방 조회 실패: {str(e)}"}), 500
@@ -90,9 +100,12 @@ def update_chatroom(room_id):
 def delete_chatroom(room_id):
     """채팅방을 삭제합니다."""
     try:
+        # 지연 쓰기 대기 중인 이 방의 메시지를 먼저 저장 (삭제 뒤 INSERT는 FK 오류)
+        flush_pending()
         success = delete_chat_room(room_id)
         if not success:
             return jsonify({"error": "채팅방을 찾을 수 없습니다."}), 404
+        drop_conversation(room_id)
         
         return jsonify({
             "message": "채팅방이 삭제되었습니다.",
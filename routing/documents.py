@@ -1,5 +1,5 @@
 from flask import Blueprint, request, jsonify
-from db_connection import get_db
+from db_connection import connection
 #AI가 생성한 법률 문서(고소장, 진술서)를 DB에 저장하는 기능 수정중
 bp_documents = Blueprint("documents", __name__, url_prefix="/documents")
 
@@ -15,14 +15,14 @@ def create_document():
         return jsonify({"error": "필수 입력값 누락"}), 400
 
     try:
-        conn = get_db()
-        cursor = conn.cursor()
-        sql = """
-        INSERT INTO GeneratedDocument (user_id, document_type, input_facts, document_text)
-        VALUES (%s, %s, %s, %s)
-        """
-        cursor.execute(sql, (user_id, document_type, input_facts, document_text))
-        conn.commit()
-        return jsonify({"message": "문서 생성 성공", "document_id": cursor.lastrowid}), 201
+        with connection() as conn:
+            with conn.cursor() as cursor:
+                sql = """
+                INSERT INTO GeneratedDocument (user_id, document_type, input_facts, document_text)
+                VALUES (%s, %s, %s, %s)
+                """
+                cursor.execute(sql, (user_id, document_type, input_facts, document_text))
+                conn.commit()
+                return jsonify({"message": "문서 생성 성공", "document_id": cursor.lastrowid}), 201
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -0,0 +1,35 @@
+"""
+키셋(커서) 페이지네이션 공통 유틸
+- 요청 파라미터: before_id (이 id보다 오래된 항목부터), limit (한 페이지 크기)
+- 조회는 id 내림차순으로 limit + 1건을 가져와 다음 페이지 존재 여부를 판단
+- 응답 메타: next_before_id (다음 요청에 넘길 커서, 마지막 페이지면 None), has_more
+
+OFFSET 없이 인덱스 범위 스캔만 하므로 기록이 아무리 많아도 페이지당 조회 비용이 일정합니다.
+"""
+
+
+def page_args(args, default_limit: int = 50, max_limit: int = 100):
+    """request.args에서 (before_id, limit)을 읽습니다. 잘못된 값이면 ValueError."""
+    before_id = args.get("before_id")
+    limit = args.get("limit")
+    try:
+        before_id = int(before_id) if before_id not in (None, "") else None
+        limit = int(limit) if limit not in (None, "") else default_limit
+    except ValueError:
+        raise ValueError("before_id와 limit은 정수여야 합니다.")
+    if before_id is not None and before_id <= 0:
+        raise ValueError("before_id는 1 이상이어야 합니다.")
+    if limit <= 0:
+        raise ValueError("limit은 1 이상이어야 합니다.")
+    return before_id, min(limit, max_limit)
+
+
+def split_page(rows: list, limit: int):
+    """limit + 1건으로 조회한 id 내림차순 rows를 (페이지, 메타)로 나눕니다."""
+    has_more = len(rows) > limit
+    page = rows[:limit]
+    meta = {
+        "next_before_id": page[-1]["id"] if has_more and page else None,
+        "has_more": has_more,
+    }
+    return page, meta
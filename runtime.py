@@ -1,49 +1,152 @@
 """
 AI 런타임 유틸
-- 전역 모델 핸들(get_model)
+- 전역 모델 핸들(get_model) — MODEL_SERVER_ADDRESS 지정 시 추론 데몬 클라이언트(model_server.RemoteModel)
+- 백그라운드 로딩 + 상태(start_model_loading, model_status: idle/loading/ready/failed) + 워밍업
 - 사전 로딩(preload_model_if_configured)
+- 마이크로 배칭 스케줄러(get_batch_scheduler)
 
 [수정 금지] CriminalQAModel의 인터페이스나 호출 순서를 변경하지 마세요.
+
+환경변수
+- CHAT_BATCH_MAX_SIZE: 한 번에 묶어 추론할 최대 질문 수 (기본 8, 1이면 배칭 비활성화)
+- CHAT_BATCH_WAIT_MS: 첫 질문 도착 후 추가 질문을 기다리는 시간(ms, 기본 10)
+- CHAT_BATCH_RESULT_TIMEOUT: 배칭된 답변을 기다리는 최대 시간(초, 기본 300, 0이면 무제한)
+- MODEL_WARMUP: '1'(기본)이면 로딩 직후 짧은 생성으로 워밍업 (MODEL_WARMUP_TOKENS, 기본 8토큰)
+- MODEL_RETRY_INTERVAL: 로딩 실패 후 재시도까지 대기 시간(초, 기본 30)
+- MODEL_LOADING_RETRY_AFTER: 로딩 중 503 응답의 Retry-After(초, 기본 10)
+- MODEL_SERVER_ADDRESS: 지정 시 이 프로세스에서 모델을 로드하지 않고 추론 데몬(python -m model_server)에 연결
 """
 
+import logging
 import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from contextlib import nullcontext
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INSTRUCTION = "형사법 질문에 답변하세요"
+
+# 모델 로딩 상태: idle(미시작) → loading → ready | failed
+MODEL_IDLE = "idle"
+MODEL_LOADING = "loading"
+MODEL_READY = "ready"
+MODEL_FAILED = "failed"
 
 _model = None
 _model_available = False
+_model_state = MODEL_IDLE
+_model_error = None
+_model_failed_at = 0.0
+_model_lock = threading.Lock()
+_model_loaded = threading.Condition(_model_lock)
+_batch_scheduler = None
+_batch_scheduler_lock = threading.Lock()
+
+
+def _create_model():
+    if os.getenv("MODEL_SERVER_ADDRESS"):
+        # 웹 워커 여러 개가 박스당 하나의 모델을 공유 (model_server 데몬)
+        from model_server import remote_model_from_env
+        return remote_model_from_env()
+    from ai_models.criminal_qa_model import CriminalQAModel
+    model = CriminalQAModel()
+    # 토큰화/prefill/decode 소요 시간을 /metrics로 내보냄
+    from metrics import observe_model_stage
+    model.stage_observer = observe_model_stage
+    return model
+
+
+def warm_up_model(model) -> None:
+    """짧은 생성 한 번으로 커널/JIT/할당기 초기화를 첫 사용자 요청 전에 끝냅니다.
+
+    생성 길이는 호출 인자로만 줄이고 공유 generation_config는 건드리지 않습니다 (동시 요청에 새지 않도록).
+    """
+    model.generate_answer("워밍업 질문입니다.", max_new_tokens=int(os.getenv("MODEL_WARMUP_TOKENS", "8")))
+
+
+def _load_model_worker() -> None:
+    global _model, _model_available, _model_state, _model_error, _model_failed_at
+    model, error = None, None
+    try:
+        model = _create_model()
+        # 원격 모델(추론 데몬)은 데몬 쪽에서 워밍업
+        if os.getenv("MODEL_WARMUP", "1") == "1" and not os.getenv("MODEL_SERVER_ADDRESS"):
+            warm_up_model(model)
+    except ImportError:
+        error = "AI 모델을 찾을 수 없습니다. ai_models 디렉토리가 없거나 모델 파일이 누락되었습니다."
+    except Exception as e:
+        error = f"AI 모델 로딩 중 오류 발생: {e}"
+    if error:
+        logger.error(error)
+
+    with _model_lock:
+        if error is None:
+            _model, _model_available, _model_state, _model_error = model, True, MODEL_READY, None
+        else:
+            _model, _model_available, _model_state, _model_error = None, False, MODEL_FAILED, error
+            _model_failed_at = time.monotonic()
+        _model_loaded.notify_all()
+
+
+def start_model_loading() -> str:
+    """백그라운드 스레드에서 모델 로딩을 한 번만 시작하고 현재 상태를 반환합니다.
+
+    실패(failed) 상태는 MODEL_RETRY_INTERVAL(초, 기본 30)이 지나면 다시 시도합니다.
+    """
+    global _model_state
+    with _model_lock:
+        retry_interval = float(os.getenv("MODEL_RETRY_INTERVAL", "30"))
+        can_retry = _model_state == MODEL_FAILED and time.monotonic() - _model_failed_at >= retry_interval
+        if _model_state == MODEL_IDLE or can_retry:
+            _model_state = MODEL_LOADING
+            threading.Thread(target=_load_model_worker, name="model-loader", daemon=True).start()
+        return _model_state
+
+
+def model_status() -> dict:
+    """헬스체크용 모델 상태 (state, error)."""
+    with _model_lock:
+        return {"state": _model_state, "error": _model_error}
+
+
+def loading_retry_after() -> int:
+    """로딩 중 503 응답에 실을 Retry-After(초)."""
+    return int(os.getenv("MODEL_LOADING_RETRY_AFTER", "10"))
+
 
 def get_model():
-    """지연 로딩 방식으로 전역 모델 핸들을 반환합니다."""
-    global _model, _model_available
-    
-    if _model is None:
-        try:
-            from ai_models.criminal_qa_model import CriminalQAModel
-            _model = CriminalQAModel()
-            _model_available = True
-        except ImportError:
-            print("AI 모델을 찾을 수 없습니다. ai_models 디렉토리가 없거나 모델 파일이 누락되었습니다.")
-            _model_available = False
-            return None
-        except Exception as e:
-            print(f"AI 모델 로딩 중 오류 발생: {e}")
-            _model_available = False
-            return None
-    
-    return _model
+    """지연 로딩 방식으로 전역 모델 핸들을 반환합니다.
+
+    로딩 중이면 완료될 때까지 기다립니다 (요청 경로에서는 is_model_available로 먼저 확인).
+    """
+    start_model_loading()
+    with _model_lock:
+        while _model_state == MODEL_LOADING:
+            _model_loaded.wait()
+        return _model
+
 
 def is_model_available():
-    """AI 모델이 사용 가능한지 확인합니다."""
-    global _model_available
-    if _model is None:
-        get_model()
+    """AI 모델이 사용 가능한지 확인합니다 (블로킹 없음, 필요 시 백그라운드 로딩 시작)."""
+    start_model_loading()
     return _model_available
 
+
+def is_model_loading() -> bool:
+    """모델이 백그라운드에서 로딩 중인지 여부."""
+    return start_model_loading() == MODEL_LOADING
+
+
 def preload_model_if_configured(logger=None) -> None:
     """서버 시작 시 모델을 미리 로딩(옵션)합니다.
 
-    - PRELOAD_MODEL 환경변수 = '1' (기본) → 사전 로딩
+    - PRELOAD_MODEL 환경변수 = '1' (기본) → 백그라운드 사전 로딩 (서버 시작을 막지 않음)
     - 디버그 모드(reloader)에서는 자식 프로세스에서만 로딩
     """
+    log = logger if logger is not None else logging.getLogger(__name__)
     try:
         should_preload = os.getenv("PRELOAD_MODEL", "1") == "1"
         if not should_preload:
@@ -53,13 +156,122 @@ def preload_model_if_configured(logger=None) -> None:
         is_reloader_child = os.environ.get("WERKZEUG_RUN_MAIN") == "true"
 
         if (not debug) or is_reloader_child:
-            model = get_model()
-            if model and logger:
-                logger.info("AI 모델 사전 로딩 완료")
-            elif not model and logger:
-                logger.info("AI 모델 없이 서버 시작")
+            start_model_loading()
+            log.info("AI 모델 백그라운드 로딩 시작 (/health/ready로 완료 확인)")
     except Exception as e:
-        if logger:
-            logger.warning(f"AI 모델 사전 로딩 실패: {e}")
-        print(f"AI 모델 사전 로딩 실패: {e}")
+        log.warning(f"AI 모델 사전 로딩 실패: {e}")
+
+
+
+class BatchScheduler:
+    """동시에 들어온 질문을 짧은 시간 모아 batch_generate 한 번으로 처리하는 스케줄러.
 
+    - 첫 질문이 도착하면 max_wait_ms 동안 또는 max_batch_size 개가 찰 때까지 추가 질문을 모음
+    - 같은 instruction(+ 생성 예산 max_new_tokens) 끼리 묶어 model.batch_generate 호출 (1건이면 generate_answer)
+    - 워커 스레드 하나가 모델 호출을 직렬화하므로 동시 generate 경합이 없음
+    - gate: 모델 호출마다 감쌀 컨텍스트 매니저 팩토리 (추론 데몬에서 스트리밍과 함께 쓰는 동시 generate 제한).
+      gate가 거절하면(AdmissionRejected 등) 그 묶음의 Future에 예외를 전달
+    """
+
+    def __init__(self, model, max_batch_size: int = 8, max_wait_ms: float = 10.0, gate=None,
+                 result_timeout: float = 300.0):
+        self.model = model
+        self.gate = gate or nullcontext
+        self.result_timeout = result_timeout if result_timeout and result_timeout > 0 else None
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="chat-batch-scheduler", daemon=True)
+        self._worker.start()
+
+    def submit(self, question: str, instruction: str = DEFAULT_INSTRUCTION, max_new_tokens: int = None) -> Future:
+        """질문을 대기열에 넣고 답변을 받을 Future를 반환합니다."""
+        future = Future()
+        self._queue.put((question, (instruction, max_new_tokens), future))
+        return future
+
+    def generate(self, question: str, instruction: str = DEFAULT_INSTRUCTION, max_new_tokens: int = None) -> str:
+        """submit 후 결과를 기다리는 동기 헬퍼 (generate_answer와 같은 사용법).
+
+        Raises:
+            concurrent.futures.TimeoutError: result_timeout 안에 답변을 받지 못함
+        """
+        future = self.submit(question, instruction, max_new_tokens)
+        try:
+            return future.result(timeout=self.result_timeout)
+        except FutureTimeoutError:
+            future.cancel()  # 아직 대기열에 있으면 생성하지 않음
+            raise
+
+    def _collect(self) -> list:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            groups = {}
+            for item in batch:
+                groups.setdefault(item[1], []).append(item)
+            for (instruction, max_new_tokens), items in groups.items():
+                live = [(question, future) for question, _, future in items
+                        if future.set_running_or_notify_cancel()]
+                if not live:
+                    continue
+                questions = [question for question, _ in live]
+                futures = [future for _, future in live]
+                # 예산을 줄이지 않은 호출은 기존 인터페이스 그대로 (max_new_tokens 인자를 모르는 모델 호환)
+                budget = {"max_new_tokens": max_new_tokens} if max_new_tokens is not None else {}
+                try:
+                    with self.gate():
+                        if len(questions) == 1:
+                            answers = [self.model.generate_answer(questions[0], instruction, **budget)]
+                        else:
+                            answers = self.model.batch_generate(questions, instruction, **budget)
+                except Exception as e:
+                    for future in futures:
+                        future.set_exception(e)
+                    continue
+                if len(answers) != len(futures):
+                    # 답변 수가 어긋나면 어느 답이 어느 질문 것인지 알 수 없으므로 묶음 전체를 실패 처리
+                    error = RuntimeError(f"배치 답변 수({len(answers)})가 질문 수({len(futures)})와 다릅니다.")
+                    logger.error(str(error))
+                    for future in futures:
+                        future.set_exception(error)
+                    continue
+                for future, answer in zip(futures, answers):
+                    future.set_result(answer)
+
+
+def get_batch_scheduler():
+    """전역 모델용 배칭 스케줄러를 반환합니다 (배칭 비활성화 또는 모델 미로딩 시 None)."""
+    global _batch_scheduler
+    max_batch_size = int(os.getenv("CHAT_BATCH_MAX_SIZE", "8"))
+    if max_batch_size <= 1:
+        return None
+    if os.getenv("MODEL_SERVER_ADDRESS"):
+        # 추론 데몬이 모든 워커의 요청을 모아 배칭하므로 워커 측 배칭은 생략
+        return None
+
+    if _batch_scheduler is None:
+        model = get_model()
+        if model is None:
+            return None
+        with _batch_scheduler_lock:
+            if _batch_scheduler is None:
+                _batch_scheduler = BatchScheduler(
+                    model,
+                    max_batch_size=max_batch_size,
+                    max_wait_ms=float(os.getenv("CHAT_BATCH_WAIT_MS", "10")),
+                    result_timeout=float(os.getenv("CHAT_BATCH_RESULT_TIMEOUT", "300")),
+                )
+    return _batch_scheduler
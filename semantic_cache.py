@@ -0,0 +1,311 @@
+"""
+의미 유사 질문 캐시 (로컬 벡터 인덱스)
+- 문자 n-gram 해싱 임베딩(HashingEmbedder): 외부 모델 없이 NumPy만으로 질문 벡터화
+  임베딩 전에 질문을 핵심어 형태로 정리 (canonical_question: 조사/의문형 어미 제거, 동의어 통일)
+  → '절도죄 요건이 뭐예요?'와 '절도죄의 구성요건은 무엇인가요?'가 같은 벡터
+- 법률 용어 가드: 질문에 나온 죄명(…죄)/조문(제N조)이 정확히 같은 항목만 적중 후보
+- 연속 float32 행렬 기반 인덱스(SemanticCache): 코사인 유사도 ≥ 임계값이면 이전 답변 재사용
+- 증분 삽입(거의 동일한 질문은 덮어씀 — 조회 한 번 비용), 중복 검사 없는 일괄 적재(insert_many),
+  TTL 만료, 용량 초과 시 LRU 슬롯 재사용, 선택적 메모리 매핑(np.memmap)
+
+참고: n-gram 해싱은 단어 뜻을 모르므로 핵심 단어 하나만 다른 질문(예: 절도죄 ↔ 강도죄)도 높은
+유사도를 보입니다. 죄명/조문은 법률 용어 가드로 걸러지지만, 그 밖의 단어(예: 요건 ↔ 공소시효)는
+유사도로만 구분하므로 임계값은 보수적으로(≥0.95) 유지하세요.
+
+환경변수
+- SEMANTIC_CACHE: '1'이면 활성화 (기본 '0' — 다른 질문의 답변을 내줄 수 있으므로 명시적으로 켜야 함)
+- SEMANTIC_CACHE_THRESHOLD: 코사인 유사도 임계값 (기본 0.95)
+- SEMANTIC_CACHE_CAPACITY: 최대 질문 수 (기본 100000)
+- SEMANTIC_CACHE_DIM: 임베딩 차원 (기본 256)
+- SEMANTIC_CACHE_TTL: 항목 유효 시간(초, 기본 86400)
+- SEMANTIC_CACHE_MMAP_PATH: 지정 시 벡터 행렬을 해당 파일에 메모리 매핑 (기본: 메모리)
+  벡터 행렬을 RAM 밖에 두기 위한 작업 공간(scratch)일 뿐 영속 저장소가 아닙니다. 답변/만료 정보는
+  메모리에만 있으므로 재시작하면 캐시는 비어서 시작합니다. 크기가 맞는 기존 파일은 다시 만들지 않고
+  그대로 열어 씁니다(r+).
+"""
+
+import os
+import re
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from caching import normalize_question
+
+_semantic_cache = None
+_semantic_cache_lock = threading.Lock()
+
+# 어절 끝 조사 (긴 것부터 검사)
+_PARTICLES = ("으로", "에서", "에게", "이란", "의", "은", "는", "이", "가", "을", "를", "에", "와", "과", "로", "도", "란")
+# 뜻을 바꾸지 않는 의문형/요청형 어절
+_FILLER_WORDS = frozenset({
+    "뭐", "뭐예요", "뭐에요", "뭔가요", "뭘까요", "무엇", "무엇인가요", "무엇입니까", "무엇인지", "인가요", "입니까",
+    "어떻게", "되나요", "됩니까", "어떤가요", "알려주세요", "알려줘", "알려", "주세요", "설명해", "설명해주세요",
+    "대해", "대해서", "대하여", "궁금합니다", "궁금해요",
+})
+_SYNONYMS = {"구성요건": "요건", "성립요건": "요건", "범죄성립요건": "요건"}
+_CRIME_RE = re.compile(r"^[가-힣]+죄$")
+_ARTICLE_RE = re.compile(r"제\s*\d+\s*조(?:의\s*\d+)?")
+
+
+def _strip_particle(word: str) -> str:
+    for particle in _PARTICLES:
+        if word.endswith(particle) and len(word) - len(particle) >= 2:
+            return word[:-len(particle)]
+    return word
+
+
+def _normalize_legal(text: str) -> str:
+    """normalize_question + 조문 번호 안의 공백 제거 ('제 329 조' → '제329조')."""
+    return _ARTICLE_RE.sub(lambda match: re.sub(r"\s+", "", match.group()), normalize_question(text))
+
+
+def canonical_question(text: str) -> str:
+    """임베딩용 질문 정리: 조사/의문형 어절을 떼고 동의어를 통일한 핵심어 나열."""
+    words = []
+    for word in _normalize_legal(text).split():
+        if word in _FILLER_WORDS:
+            continue
+        word = _strip_particle(word)
+        if word in _FILLER_WORDS:
+            continue
+        words.append(_SYNONYMS.get(word, word))
+    return " ".join(words)
+
+
+def legal_terms(text: str) -> frozenset:
+    """질문에 나온 죄명(…죄)과 조문 번호(제N조). 이 집합이 다르면 유사도와 무관하게 다른 질문."""
+    normalized = _normalize_legal(text)
+    terms = {word for word in map(_strip_particle, normalized.split()) if _CRIME_RE.match(word)}
+    terms.update(_ARTICLE_RE.findall(normalized))
+    return frozenset(terms)
+
+
+class HashingEmbedder:
+    """핵심어로 정리한 질문의 문자 n-gram을 부호 해싱해 고정 차원 L2 정규화 벡터로 만드는 임베더."""
+
+    def __init__(self, dim: int = 256, ngram_range: tuple = (1, 3)):
+        self.dim = dim
+        self.ngram_range = ngram_range
+
+    def embed(self, text: str) -> np.ndarray:
+        normalized = canonical_question(text)
+        vector = np.zeros(self.dim, dtype=np.float32)
+        # 어절 경계를 n-gram에 반영하기 위해 공백을 하나의 문자로 유지
+        padded = f" {normalized} "
+        low, high = self.ngram_range
+        for n in range(low, high + 1):
+            for i in range(len(padded) - n + 1):
+                gram = padded[i:i + n]
+                if gram.isspace():
+                    continue
+                h = zlib.crc32(gram.encode("utf-8"))
+                sign = 1.0 if h & 0x80000000 else -1.0
+                vector[h % self.dim] += sign
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector
+
+
+class SemanticCache:
+    """코사인 유사도 기반 근사 질문 캐시.
+
+    벡터는 (capacity, dim) float32 행렬의 슬롯에 저장되고, 조회는 사용 중인 구간에 대한
+    행렬-벡터 곱 한 번으로 처리합니다. 네임스페이스(지시사항/어댑터/생성 파라미터)나
+    법률 용어(죄명/조문)가 다른 항목은 유사도와 무관하게 제외됩니다.
+
+    행렬-벡터 곱은 락 밖에서 돌고(조회끼리, 조회와 삽입이 서로 막지 않음) 락 안에서는 고른 슬롯 하나만
+    다시 검증합니다. 검색 도중 덮어써진 행은 그 검색에서 점수가 틀릴 수 있지만, 반환 직전 재검증에서 걸러집니다.
+    """
+
+    def __init__(self, dim: int = 256, capacity: int = 100000, threshold: float = 0.95,
+                 ttl: float = 86400.0, mmap_path: str = None, embedder: HashingEmbedder = None):
+        self.dim = dim
+        self.capacity = max(1, capacity)
+        self.threshold = threshold
+        self.ttl = ttl
+        self.embedder = embedder or HashingEmbedder(dim)
+        if mmap_path:
+            os.makedirs(os.path.dirname(os.path.abspath(mmap_path)), exist_ok=True)
+            expected = self.capacity * dim * np.dtype(np.float32).itemsize
+            reuse = os.path.exists(mmap_path) and os.path.getsize(mmap_path) == expected
+            # 이전 실행의 벡터가 남아 있어도 슬롯은 모두 빈 상태(만료 시각 0)라 조회 대상이 아님
+            self._vectors = np.memmap(mmap_path, dtype=np.float32, mode="r+" if reuse else "w+",
+                                      shape=(self.capacity, dim))
+        else:
+            self._vectors = np.zeros((self.capacity, dim), dtype=np.float32)
+        self._namespaces = np.zeros(self.capacity, dtype=np.uint64)
+        self._terms = np.zeros(self.capacity, dtype=np.uint64)
+        self._expires_at = np.zeros(self.capacity, dtype=np.float64)  # 0 = 빈 슬롯
+        self._last_used = np.zeros(self.capacity, dtype=np.float64)
+        self._values = [None] * self.capacity
+        self._free = []
+        self._high_water = 0  # 한 번이라도 사용된 슬롯 수 (조회 범위)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def _namespace_id(namespace: str) -> int:
+        return zlib.crc32((namespace or "").encode("utf-8"))
+
+    @staticmethod
+    def _terms_id(question: str) -> int:
+        return zlib.crc32("|".join(sorted(legal_terms(question))).encode("utf-8"))
+
+    def _search(self, vector: np.ndarray, namespace_id: int, terms_id: int, now: float):
+        """가장 유사한 유효 슬롯과 점수를 반환합니다 (없으면 (-1, -1.0)). 락 없이 호출 — 결과는 _verify_locked로 확인."""
+        with self._lock:
+            n = self._high_water  # 조회 범위만 락 안에서 고정, 행렬 곱은 락 밖에서
+        if n == 0:
+            return -1, -1.0
+        scores = self._vectors[:n] @ vector
+        invalid = ((self._expires_at[:n] <= now) | (self._namespaces[:n] != namespace_id)
+                   | (self._terms[:n] != terms_id))
+        scores[invalid] = -1.0
+        slot = int(np.argmax(scores))
+        return slot, float(scores[slot])
+
+    def _verify_locked(self, slot: int, vector: np.ndarray, namespace_id: int, terms_id: int, now: float) -> float:
+        """락 밖 검색 뒤 슬롯이 바뀌었을 수 있으므로 그 슬롯 하나의 유효성과 점수를 다시 계산합니다 (무효면 -1.0)."""
+        if slot < 0 or self._expires_at[slot] <= now or self._namespaces[slot] != namespace_id \
+                or self._terms[slot] != terms_id:
+            return -1.0
+        return float(self._vectors[slot] @ vector)
+
+    def lookup(self, question: str, namespace: str = ""):
+        """임계값 이상으로 유사한 질문이 있으면 (값, 유사도), 없으면 (None, 최고 유사도)."""
+        vector = self.embedder.embed(question)
+        namespace_id = self._namespace_id(namespace)
+        terms_id = self._terms_id(question)
+        now = time.time()
+        slot, score = self._search(vector, namespace_id, terms_id, now)
+        with self._lock:
+            if slot >= 0 and score >= self.threshold:
+                score = self._verify_locked(slot, vector, namespace_id, terms_id, now)
+            if slot < 0 or score < self.threshold:
+                self.misses += 1
+                return None, score
+            self._last_used[slot] = now
+            self.hits += 1
+            return self._values[slot], score
+
+    def insert(self, question: str, value, namespace: str = "", dedupe: bool = True) -> int:
+        """질문 벡터와 값을 저장하고 슬롯 번호를 반환합니다.
+
+        dedupe=True면 거의 동일한 질문을 덮어씁니다 (조회 한 번만큼의 비용). 같은 질문이 없다고
+        알고 있으면 dedupe=False로 검색을 건너뛰고, 대량 적재는 insert_many를 쓰세요.
+        """
+        vector = self.embedder.embed(question)
+        namespace_id = self._namespace_id(namespace)
+        terms_id = self._terms_id(question)
+        now = time.time()
+        slot, score = self._search(vector, namespace_id, terms_id, now) if dedupe else (-1, -1.0)
+        with self._lock:
+            if slot >= 0 and (score < 0.999 or self._verify_locked(slot, vector, namespace_id, terms_id, now) < 0.999):
+                slot = -1
+            if slot < 0:
+                slot = self._allocate_slot(now)
+            self._store_locked(slot, vector, namespace_id, terms_id, value, now)
+            return slot
+
+    def insert_many(self, items, namespace: str = "") -> int:
+        """(질문, 값) 목록을 중복 검사 없이 일괄 적재하고 적재한 개수를 반환합니다 (예: 캐시 예열).
+
+        항목마다 전체 검색을 하지 않으므로 O(n)입니다. 목록 안의 중복은 호출하는 쪽에서 걸러야 합니다.
+        """
+        namespace_id = self._namespace_id(namespace)
+        prepared = [(self.embedder.embed(question), self._terms_id(question), value) for question, value in items]
+        now = time.time()
+        with self._lock:
+            for vector, terms_id, value in prepared:
+                self._store_locked(self._allocate_slot(now), vector, namespace_id, terms_id, value, now)
+        return len(prepared)
+
+    def _store_locked(self, slot: int, vector: np.ndarray, namespace_id: int, terms_id: int, value,
+                      now: float) -> None:
+        self._vectors[slot] = vector
+        self._namespaces[slot] = namespace_id
+        self._terms[slot] = terms_id
+        self._expires_at[slot] = now + self.ttl
+        self._last_used[slot] = now
+        self._values[slot] = value
+
+    def _allocate_slot(self, now: float) -> int:
+        if self._free:
+            return self._free.pop()
+        if self._high_water < self.capacity:
+            self._high_water += 1
+            return self._high_water - 1
+        # 만료된 슬롯을 먼저 회수하고, 없으면 가장 오래 안 쓰인 슬롯을 재사용
+        expired = np.flatnonzero(self._expires_at[:self._high_water] <= now)
+        if expired.size:
+            for slot in expired[1:]:
+                self._clear_slot(int(slot))
+                self._free.append(int(slot))
+            self.expirations += int(expired.size)
+            return int(expired[0])
+        self.evictions += 1
+        return int(np.argmin(self._last_used[:self._high_water]))
+
+    def _clear_slot(self, slot: int) -> None:
+        self._vectors[slot] = 0.0
+        self._expires_at[slot] = 0.0
+        self._last_used[slot] = 0.0
+        self._values[slot] = None
+
+    def remove(self, question: str, namespace: str = "") -> bool:
+        """해당 질문과 거의 동일한 항목을 제거합니다."""
+        vector = self.embedder.embed(question)
+        namespace_id = self._namespace_id(namespace)
+        terms_id = self._terms_id(question)
+        now = time.time()
+        slot, score = self._search(vector, namespace_id, terms_id, now)
+        with self._lock:
+            if slot < 0 or score < 0.999 or self._verify_locked(slot, vector, namespace_id, terms_id, now) < 0.999:
+                return False
+            self._clear_slot(slot)
+            self._free.append(slot)
+            return True
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self._expires_at[:self._high_water] > time.time()))
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self),
+                "capacity": self.capacity,
+                "dim": self.dim,
+                "threshold": self.threshold,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+def get_semantic_cache():
+    """환경변수 설정으로 만든 전역 유사 질문 캐시를 반환합니다 (비활성화 시 None)."""
+    global _semantic_cache
+    if os.getenv("SEMANTIC_CACHE", "0") != "1":
+        return None
+
+    if _semantic_cache is None:
+        with _semantic_cache_lock:
+            if _semantic_cache is None:
+                _semantic_cache = SemanticCache(
+                    dim=int(os.getenv("SEMANTIC_CACHE_DIM", "256")),
+                    capacity=int(os.getenv("SEMANTIC_CACHE_CAPACITY", "100000")),
+                    threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95")),
+                    ttl=float(os.getenv("SEMANTIC_CACHE_TTL", "86400")),
+                    mmap_path=os.getenv("SEMANTIC_CACHE_MMAP_PATH") or None,
+                )
+    return _semantic_cache
@@ -1,6 +1,6 @@
 from flask import Flask, request, jsonify, Blueprint, render_template
-from werkzeug.security import generate_password_hash
 from db_connection import get_db  # db기존 연결함수 활용 
+from passwords import PasswordHashBusy, get_password_hasher
 
 app = Flask(__name__)
 
@@ -20,21 +20,26 @@ def signup():
     if not email or not password or not name:
         return jsonify({"message": "모든 필드를 입력해주세요"}), 400
 
+    # 비밀번호 암호화 (해시 풀에서 실행, DB 연결을 잡기 전에 계산)
+    try:
+        hashed_password = get_password_hasher().hash(password)
+    except PasswordHashBusy:
+        response = jsonify({"message": "요청이 많습니다. 잠시 후 다시 시도해주세요"})
+        response.headers["Retry-After"] = "1"
+        return response, 503
+
     db = get_db()
     cursor = db.cursor()
 
     try:
         # 1. 중복 이메일 체크
-        cursor.execute("SELECT id FROM user WHERE email=%s", (email,))
+        cursor.execute("SELECT id FROM User WHERE email=%s", (email,))
         if cursor.fetchone():
             return jsonify({"message": "이미 존재하는 이메일입니다"}), 409
 
-        # 2. 비밀번호 암호화
-        hashed_password = generate_password_hash(password)
-
-        # 3. INSERT
+        # 2. INSERT
         cursor.execute(
-            "INSERT INTO user (email, password, name) VALUES (%s, %s, %s)",
+            "INSERT INTO User (email, password, name) VALUES (%s, %s, %s)",
             (email, hashed_password, name)
         )
         db.commit()
@@ -0,0 +1,91 @@
+"""
+단일 비행(single-flight) 요청 병합
+- 같은 키로 동시에 들어온 계산은 첫 요청(leader)만 실행하고 나머지(follower)는 결과를 공유
+- follower 대기 시간 제한(SingleFlightTimeout), 병합/타임아웃 카운터(stats)
+
+사용 예:
+    value, shared = flight.do(key, lambda: expensive(question))
+"""
+
+import threading
+
+
+class SingleFlightTimeout(Exception):
+    """follower가 leader의 결과를 제한 시간 안에 받지 못했을 때 발생합니다."""
+
+
+class _Call:
+    __slots__ = ("event", "result", "error", "followers")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """키별 진행 중 계산을 하나로 합치는 스레드 안전 헬퍼."""
+
+    def __init__(self, timeout: float = None):
+        self.timeout = timeout
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+        self.timeouts = 0
+
+    def begin(self, key):
+        """(call, is_leader)를 반환합니다. leader는 반드시 finish()를 호출해야 합니다."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.followers += 1
+                self.coalesced += 1
+                return call, False
+            call = _Call()
+            self._calls[key] = call
+            self.leaders += 1
+            return call, True
+
+    def finish(self, key, call, result=None, error: Exception = None) -> None:
+        """leader의 결과(또는 예외)를 기록하고 대기 중인 follower를 깨웁니다."""
+        call.result = result
+        call.error = error
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+        call.event.set()
+
+    def wait(self, call, timeout: float = None):
+        """follower 측: leader의 결과를 기다려 반환합니다 (leader 예외는 그대로 전파)."""
+        timeout = self.timeout if timeout is None else timeout
+        if not call.event.wait(timeout):
+            with self._lock:
+                self.timeouts += 1
+            raise SingleFlightTimeout(f"진행 중인 동일 요청을 {timeout}초 동안 기다렸지만 완료되지 않았습니다.")
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def do(self, key, fn, timeout: float = None):
+        """fn()을 키별로 한 번만 실행합니다. (결과, follower 여부)를 반환합니다."""
+        call, is_leader = self.begin(key)
+        if not is_leader:
+            return self.wait(call, timeout), True
+        try:
+            result = fn()
+        except Exception as e:
+            self.finish(key, call, error=e)
+            raise
+        self.finish(key, call, result=result)
+        return result, False
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "in_flight": len(self._calls),
+                "leaders": self.leaders,
+                "coalesced": self.coalesced,
+                "timeouts": self.timeouts,
+            }
@@ -133,7 +133,38 @@
   const uid = () => (crypto?.randomUUID?.() || Math.random().toString(36).slice(2));
   const now = () => Date.now();
   
-  // 데이터베이스 기반 채팅방 로드
+  // 채팅방/메시지는 키셋 페이지네이션으로 한 페이지씩 로드 (before_id 커서)
+  const ROOM_PAGE_SIZE = 30;
+  const MESSAGE_PAGE_SIZE = 30;
+  let roomsCursor = null;     // 다음(더 오래된) 채팅방 페이지 커서
+  let roomsHasMore = false;
+  let roomsLoading = false;
+
+  // DB 채팅방 → 대화 객체 (메시지는 대화를 열 때 지연 로드)
+  function toConversation(room) {
+    return {
+      id: room.id.toString(),
+      title: room.title,
+      updatedAt: new Date(room.created_at).getTime(),
+      messages: [],
+      loaded: false,
+      hasMore: true,
+      nextBeforeId: null,
+      loadingOlder: false
+    };
+  }
+
+  async function fetchChatRoomPage(userId, beforeId) {
+    const params = new URLSearchParams({ limit: ROOM_PAGE_SIZE });
+    if (beforeId) params.set('before_id', beforeId);
+    const response = await fetch(`/api/chatrooms/user/${userId}?${params}`);
+    if (!response.ok) {
+      throw new Error(`${response.status} ${await response.text()}`);
+    }
+    return response.json();
+  }
+
+  // 데이터베이스 기반 채팅방 로드 (최신 한 페이지)
   async function loadChatRoomsFromDB() {
     const userId = getCurrentUserId();
     if (!userId) {
@@ -142,45 +173,54 @@
     }
     
     try {
-      const response = await fetch(`/api/chatrooms/user/${userId}`);
-      if (response.ok) {
-        const data = await response.json();
-        conversations = [];
-        
-        // 각 채팅방의 메시지도 함께 로드
-        for (const room of data.chatrooms) {
-          const messages = await loadChatMessagesFromDB(room.id);
-          conversations.push({
-            id: room.id.toString(),
-            title: room.title,
-            updatedAt: new Date(room.created_at).getTime(),
-            messages: messages
-          });
-        }
-        
-        if (conversations.length > 0) {
-          activeId = conversations[0].id;
-        }
-        return true;
-      } else {
-        console.error('채팅방 로드 실패:', response.status, await response.text());
+      const data = await fetchChatRoomPage(userId, null);
+      conversations = data.chatrooms.map(toConversation);
+      roomsCursor = data.next_before_id;
+      roomsHasMore = data.has_more;
+      
+      if (conversations.length > 0) {
+        activeId = conversations[0].id;
       }
+      return true;
     } catch (error) {
       console.error('채팅방 로드 실패:', error);
     }
     return false;
   }
 
-  // 데이터베이스에서 채팅 메시지 로드
-  async function loadChatMessagesFromDB(chatRoomId) {
+  // 대화 목록을 끝까지 스크롤하면 다음 채팅방 페이지 로드
+  async function loadMoreChatRooms() {
+    const userId = getCurrentUserId();
+    if (!userId || roomsLoading || !roomsHasMore) return;
+    roomsLoading = true;
+    try {
+      const data = await fetchChatRoomPage(userId, roomsCursor);
+      const known = new Set(conversations.map(c => c.id));
+      data.chatrooms.map(toConversation).forEach(c => {
+        if (!known.has(c.id)) conversations.push(c);
+      });
+      roomsCursor = data.next_before_id;
+      roomsHasMore = data.has_more;
+      renderConvList();
+    } catch (error) {
+      console.error('채팅방 추가 로드 실패:', error);
+    } finally {
+      roomsLoading = false;
+    }
+  }
+
+  // 데이터베이스에서 채팅 메시지 한 페이지 로드 (beforeId가 없으면 최신 페이지)
+  async function loadChatMessagesFromDB(chatRoomId, beforeId = null) {
     try {
-      const response = await fetch(`/chat/messages/${chatRoomId}`);
+      const params = new URLSearchParams({ limit: MESSAGE_PAGE_SIZE });
+      if (beforeId) params.set('before_id', beforeId);
+      const response = await fetch(`/chat/messages/${chatRoomId}?${params}`);
       if (response.ok) {
-        const messages = await response.json();
+        const data = await response.json();
         const formattedMessages = [];
         
         // 질문과 답변을 순서대로 정렬
-        messages.forEach(msg => {
+        data.messages.forEach(msg => {
           formattedMessages.push({
             role: 'user',
             content: msg.question,
@@ -193,12 +233,65 @@
           });
         });
         
-        return formattedMessages.sort((a, b) => a.ts - b.ts);
+        return {
+          messages: formattedMessages.sort((a, b) => a.ts - b.ts),
+          nextBeforeId: data.next_before_id,
+          hasMore: data.has_more
+        };
       }
     } catch (error) {
       console.error('채팅 메시지 로드 실패:', error);
     }
-    return [];
+    return null;
+  }
+
+  // 대화를 처음 열 때 최신 메시지 페이지 로드 (로컬에서 새로 만든 대화는 loaded 플래그 없음)
+  async function ensureMessagesLoaded(conv) {
+    if (conv.loaded !== false) return;
+    const page = await loadChatMessagesFromDB(conv.id);
+    if (!page) return;
+    conv.loaded = true;
+    conv.messages = page.messages.concat(conv.messages);
+    conv.nextBeforeId = page.nextBeforeId;
+    conv.hasMore = page.hasMore;
+  }
+
+  // 위로 스크롤하면 더 오래된 메시지 페이지를 앞에 붙임 (보던 위치 유지)
+  async function loadOlderMessages(conv) {
+    if (!conv || !conv.loaded || !conv.hasMore || !conv.nextBeforeId || conv.loadingOlder) return;
+    conv.loadingOlder = true;
+    try {
+      const page = await loadChatMessagesFromDB(conv.id, conv.nextBeforeId);
+      if (!page) return;
+      conv.messages = page.messages.concat(conv.messages);
+      conv.nextBeforeId = page.nextBeforeId;
+      conv.hasMore = page.hasMore;
+      if (conv.id === activeId) {
+        const root = document.scrollingElement;
+        const prevHeight = root.scrollHeight;
+        const prevTop = window.scrollY;
+        renderChat();
+        window.scrollTo(0, root.scrollHeight - prevHeight + prevTop);
+      }
+    } finally {
+      conv.loadingOlder = false;
+    }
+    fillViewport(conv);
+  }
+
+  // 화면을 다 채우지 못하면 스크롤 이벤트가 생기지 않으므로 이전 페이지를 미리 로드
+  function fillViewport(conv) {
+    if (conv && conv.id === activeId && document.scrollingElement.scrollHeight <= window.innerHeight) {
+      loadOlderMessages(conv);
+    }
+  }
+
+  async function showConversation(conv) {
+    await ensureMessagesLoaded(conv);
+    if (conv.id !== activeId) return;
+    renderConvList(); renderChat();
+    window.scrollTo(0, document.scrollingElement.scrollHeight); // 최신 메시지로 이동
+    fillViewport(conv);
   }
 
   // 데이터베이스에 채팅방 저장
@@ -230,50 +323,6 @@
     return null;
   }
 
-  // 데이터베이스에 채팅 메시지 저장
-  async function saveChatMessageToDB(chatRoomId, question, aiResponse) {
-    const userId = getCurrentUserId();
-    console.log('=== 채팅 메시지 저장 시도 ===');
-    console.log('사용자 ID:', userId);
-    console.log('채팅방 ID:', chatRoomId);
-    console.log('질문:', question);
-    console.log('응답:', aiResponse);
-    
-    if (!userId) {
-      console.error('사용자 ID가 없어서 메시지를 저장할 수 없습니다.');
-      return;
-    }
-    
-    try {
-      const requestData = {
-        user_id: userId,
-        chat_room_id: parseInt(chatRoomId),
-        question: question,
-        response: aiResponse
-      };
-      
-      console.log('전송할 데이터:', requestData);
-      
-      const fetchResponse = await fetch('/chat/message', {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify(requestData)
-      });
-      
-      console.log('응답 상태:', fetchResponse.status);
-      const responseText = await fetchResponse.text();
-      console.log('응답 내용:', responseText);
-      
-      if (fetchResponse.ok) {
-        console.log('✅ 채팅 메시지가 데이터베이스에 저장되었습니다.');
-      } else {
-        console.error('❌ 채팅 메시지 저장 실패:', fetchResponse.status, responseText);
-      }
-    } catch (error) {
-      console.error('❌ 채팅 메시지 저장 오류:', error);
-    }
-  }
-
   // 기존 로컬 스토리지 함수들 (호환성을 위해 유지)
   const saveState = () => localStorage.setItem(STORAGE_KEY, JSON.stringify(conversations));
   function loadState(){ try{ return JSON.parse(localStorage.getItem(STORAGE_KEY)||'[]'); }catch(e){ return []; } }
@@ -392,12 +441,21 @@
       const id = h.slice(CHAT_ROUTE_PREFIX.length);
       if(id === 'new'){ createNewConversationAndGo(); return; }
       const exists = conversations.find(c=>c.id===id);
-      if(exists){ activeId = id; renderConvList(); renderChat(); closeSidebar(); return; } // 모바일에서 전환 시 자동 닫기
+      if(exists){ activeId = id; renderConvList(); renderChat(); closeSidebar(); showConversation(exists); return; } // 모바일에서 전환 시 자동 닫기
     }
     if(activeId) location.replace(CHAT_ROUTE_PREFIX + activeId);
   }
   window.addEventListener('hashchange', routeFromHash);
 
+  /* ======== 지연 로드 (스크롤) ======== */
+  // 채팅 화면 상단 근처 → 이전 메시지, 대화 목록 하단 근처 → 다음 채팅방 페이지
+  window.addEventListener('scroll', ()=>{
+    if(window.scrollY <= 120) loadOlderMessages(conversations.find(c=>c.id===activeId));
+  }, { passive:true });
+  convList.addEventListener('scroll', ()=>{
+    if(convList.scrollTop + convList.clientHeight >= convList.scrollHeight - 80) loadMoreChatRooms();
+  }, { passive:true });
+
   /* ======== 입력창 자동 높이 ======== */
   function autoResize(el){ el.style.height='auto'; el.style.height = el.scrollHeight+'px'; }
   if(composer){
@@ -406,7 +464,21 @@
   }
 
   /* ======== 전송 ======== */
+  // 응답을 기다리는 동안 재전송(더블 클릭/연속 Enter) 방지
+  let sending = false;
   async function onSend(){
+    if(sending) return;
+    sending = true;
+    sendBtn.disabled = true;
+    try{
+      await sendMessage();
+    }finally{
+      sending = false;
+      sendBtn.disabled = false;
+    }
+  }
+
+  async function sendMessage(){
     const text = composer.value.trim();
     if(!text) return;
 
@@ -442,24 +514,52 @@
     saveState();
     renderConvList(); renderChat();
 
-    // 실제 AI API 호출
+    // 실제 AI API 호출 (SSE 스트리밍 우선, 스트림이 시작되기 전에 실패했을 때만 /api/chat/turn 폴백)
+    // 질문/답변 저장은 서버가 같은 요청에서 처리 (chat_room_id, user_id 전달)
+    // 스트림이 시작된 뒤 끊기면 서버가 끝까지 생성해 저장하므로 다시 보내지 않고 저장된 답변을 조회
+    const turn = { chat_room_id: parseInt(conv.id), user_id: getCurrentUserId() };
     let aiText = '오류가 발생했습니다. 잠시 후 다시 시도해주세요.';
     let modelAvailable = true;
+    const sentAt = now();
     try{
-      const res = await fetch('/api/chat', {
-        method:'POST',
-        headers:{ 'Content-Type':'application/json' },
-        body: JSON.stringify({ message: text })
+      const result = await streamChat(text, turn, partial => {
+        const placeholder = conv.messages[conv.messages.length - 1];
+        if(placeholder?.role === 'assistant') placeholder.content = partial;
+        if(conv.id === activeId) renderStreamingAnswer(partial);
       });
-      const data = await res.json();
-      if(res.ok){
-        aiText = data.answer || aiText;
-        modelAvailable = data.model_available !== false;
+      aiText = result.answer || aiText;
+      modelAvailable = result.model_available !== false;
+    }catch(streamErr){
+      if(streamErr.overloaded){
+        // 과부하 거절은 같은 서버에 바로 재요청하지 않음
+        aiText = `${streamErr.message} (${streamErr.retryAfter}초 후 다시 시도)`;
+      }else if(streamErr.started){
+        // 서버는 이미 이 턴을 처리 중 → 재요청하면 답변이 두 번 생성/저장됨
+        console.warn('스트리밍 연결이 끊겼습니다. 서버에 저장된 답변을 확인합니다:', streamErr);
+        // 서버가 error 이벤트로 끝낸 턴은 저장되지 않으므로 조회하지 않음
+        const saved = streamErr.serverError ? null : await waitForSavedAnswer(conv.id, text, sentAt);
+        aiText = saved ?? (streamErr.serverError
+          ? streamErr.message
+          : '연결이 끊겼습니다. 답변은 서버에서 계속 생성되어 채팅방에 저장됩니다. 잠시 후 채팅방을 다시 열어주세요.');
       }else{
-        aiText = data.error || aiText;
+        console.warn('스트리밍 실패, 일반 요청으로 재시도합니다:', streamErr);
+        try{
+          const res = await fetch('/api/chat/turn', {
+            method:'POST',
+            headers:{ 'Content-Type':'application/json' },
+            body: JSON.stringify({ message: text, ...turn })
+          });
+          const data = await res.json();
+          if(res.ok){
+            aiText = data.answer || aiText;
+            modelAvailable = data.model_available !== false;
+          }else{
+            aiText = data.error || aiText;
+          }
+        }catch(err){
+          console.error(err);
+        }
       }
-    }catch(err){
-      console.error(err);
     }
 
     // 모델이 사용 불가능한 경우 사용자에게 알림
@@ -475,10 +575,6 @@
       conv.messages.push({ role:'assistant', content: aiText, ts: now() });
     }
     conv.updatedAt = now();
-    
-    // 데이터베이스에 채팅 메시지 저장
-    await saveChatMessageToDB(conv.id, text, aiText);
-    
     saveState();
     renderConvList(); renderChat();
 
@@ -487,6 +583,113 @@
     renderLawLinks(groups);
   }
 
+  // 스트림이 끊긴 턴의 답변이 서버에 저장될 때까지 최신 메시지 페이지를 몇 번 다시 조회
+  async function waitForSavedAnswer(chatRoomId, question, sentAt, attempts = 15, intervalMs = 2000){
+    for(let i = 0; i < attempts; i++){
+      const page = await loadChatMessagesFromDB(chatRoomId);
+      const messages = page ? page.messages : [];
+      for(let j = messages.length - 2; j >= 0; j--){
+        const msg = messages[j];
+        // 같은 질문을 예전에 한 적이 있어도 이번 전송 이후(시계 오차 1분 허용)에 저장된 것만 인정
+        if(msg.role === 'user' && msg.content === question && msg.ts >= sentAt - 60000
+           && messages[j + 1].role === 'assistant'){
+          return messages[j + 1].content;
+        }
+      }
+      await new Promise(resolve => setTimeout(resolve, intervalMs));
+    }
+    return null;
+  }
+
+  /* ======== 스트리밍 응답 ======== */
+  // /api/chat/stream 의 SSE 이벤트(draft → refine → done)를 읽으며 누적 텍스트를 onUpdate로 전달
+  // turn({chat_room_id, user_id})을 함께 보내면 서버가 done 시점에 턴을 저장
+  // 서버 과부하(429/503 + Retry-After, 또는 error 이벤트)는 overloaded 오류로 던져 재요청하지 않게 함
+  // 응답 본문이 시작된 뒤의 실패(연결 끊김, done 없이 종료, 서버 error 이벤트)는 started 표시 → 폴백 재전송 금지
+  function overloadedError(message, retryAfter){
+    const err = new Error(message || '요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해주세요.');
+    err.overloaded = true;
+    err.retryAfter = retryAfter;
+    return err;
+  }
+
+  async function streamChat(message, turn, onUpdate){
+    const res = await fetch('/api/chat/stream', {
+      method:'POST',
+      headers:{ 'Content-Type':'application/json', 'Accept':'text/event-stream' },
+      body: JSON.stringify({ message, ...turn })
+    });
+    if((res.status === 429 || res.status === 503) && res.headers.get('Retry-After')){
+      const data = await res.json().catch(()=>({}));
+      throw overloadedError(data.error, res.headers.get('Retry-After'));
+    }
+    if(!res.ok || !res.body) throw new Error('stream unavailable: ' + res.status);
+    try{
+      return await readChatStream(res, onUpdate);
+    }catch(err){
+      if(!err.overloaded) err.started = true;
+      throw err;
+    }
+  }
+
+  async function readChatStream(res, onUpdate){
+    const reader = res.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let draft = '';
+    let refinedText = '';
+    let result = null;
+
+    function handleEvent(raw){
+      let event = 'message';
+      const dataLines = [];
+      raw.split('\n').forEach(line=>{
+        if(line.startsWith('event:')) event = line.slice(6).trim();
+        else if(line.startsWith('data:')) dataLines.push(line.slice(5).trim());
+      });
+      if(!dataLines.length) return;
+      const data = JSON.parse(dataLines.join('\n'));
+      if(event === 'draft'){
+        draft += data.delta || '';
+        onUpdate(draft);
+      }else if(event === 'refine'){
+        // 보강 델타가 오기 시작하면 초안을 대체
+        refinedText += data.delta || '';
+        onUpdate(refinedText);
+      }else if(event === 'done'){
+        result = data;
+      }else if(event === 'error' && data.retry_after){
+        throw overloadedError(data.error, data.retry_after);
+      }else if(event === 'error'){
+        const err = new Error(data.error || '답변 생성 중 오류가 발생했습니다.');
+        err.serverError = true;
+        throw err;
+      }
+    }
+
+    while(true){
+      const { value, done } = await reader.read();
+      if(done) break;
+      buffer += decoder.decode(value, { stream:true });
+      let idx;
+      while((idx = buffer.indexOf('\n\n')) >= 0){
+        handleEvent(buffer.slice(0, idx));
+        buffer = buffer.slice(idx + 2);
+      }
+    }
+    if(!result) throw new Error('stream ended without done event');
+    return result;
+  }
+
+  // 전체 재렌더 없이 마지막 AI 말풍선 내용만 갱신
+  function renderStreamingAnswer(partial){
+    const bubbles = chatWrap.querySelectorAll('.ai-content');
+    const last = bubbles[bubbles.length - 1];
+    if(!last) return;
+    last.innerHTML = partial.replace(/\n/g,'<br>');
+    chatWrap.scrollTop = chatWrap.scrollHeight;
+  }
+
   sendBtn.addEventListener('click', onSend);
   composer.addEventListener('keydown', (e)=>{
     if(e.key==='Enter' && !e.shiftKey){ e.preventDefault(); onSend(); }
@@ -0,0 +1,214 @@
+"""
+JWT 폐기(revocation) 저장소 — 로그아웃/회원 탈퇴한 토큰 목록
+- 키: sha256(토큰) (auth_cache.token_key와 동일, 토큰 원문은 저장하지 않음)
+- 항목은 토큰 exp까지만 유지: exp를 BUCKET_SECONDS 단위 시간 버킷으로 묶어
+  현재 시각보다 완전히 지난 버킷을 통째로 제거 (항목별 타이머/전체 스캔 없음)
+- is_revoked()는 해시 조회 O(1) (메모리: dict, SQLite: PRIMARY KEY 조회)
+
+백엔드
+- memory: 프로세스 내 dict + 버킷별 키 집합 (기본, 재시작 시 초기화)
+- sqlite: 로컬 파일 공유 → 같은 서버의 여러 워커가 같은 목록을 보고 재시작 후에도 유지
+
+환경변수
+- TOKEN_STORE: memory(기본) | sqlite
+- TOKEN_STORE_PATH: SQLite 파일 경로 (기본 .cache/revoked_tokens.sqlite3)
+- TOKEN_STORE_BUCKET_SECONDS: 만료 버킷 폭(초, 기본 60)
+- TOKEN_STORE_DEFAULT_TTL: exp가 없는 토큰의 보관 시간(초, 기본 86400)
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+from auth_cache import token_key
+
+_store = None
+_store_lock = threading.Lock()
+
+
+class MemoryRevocationStore:
+    """프로세스 내 폐기 토큰 저장소 (시간 버킷 만료)."""
+
+    def __init__(self, bucket_seconds: int = 60, default_ttl: float = 86400.0):
+        self.bucket_seconds = max(1, int(bucket_seconds))
+        self.default_ttl = default_ttl
+        self._exp = {}       # key -> exp
+        self._buckets = {}   # bucket -> {key, ...}
+        self._next_bucket = int(time.time()) // self.bucket_seconds
+        self._lock = threading.Lock()
+        self.revoked = 0
+        self.evicted = 0
+
+    def _bucket(self, exp: float) -> int:
+        return int(exp) // self.bucket_seconds
+
+    def _expire(self, now: float) -> None:
+        # 현재 버킷 이전의 버킷은 모든 항목의 exp가 지났으므로 통째로 제거
+        current = self._bucket(now)
+        if self._next_bucket >= current:
+            return
+        if current - self._next_bucket > len(self._buckets):
+            stale = [b for b in self._buckets if b < current]  # 오래 유휴였던 경우: 남은 버킷만 확인
+        else:
+            stale = range(self._next_bucket, current)
+        for bucket in stale:
+            for key in self._buckets.pop(bucket, ()):
+                if self._exp.pop(key, None) is not None:
+                    self.evicted += 1
+        self._next_bucket = current
+
+    def revoke_key(self, key: str, exp: float = None) -> None:
+        now = time.time()
+        exp = float(exp) if exp is not None else now + self.default_ttl
+        if exp <= now:
+            return  # 이미 만료된 토큰은 검증 단계에서 거부되므로 보관 불필요
+        with self._lock:
+            self._expire(now)
+            old = self._exp.get(key)
+            if old is not None:
+                self._buckets.get(self._bucket(old), set()).discard(key)
+            else:
+                self.revoked += 1
+            self._exp[key] = exp
+            self._buckets.setdefault(self._bucket(exp), set()).add(key)
+
+    def revoke(self, token: str, exp: float = None) -> None:
+        self.revoke_key(token_key(token), exp)
+
+    def revoke_many(self, items) -> None:
+        """[(token, exp), ...]를 한 번에 폐기합니다."""
+        for token, exp in items:
+            self.revoke(token, exp)
+
+    def is_revoked_key(self, key: str) -> bool:
+        exp = self._exp.get(key)  # dict 조회는 GIL 하에서 원자적 → 읽기 경로는 락 없음
+        return exp is not None and exp > time.time()
+
+    def is_revoked(self, token: str) -> bool:
+        return self.is_revoked_key(token_key(token))
+
+    def purge(self) -> None:
+        with self._lock:
+            self._expire(time.time())
+
+    def __len__(self) -> int:
+        return len(self._exp)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "backend": "memory",
+                "size": len(self._exp),
+                "buckets": len(self._buckets),
+                "revoked": self.revoked,
+                "evicted": self.evicted,
+            }
+
+
+class SQLiteRevocationStore:
+    """SQLite 파일 기반 폐기 토큰 저장소 (여러 워커 프로세스가 공유)."""
+
+    def __init__(self, path: str, bucket_seconds: int = 60, default_ttl: float = 86400.0):
+        self.path = path
+        self.bucket_seconds = max(1, int(bucket_seconds))
+        self.default_ttl = default_ttl
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS revoked_token ("
+            " key TEXT PRIMARY KEY,"
+            " exp REAL NOT NULL,"
+            " bucket INTEGER NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_revoked_token_bucket ON revoked_token (bucket)")
+        self._purged_bucket = None
+        self.revoked = 0
+        self.evicted = 0
+
+    def _bucket(self, exp: float) -> int:
+        return int(exp) // self.bucket_seconds
+
+    def _expire(self, now: float) -> None:
+        # 버킷 경계를 넘을 때만 지난 버킷을 인덱스 범위 삭제
+        current = self._bucket(now)
+        if self._purged_bucket == current:
+            return
+        cursor = self._conn.execute("DELETE FROM revoked_token WHERE bucket < ?", (current,))
+        self.evicted += max(0, cursor.rowcount)
+        self._purged_bucket = current
+
+    def revoke_many(self, items) -> None:
+        """[(token, exp), ...]를 한 트랜잭션으로 폐기합니다."""
+        now = time.time()
+        rows = []
+        for token, exp in items:
+            exp = float(exp) if exp is not None else now + self.default_ttl
+            if exp > now:
+                rows.append((token_key(token), exp, self._bucket(exp)))
+        with self._lock:
+            self._expire(now)
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO revoked_token (key, exp, bucket) VALUES (?, ?, ?)", rows
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self.revoked += len(rows)
+
+    def revoke(self, token: str, exp: float = None) -> None:
+        self.revoke_many([(token, exp)])
+
+    def is_revoked_key(self, key: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM revoked_token WHERE key = ? AND exp > ?", (key, time.time())
+            ).fetchone()
+        return row is not None
+
+    def is_revoked(self, token: str) -> bool:
+        return self.is_revoked_key(token_key(token))
+
+    def purge(self) -> None:
+        with self._lock:
+            self._expire(time.time())
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM revoked_token").fetchone()[0]
+
+    def stats(self) -> dict:
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "size": len(self),
+            "revoked": self.revoked,
+            "evicted": self.evicted,
+        }
+
+
+def get_token_store():
+    """환경변수 설정으로 만든 전역 폐기 토큰 저장소를 반환합니다."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                bucket_seconds = int(os.getenv("TOKEN_STORE_BUCKET_SECONDS", "60"))
+                default_ttl = float(os.getenv("TOKEN_STORE_DEFAULT_TTL", "86400"))
+                if os.getenv("TOKEN_STORE", "memory") == "sqlite":
+                    _store = SQLiteRevocationStore(
+                        os.getenv("TOKEN_STORE_PATH", os.path.join(".cache", "revoked_tokens.sqlite3")),
+                        bucket_seconds=bucket_seconds,
+                        default_ttl=default_ttl,
+                    )
+                else:
+                    _store = MemoryRevocationStore(bucket_seconds=bucket_seconds, default_ttl=default_ttl)
+    return _store
+